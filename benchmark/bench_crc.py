@@ -0,0 +1,74 @@
+#!/usr/bin/env python3.13
+"""
+filename: bench_crc.py
+author: [peixuSu]
+email: [1420209272@qq.com]
+date: 2026-10-18
+description: CRC-16微基准测试，对比逐位计算、单表查表和slice-by-N的吞吐量
+
+用法: python benchmark/bench_crc.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.crc.crc_manager import CRC
+
+# 测试数据长度: 16 B, 1 KiB, 1 MiB
+SIZES = [16, 1024, 1024 * 1024]
+
+# 参与对比的实现
+IMPLEMENTATIONS = [
+    ("bitwise", CRC.crc_16_bitwise),
+    ("table", CRC.crc_16_table),
+    ("slice-by-8", CRC.crc_16_slice),
+    ("crc_16_user", CRC.crc_16_user),
+]
+
+
+def measure(func, data, min_time=0.5):
+    """
+    重复调用func直到累计耗时超过min_time，返回每秒处理的字节数
+    """
+    loops = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        func(data)
+        loops += 1
+        elapsed = time.perf_counter() - start
+    return len(data) * loops / elapsed
+
+
+def format_rate(rate):
+    """将字节速率格式化为可读字符串"""
+    for unit in ("B/s", "KiB/s", "MiB/s"):
+        if rate < 1024:
+            return f"{rate:8.2f} {unit}"
+        rate /= 1024
+    return f"{rate:8.2f} GiB/s"
+
+
+def main():
+    for size in SIZES:
+        data = os.urandom(size)
+
+        # 所有实现必须给出一致的结果
+        expected = CRC.crc_16_bitwise(data)
+        for name, func in IMPLEMENTATIONS:
+            assert func(data) == expected, f"{name} 计算结果不一致"
+
+        print(f"数据长度 {size} 字节:")
+        baseline = None
+        for name, func in IMPLEMENTATIONS:
+            rate = measure(func, data)
+            if baseline is None:
+                baseline = rate
+            print(f"  {name:<12} {format_rate(rate)}  x{rate / baseline:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3.13
+"""
+filename: bench_crc_batch.py
+author: [peixuSu]
+email: [1420209272@qq.com]
+date: 2026-10-18
+description: 批量CRC基准测试，对比逐帧调用与CRC.crc_16_many的耗时
+
+用法: python benchmark/bench_crc_batch.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.crc.crc_manager as crc_manager
+from utils.crc.crc_manager import CRC
+
+# 测试帧数量
+FRAME_COUNTS = [1000, 100000]
+
+# 帧长度范围：10字节帧头 + 0~54字节负载
+MIN_LENGTH = 10
+MAX_LENGTH = 64
+
+
+def generate_frames(count, seed=0):
+    """生成指定数量的随机帧"""
+    rng = random.Random(seed)
+    return [rng.randbytes(rng.randint(MIN_LENGTH, MAX_LENGTH)) for _ in range(count)]
+
+
+def timed(func, *args):
+    """执行func并返回(结果, 耗时秒数)"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def per_frame(frames):
+    """逐帧调用crc_16_user"""
+    return [CRC.crc_16_user(frame) for frame in frames]
+
+
+def batch_fallback(frames):
+    """禁用NumPy时的crc_16_many"""
+    saved = crc_manager.np
+    crc_manager.np = None
+    try:
+        return CRC.crc_16_many(frames)
+    finally:
+        crc_manager.np = saved
+
+
+def main():
+    if crc_manager.np is None:
+        print("未安装NumPy，crc_16_many使用纯Python实现")
+
+    for count in FRAME_COUNTS:
+        frames = generate_frames(count)
+        total_bytes = sum(len(frame) for frame in frames)
+
+        expected, base_time = timed(per_frame, frames)
+        fallback, fallback_time = timed(batch_fallback, frames)
+        batch, batch_time = timed(CRC.crc_16_many, frames)
+
+        assert fallback == expected and batch == expected, "批量计算结果不一致"
+
+        print(f"{count} 帧 ({total_bytes} 字节):")
+        print(f"  逐帧调用          {base_time * 1000:9.2f} ms")
+        print(f"  crc_16_many(纯Python) {fallback_time * 1000:5.2f} ms  x{base_time / fallback_time:5.1f}")
+        print(f"  crc_16_many       {batch_time * 1000:9.2f} ms  x{base_time / batch_time:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
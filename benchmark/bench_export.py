@@ -0,0 +1,123 @@
+#!/usr/bin/env python3.13
+"""
+filename: bench_export.py
+author: [peixuSu]
+email: [1420209272@qq.com]
+date: 2026-10-18
+description: CSV导出基准测试，对比先解析全部记录再排序的旧实现与流式导出的耗时和峰值内存，
+             以及没有新增记录时重复导出的耗时
+
+用法: python benchmark/bench_export.py [--rows 1000000]
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.log.log_manager import CaseResultParser
+from core.log.result_store import ResultStore
+
+# 失败记录的比例
+FAILURE_RATIO = 0.1
+
+# 失败日志，与模拟器生成的格式一致
+FAILURE_LOG = "index,addr,expect,actual;0,0x80000000,0000FFFF,0000FFFE;1,0x80000004,68E9,68E8;2,0x80000008,12,13;"
+
+
+def generate_history(rows, seed=0):
+    """生成(时间戳, 测例名称, 是否失败, 日志)的合成执行历史，时间戳跨越午夜"""
+    rng = random.Random(seed)
+    for index in range(rows):
+        seconds = (23 * 3600 + index) % 86400
+        timestamp = f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+        case_name = f"case_{rng.randint(1, 500):04d}"
+        failed = rng.random() < FAILURE_RATIO
+        yield timestamp, case_name, failed, FAILURE_LOG if failed else f"{case_name}运行结果正确"
+
+
+def legacy_export(history, file_path):
+    """旧实现：结果保存在内存列表中，导出时解析全部记录并按时间字符串排序"""
+    failures = [(t, c, log) for t, c, failed, log in history if failed]
+    successes = [(t, c) for t, c, failed, _ in history if not failed]
+
+    records = {}
+    for idx, (timestamp, err_case, log_content) in enumerate(failures):
+        parts = [part.strip() for part in log_content.split(';') if part.strip()]
+        error_info = [field.strip() for field in parts[0].split(',')]
+        records[f"failure_{timestamp}_{idx}"] = {
+            'timestamp': timestamp,
+            'case_name': f"错误测例{err_case}",
+            'error_info': error_info,
+            'error_records': [dict(zip(error_info, [v.strip() for v in row.split(',')])) for row in parts[1:]],
+        }
+    for idx, (timestamp, case_name) in enumerate(successes):
+        records[f"success_{timestamp}_{idx}"] = {
+            'timestamp': timestamp, 'case_name': f"正确测例{case_name}", 'error_info': [], 'error_records': [{}],
+        }
+
+    parser = CaseResultParser()
+    with open(file_path, 'w', newline='', encoding='utf-8-sig') as csvfile:
+        writer = csv.writer(csvfile)
+        for _, case_data in sorted(records.items(), key=lambda x: x[1]['timestamp']):
+            if case_data['case_name'].startswith('正确测例'):
+                continue
+            writer.writerow(['时间', '错误测例'] + case_data['error_info'])
+            writer.writerow([case_data['timestamp'], case_data['case_name']] + [''] * len(case_data['error_info']))
+            for record in case_data['error_records']:
+                row = ['', '']
+                for field in case_data['error_info']:
+                    value = record.get(field, '')
+                    row.append('\t' + str(value) if parser.format_as_text(value) else value)
+                writer.writerow(row)
+            writer.writerow([])
+            writer.writerow([])
+
+
+def measure(func, *args):
+    """执行func并返回(耗时秒数, 峰值内存MB)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / (1 << 20)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV导出基准测试")
+    parser.add_argument("--rows", type=int, default=1000000, help="合成执行历史的行数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        history = list(generate_history(args.rows))
+
+        result_parser = CaseResultParser(ResultStore(os.path.join(directory, "results.db"), batch_size=10000))
+        for timestamp, case_name, failed, log in history:
+            if failed:
+                result_parser.save_result(timestamp, case_name, log)
+            else:
+                result_parser.save_success_result(timestamp, case_name, log)
+        result_parser.store.flush()
+
+        legacy_time, legacy_peak = measure(legacy_export, history, os.path.join(directory, "legacy.csv"))
+        del history
+
+        stream_time, stream_peak = measure(result_parser.export_csv, os.path.join(directory, "stream.csv"))
+        repeat_time, repeat_peak = measure(result_parser.export_csv, os.path.join(directory, "repeat.csv"))
+
+        print(f"{args.rows} 行 (失败 {result_parser.failure_count} 行):")
+        print(f"  旧实现    {legacy_time:8.2f} s  峰值内存 {legacy_peak:8.1f} MB")
+        print(f"  流式导出  {stream_time:8.2f} s  峰值内存 {stream_peak:8.1f} MB")
+        print(f"  重复导出  {repeat_time:8.2f} s  峰值内存 {repeat_peak:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
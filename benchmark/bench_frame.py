@@ -0,0 +1,100 @@
+#!/usr/bin/env python3.13
+"""
+filename: bench_frame.py
+author: [peixuSu]
+email: [1420209272@qq.com]
+date: 2026-10-18
+description: 帧编解码基准测试，对比逐字节拼接/移位的旧实现与struct编解码的每秒帧数
+
+用法: python benchmark/bench_frame.py
+"""
+
+import os
+import sys
+import time
+from ctypes import c_ubyte
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.risc_v_debug.frame import Frame, CMD, Header
+
+# 负载长度
+PAYLOAD_SIZES = [3, 64, 1024]
+
+
+def legacy_generate_frame(cmd, data, msg_id=0):
+    """旧版逐字节拼接的帧生成实现"""
+    payload = bytes(data)
+    data_length = len(payload)
+    frame = bytearray()
+    frame.append((Header >> 8) & 0xFF)
+    frame.append(Header & 0xFF)
+    frame.append((msg_id >> 8) & 0xFF)
+    frame.append(msg_id & 0xFF)
+    frame.append((cmd >> 8) & 0xFF)
+    frame.append(cmd & 0xFF)
+    frame.append((data_length >> 24) & 0xFF)
+    frame.append((data_length >> 16) & 0xFF)
+    frame.append((data_length >> 8) & 0xFF)
+    frame.append(data_length & 0xFF)
+    frame.extend(payload)
+    return frame
+
+
+def legacy_parse_receive_frame(receive_data):
+    """旧版逐字节移位的帧解析实现（不含CRC）"""
+    basic_length = 10
+    if len(receive_data) < basic_length:
+        return False, None, None, None, "data length error"
+    header = (receive_data[0] << 8) | receive_data[1]
+    if header != Header:
+        return False, None, None, None, f"帧头错误：{header:04x}"
+    msg_id = (receive_data[2] << 8) | receive_data[3]
+    cmd = (receive_data[4] << 8) | receive_data[5]
+    data_length = (receive_data[6] << 24) | (receive_data[7] << 16) | (receive_data[8] << 8) | receive_data[9]
+    if len(receive_data) < basic_length + data_length:
+        return False, None, None, None, "data length error"
+    payload = receive_data[basic_length:basic_length + data_length]
+    return True, msg_id, cmd, payload, "Success"
+
+
+def frames_per_second(func, *args, min_time=0.5):
+    """重复调用func直到累计耗时超过min_time，返回每秒调用次数"""
+    loops = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        for _ in range(100):
+            func(*args)
+        loops += 100
+        elapsed = time.perf_counter() - start
+    return loops / elapsed
+
+
+def main():
+    for size in PAYLOAD_SIZES:
+        payload = os.urandom(size)
+
+        # 新旧实现线上格式必须一致
+        frame = Frame.generate_frame(CMD["RunCase"], payload)
+        msg_id = int.from_bytes(frame[2:4], 'big')
+        assert frame == legacy_generate_frame(CMD["RunCase"], payload, msg_id), "编码结果不一致"
+
+        # 接收缓冲区与SPI读取一致，使用ctypes数组
+        rx_buffer = (c_ubyte * (len(frame) + 16)).from_buffer_copy(bytes(frame) + bytes(16))
+        new_result = Frame.parse_receive_frame(rx_buffer)
+        old_result = legacy_parse_receive_frame(rx_buffer)
+        assert new_result[:3] == old_result[:3] and bytes(new_result[3]) == bytes(old_result[3]), "解码结果不一致"
+
+        print(f"负载 {size} 字节:")
+        old_encode = frames_per_second(legacy_generate_frame, CMD["RunCase"], payload)
+        new_encode = frames_per_second(Frame.generate_frame, CMD["RunCase"], payload)
+        print(f"  编码  旧实现 {old_encode:12.0f} 帧/秒  struct {new_encode:12.0f} 帧/秒  x{new_encode / old_encode:4.1f}")
+
+        old_decode = frames_per_second(legacy_parse_receive_frame, rx_buffer)
+        new_decode = frames_per_second(Frame.parse_receive_frame, rx_buffer)
+        print(f"  解码  旧实现 {old_decode:12.0f} 帧/秒  struct {new_decode:12.0f} 帧/秒  x{new_decode / old_decode:4.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3.13
+"""
+filename: bench_spi_buffer.py
+author: [peixuSu]
+email: [1420209272@qq.com]
+date: 2026-10-18
+description: SPI接收缓冲区基准测试，对比每次新分配ctypes数组与缓冲区池复用的分配次数、峰值内存和耗时
+
+用法: python benchmark/bench_spi_buffer.py
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from ctypes import c_ubyte, memmove
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spi.spi_buffer import TransferBufferPool
+
+# 传输次数
+TRANSACTIONS = 10000
+
+# 每次接收的字节数
+RX_SIZES = [10, 64, 1024]
+
+
+class FakeJTool:
+    """模拟jtool.SPIReadOnly，向接收缓冲区写入固定数据"""
+
+    def __init__(self, max_size):
+        self.pattern = bytes(range(256)) * (max_size // 256 + 1)
+
+    def SPIReadOnly(self, handle, clk_mode, bit_order, rx_size, rx_buffer):
+        memmove(rx_buffer, self.pattern, rx_size)
+        return 0
+
+
+def legacy_receive(jtool, rx_size, pool=None):
+    """旧版接收：每次新分配ctypes数组并逐字节转换为列表"""
+    rx_buffer = (c_ubyte * rx_size)()
+    jtool.SPIReadOnly(None, 0, 0, rx_size, rx_buffer)
+    received_data = [rx_buffer[i] for i in range(rx_size)]
+    return bytes(received_data)
+
+
+def pooled_receive(jtool, rx_size, pool):
+    """缓冲区池接收：复用ctypes数组，一次复制取出数据"""
+    rx_pooled = pool.acquire(rx_size)
+    try:
+        jtool.SPIReadOnly(None, 0, 0, rx_size, rx_pooled.array)
+        return rx_pooled.read(rx_size)
+    finally:
+        pool.release(rx_pooled)
+
+
+def run(func, jtool, rx_size, pool=None):
+    """执行TRANSACTIONS次接收，返回(耗时, 峰值内存)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(TRANSACTIONS):
+        func(jtool, rx_size, pool)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    jtool = FakeJTool(max(RX_SIZES))
+
+    for rx_size in RX_SIZES:
+        pool = TransferBufferPool()
+
+        # 两种实现接收的数据必须一致
+        assert legacy_receive(jtool, rx_size) == pooled_receive(jtool, rx_size, pool), "接收结果不一致"
+
+        old_time, old_peak = run(legacy_receive, jtool, rx_size)
+        new_time, new_peak = run(pooled_receive, jtool, rx_size, pool)
+        stats = pool.get_statistics()
+
+        print(f"接收 {rx_size} 字节 x {TRANSACTIONS} 次:")
+        print(f"  新分配  ctypes数组分配 {TRANSACTIONS:6d} 次  峰值内存 {old_peak:8d} B  耗时 {old_time * 1000:8.1f} ms")
+        print(f"  缓冲池  ctypes数组分配 {stats['allocation_count']:6d} 次  峰值内存 {new_peak:8d} B  耗时 {new_time * 1000:8.1f} ms"
+              f"  x{old_time / new_time:4.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ date: 2025-11-22
 description: 
 """
 
+import os
 from PySide6.QtWidgets import QWidget, QMessageBox, QStatusBar
 from PySide6.QtCore import Qt, QTimer
 from .ui.Ui_application import Ui_Application
@@ -16,32 +17,46 @@ from spi.spi_driver import SPIDriver
 from .sub_window.sub_window import SubWindow
 from .log.log_window import LogWindow
 from .log.log_manager import CaseResultParser
+from .log.result_store import ResultStore
 from .risc_v_debug.risc_v_window import RiscVWindow
+from .risc_v_debug.frame import FrameDecoder
+from utils.crc.crc_manager import get_crc_engine
 
 # from utils.crc.crc_manager import CRC
 
+# 测例结果数据库所在目录
+RESULT_DIR = "results"
+
 class Applicaton(QWidget):
 
     def __init__(self):
         super().__init__()
         self.ui = Ui_Application()
         self.ui.setupUi(self)
-        self.driver = SPIDriver()
 
         # self.yaml_template = YAMLTemplate()
 
         # 初始化当前CRC模式为0 (默认使用CRC)
         self.current_crc_mode = 0
 
-        self.case_result_parser = CaseResultParser()
+        # 当前CRC计算引擎，默认使用CRC-16(自定义)参数
+        self.crc_engine = get_crc_engine()
+
+        # 流式帧解码器，跨多次SPI读取缓存不完整的帧
+        self.frame_decoder = FrameDecoder()
+
+        # 测例结果写入数据库，长时间循环运行时内存不增长，程序崩溃后结果仍然保留
+        os.makedirs(RESULT_DIR, exist_ok=True)
+        self.result_store = ResultStore(os.path.join(RESULT_DIR, "results.db"))
+        self.case_result_parser = CaseResultParser(self.result_store)
 
         # 初始化日志窗口
         self.log_window = LogWindow(self,self.case_result_parser)
 
         # 初始化SPI窗口
-        self.spi_controller = SPIController(self, self.driver)
+        self.spi_controller = SPIController(self, SPIDriver())
         self.spi_controller.log_signal.connect(self.log_window.log)
-        self.spi_window = SPIWindow(self, self.log_window, self.driver)
+        self.spi_window = SPIWindow(self, self.log_window)
 
         # 初始化窗口
         self.risc_v_window = RiscVWindow(self, self.spi_controller,self.case_result_parser)
@@ -68,7 +83,10 @@ class Applicaton(QWidget):
             )
             
         if reply == QMessageBox.StandardButton.Yes:
-            # 用户确认关闭，接受关闭事件
+            # 用户确认关闭，停止SPI工作线程后接受关闭事件
+            self.spi_controller.shutdown()
+            self.result_store.close()
+            self.log_window.close_file_logger()
             event.accept()
         elif reply == QMessageBox.StandardButton.No:
             # 用户取消关闭，忽略关闭事件
@@ -76,6 +94,22 @@ class Applicaton(QWidget):
 
     
 
+    def crc_config_updated(self, crc_engine):
+        """
+        接收CRC窗口参数更新信号，更新当前CRC引擎
+        
+        Args:
+            crc_engine: 根据CRC配置界面参数生成的CRC引擎
+        """
+        self.crc_engine = crc_engine
+
+        hex_digits = crc_engine.width // 4
+        self.log_window.log(
+            f"CRC参数: 宽度{crc_engine.width}, 多项式{crc_engine.poly:0{hex_digits}X}, "
+            f"初始值{crc_engine.init:0{hex_digits}X}, 异或值{crc_engine.xorout:0{hex_digits}X}, "
+            f"输入反转{'是' if crc_engine.refin else '否'}, 输出反转{'是' if crc_engine.refout else '否'}, "
+            f"{'高字节在前' if crc_engine.high_first else '低字节在前'}", 1)
+
     def crc_mode_updated(self, crc_value):
         """
         接收CRC窗口更新信号，更新current_crc_mode
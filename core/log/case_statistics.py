@@ -0,0 +1,235 @@
+#!/usr/bin/env python3.13
+"""
+filename: case_statistics.py
+author: [peixuSu]
+email: [1420209272@qq.com]
+date: 2026-10-18
+description: 测例运行统计，每个结果O(1)更新，按测例统计通过/失败次数、连续失败和运行时长分位数
+"""
+
+import time
+from bisect import bisect_right, insort
+from datetime import datetime
+
+# 统计的运行时长分位数
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class P2Quantile:
+    """
+    P²流式分位数估计（Jain & Chlamtac, 1985）
+
+    只保存5个标记点的高度和位置，每次更新O(1)，不保存历史数据。前5个数据直接保存并返回精确值。
+    """
+
+    def __init__(self, p):
+        """
+        Args:
+            p (float): 分位数，0-1
+        """
+        self.p = p
+        self.count = 0
+        # 标记点高度，前5个数据时为已排序的全部数据
+        self.heights = []
+        # 标记点的实际位置、期望位置和期望位置的增量
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, value):
+        """加入一个数据"""
+        self.count += 1
+        heights = self.heights
+        if self.count <= 5:
+            insort(heights, value)
+            return
+
+        # 找到数据所在的区间并更新端点
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = bisect_right(heights, value) - 1
+
+        positions = self.positions
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # 调整中间三个标记点
+        for i in range(1, 4):
+            offset = self.desired[i] - positions[i]
+            if ((offset >= 1 and positions[i + 1] - positions[i] > 1)
+                    or (offset <= -1 and positions[i - 1] - positions[i] < -1)):
+                step = 1 if offset > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / (positions[i + step] - positions[i])
+                heights[i] = height
+                positions[i] += step
+
+    def _parabolic(self, i, step):
+        heights = self.heights
+        positions = self.positions
+        return heights[i] + step / (positions[i + 1] - positions[i - 1]) * (
+            (positions[i] - positions[i - 1] + step) * (heights[i + 1] - heights[i]) / (positions[i + 1] - positions[i])
+            + (positions[i + 1] - positions[i] - step) * (heights[i] - heights[i - 1]) / (positions[i] - positions[i - 1])
+        )
+
+    def value(self):
+        """
+        当前的分位数估计
+
+        Returns:
+            float: 分位数，没有数据时返回None
+        """
+        if self.count == 0:
+            return None
+        if self.count <= 5:
+            return self.heights[round(self.p * (self.count - 1))]
+        return self.heights[2]
+
+
+class CaseStatistics:
+    """
+    单个测例的运行统计
+    """
+
+    def __init__(self, clock=time.time):
+        """
+        Args:
+            clock: 返回当前时间（秒，Unix时间）的函数，用于记录失败时间
+        """
+        self.clock = clock
+        self.pass_count = 0
+        self.fail_count = 0
+        # 当前和历史最长的连续失败次数
+        self.fail_streak = 0
+        self.max_fail_streak = 0
+        # 首次和最近一次失败的时间（Unix时间）
+        self.first_failure = None
+        self.last_failure = None
+        # 运行时长(秒)
+        self.duration_count = 0
+        self.duration_min = None
+        self.duration_max = None
+        self.duration_sum = 0.0
+        self.quantiles = [P2Quantile(p) for p in QUANTILES]
+        # 合并后的分位数估计，为None时使用流式估计
+        self.merged_quantiles = None
+
+    def add(self, passed, duration=None):
+        """
+        记录一次运行结果
+
+        Args:
+            passed (bool): 是否通过
+            duration (float, optional): 运行时长（秒）
+        """
+        if passed:
+            self.pass_count += 1
+            self.fail_streak = 0
+        else:
+            self.fail_count += 1
+            self.fail_streak += 1
+            self.max_fail_streak = max(self.max_fail_streak, self.fail_streak)
+            now = self.clock()
+            if self.first_failure is None:
+                self.first_failure = now
+            self.last_failure = now
+
+        if duration is not None:
+            self.duration_count += 1
+            self.duration_sum += duration
+            self.duration_min = duration if self.duration_min is None else min(self.duration_min, duration)
+            self.duration_max = duration if self.duration_max is None else max(self.duration_max, duration)
+            if self.merged_quantiles is None:
+                for quantile in self.quantiles:
+                    quantile.add(duration)
+
+    def merge(self, other):
+        """
+        合并另一个设备上同一测例的统计
+
+        次数和时长范围精确合并；分位数按数据量加权平均，为近似值；连续失败取两者中较大的值。
+        合并后的分位数是固定的估计，之后add()不再更新分位数，只更新次数和时长范围，
+        因此合并应在所有结果记录完之后进行。
+
+        Args:
+            other (CaseStatistics): 另一个统计
+        """
+        self.pass_count += other.pass_count
+        self.fail_count += other.fail_count
+        self.fail_streak = max(self.fail_streak, other.fail_streak)
+        self.max_fail_streak = max(self.max_fail_streak, other.max_fail_streak)
+        if other.first_failure is not None:
+            self.first_failure = other.first_failure if self.first_failure is None else min(self.first_failure, other.first_failure)
+            self.last_failure = other.last_failure if self.last_failure is None else max(self.last_failure, other.last_failure)
+
+        if other.duration_count == 0:
+            return
+        total = self.duration_count + other.duration_count
+        self.merged_quantiles = [
+            other_value if value is None else (value * self.duration_count + other_value * other.duration_count) / total
+            for value, other_value in zip(self.quantile_values(), other.quantile_values())
+        ]
+        self.duration_count = total
+        self.duration_sum += other.duration_sum
+        self.duration_min = other.duration_min if self.duration_min is None else min(self.duration_min, other.duration_min)
+        self.duration_max = other.duration_max if self.duration_max is None else max(self.duration_max, other.duration_max)
+
+    def quantile_values(self):
+        """
+        运行时长的分位数估计，顺序与QUANTILES一致
+
+        Returns:
+            list: 分位数（秒），没有数据时为None
+        """
+        if self.merged_quantiles is not None:
+            return list(self.merged_quantiles)
+        return [quantile.value() for quantile in self.quantiles]
+
+    def total_count(self):
+        """运行次数"""
+        return self.pass_count + self.fail_count
+
+    def pass_rate(self):
+        """通过率(%)"""
+        total = self.total_count()
+        return self.pass_count / total * 100 if total > 0 else 0
+
+    def as_dict(self):
+        """
+        以字典形式返回统计结果
+
+        Returns:
+            dict: 次数、通过率、连续失败、失败时间（"%Y-%m-%d %H:%M:%S"）和时长统计（秒）
+        """
+        p50, p95, p99 = self.quantile_values()
+        return {
+            'total_count': self.total_count(),
+            'pass_count': self.pass_count,
+            'fail_count': self.fail_count,
+            'pass_rate': self.pass_rate(),
+            'fail_streak': self.fail_streak,
+            'max_fail_streak': self.max_fail_streak,
+            'first_failure': format_time(self.first_failure),
+            'last_failure': format_time(self.last_failure),
+            'duration_min': self.duration_min,
+            'duration_max': self.duration_max,
+            'duration_mean': self.duration_sum / self.duration_count if self.duration_count else None,
+            'duration_p50': p50,
+            'duration_p95': p95,
+            'duration_p99': p99,
+        }
+
+
+def format_time(timestamp):
+    """Unix时间格式化为字符串，None时返回空字符串"""
+    if timestamp is None:
+        return ""
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
@@ -7,56 +7,184 @@ date: 2025-12-31
 description: 日志解析类，用于解析测试用例运行结果
 """
 from datetime import datetime
-
-import reportlab.pdfgen.canvas as canvas
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.platypus import Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
 import csv
+import io
+import shutil
+import tempfile
+
+from .result_store import ResultStore, VERDICT_PASS, VERDICT_FAIL
+from .case_statistics import CaseStatistics
+
+# export_pdf启用时再导入reportlab，命令行运行时无需安装
+# import reportlab.pdfgen.canvas as canvas
+# from reportlab.lib.pagesizes import A4, landscape
+# from reportlab.platypus import Table, TableStyle, Paragraph, Spacer
+# from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+# from reportlab.lib.units import inch
+# from reportlab.lib import colors
 
 class CaseResultParser():
 
-    def __init__(self):
-        # 失败测试的记录
-        self.failure_timestamp = []
-        self.failure_err_case = []
-        self.failure_log_content = []
-        # 成功测试的记录
-        self.success_timestamp = []
-        self.success_case_name = []
-        self.success_log_content = []
-
-    def save_result(self, timestamp, err_case, log_content):
+    # 测例运行时长滑动平均的平滑系数
+    DURATION_ALPHA = 0.3
+
+    # 从数据库恢复滑动平均时读取的最近结果数，更早的结果对平均值几乎没有影响
+    DURATION_SEED_ROWS = 10000
+
+    # 导出CSV时的文件写缓冲大小(字节)和进度回调间隔(失败记录数)
+    CSV_BUFFER_SIZE = 1 << 20
+    EXPORT_PROGRESS_STEP = 1000
+
+    def __init__(self, store=None):
+        """
+        Args:
+            store: 测例结果存储ResultStore，默认为内存数据库；数据库中已有的结果不计入
+        """
+        # 每次测例执行的结果保存在数据库中，内存中只保留计数
+        self.store = store if store is not None else ResultStore()
+        # 数据库中已有的结果属于之前的运行，只读取此后写入的结果
+        self.start_id = self.store.last_id()
+        self.success_count = 0
+        self.failure_count = 0
+        # 每个测例运行时长(秒)的指数滑动平均，由数据库中已有的结果恢复
+        self.case_durations = {}
+        for case_name, duration in self.store.recent_durations(self.DURATION_SEED_ROWS):
+            self.update_case_duration(case_name, duration)
+        # 每个测例的运行统计，键为测例名称
+        self.case_statistics = {}
+        # 已渲染的失败测例CSV行缓存在临时文件中，exported_id为已缓存的最后一个结果id，
+        # 重复导出时只读取和渲染此后新增的失败结果
+        self.csv_cache = None
+        self.exported_id = self.start_id
+        self.exported_count = 0
+
+    def save_result(self, timestamp, err_case, log_content, duration=None, case_id=None):
         """保存失败测试用例运行结果
 
         Args:
             timestamp: 时间戳
             err_case: 错误测例名称
             log_content: 日志内容
+            duration: 测例运行时长(秒)
+            case_id: 测例ID
         """
-        self.failure_timestamp.append(timestamp)
-        self.failure_err_case.append(err_case)
-        self.failure_log_content.append(log_content)
+        # 日志只在保存时解析一次，导出时读取解析后的表头和数据行
+        parsed = self.parse_log(log_content)
+        self.store.append(err_case, timestamp, VERDICT_FAIL, log_content, duration, case_id, parsed)
+        self.failure_count += 1
+        self.update_case_duration(err_case, duration)
+        self.update_case_statistics(err_case, False, duration)
 
-    def save_success_result(self, timestamp, case_name, log_content):
+    def save_success_result(self, timestamp, case_name, log_content, duration=None, case_id=None):
         """保存成功测试用例运行结果
 
         Args:
             timestamp: 时间戳
             case_name: 成功测例名称
             log_content: 日志内容
+            duration: 测例运行时长(秒)
+            case_id: 测例ID
+        """
+        self.store.append(case_name, timestamp, VERDICT_PASS, log_content, duration, case_id)
+        self.success_count += 1
+        self.update_case_duration(case_name, duration)
+        self.update_case_statistics(case_name, True, duration)
+
+    def update_case_duration(self, case_name, duration):
+        """更新测例运行时长的滑动平均
+
+        Args:
+            case_name: 测例名称
+            duration: 本次运行时长(秒)，为None时忽略
         """
-        self.success_timestamp.append(timestamp)
-        self.success_case_name.append(case_name)
-        self.success_log_content.append(log_content)
+        if duration is None:
+            return
+
+        average = self.case_durations.get(case_name)
+        if average is None:
+            self.case_durations[case_name] = duration
+        else:
+            self.case_durations[case_name] = average + self.DURATION_ALPHA * (duration - average)
+
+    def get_case_duration(self, case_name):
+        """获取测例运行时长的滑动平均
+
+        Args:
+            case_name: 测例名称
+
+        Returns:
+            float: 平均运行时长(秒)，没有记录时返回None
+        """
+        return self.case_durations.get(case_name)
+
+    def update_case_statistics(self, case_name, passed, duration):
+        """更新测例的运行统计
+
+        Args:
+            case_name: 测例名称
+            passed: 是否通过
+            duration: 本次运行时长(秒)，为None时不计入时长统计
+        """
+        statistics = self.case_statistics.get(case_name)
+        if statistics is None:
+            statistics = self.case_statistics[case_name] = CaseStatistics()
+        statistics.add(passed, duration)
+
+    def duration_count(self, case_name):
+        """本次运行中测例有运行时长记录的次数"""
+        statistics = self.case_statistics.get(case_name)
+        return statistics.duration_count if statistics is not None else 0
+
+    def get_case_statistics(self, case_name=None):
+        """获取测例的运行统计，运行中可随时调用
+
+        Args:
+            case_name: 测例名称，为None时返回全部测例
+
+        Returns:
+            dict: 单个测例的统计(见CaseStatistics.as_dict)，没有记录时返回None；
+                case_name为None时返回测例名称到统计的映射
+        """
+        if case_name is not None:
+            statistics = self.case_statistics.get(case_name)
+            return statistics.as_dict() if statistics is not None else None
+        return {name: statistics.as_dict() for name, statistics in self.case_statistics.items()}
+
+    def merge(self, other):
+        """合并另一个解析器中的测试结果，用于汇总多个设备的运行结果
+
+        Args:
+            other: 另一个CaseResultParser
+        """
+        # 多个设备共用一个存储时结果已在其中
+        if other.store is not self.store:
+            self.store.copy_from(other.store, other.start_id)
+        self.success_count += other.success_count
+        self.failure_count += other.failure_count
+
+        # 同一测例在多个设备上运行时按各自的运行次数加权平均
+        for case_name, duration in other.case_durations.items():
+            average = self.case_durations.get(case_name)
+            if average is None:
+                self.case_durations[case_name] = duration
+                continue
+            weight = self.duration_count(case_name)
+            other_weight = other.duration_count(case_name)
+            if weight + other_weight:
+                self.case_durations[case_name] = (average * weight + duration * other_weight) / (weight + other_weight)
+
+        for case_name, statistics in other.case_statistics.items():
+            if case_name in self.case_statistics:
+                self.case_statistics[case_name].merge(statistics)
+            else:
+                merged = self.case_statistics[case_name] = CaseStatistics()
+                merged.merge(statistics)
 
     def get_statistics(self):
         """获取测试结果统计信息"""
-        total_count = len(self.failure_timestamp) + len(self.success_timestamp)
-        success_count = len(self.success_timestamp)
-        failure_count = len(self.failure_timestamp)
+        success_count = self.success_count
+        failure_count = self.failure_count
+        total_count = success_count + failure_count
         success_rate = (success_count / total_count * 100) if total_count > 0 else 0
         
         return {
@@ -66,135 +194,186 @@ class CaseResultParser():
             'success_rate': success_rate
         }
 
+    @staticmethod
+    def parse_log(log_content):
+        """
+        解析失败测例的日志，格式为"表头;数据行;数据行..."，字段以逗号分隔
+
+        Args:
+            log_content: 日志内容
+
+        Returns:
+            tuple: (表头字段元组, 数据行字段元组的列表)，日志不足两段时返回None
+        """
+        # 直接解析原始log_content（移除多余的分号拼接，避免分割错误）
+        # 过滤空字符串 + 处理末尾分号
+        log_parts = [part.strip() for part in log_content.split(';') if part.strip()]
+
+        if len(log_parts) < 2:
+            return None
+
+        # 解析表头和数据
+        error_info = tuple(field.strip() for field in log_parts[0].split(','))
+        field_count = len(error_info)
+
+        error_records = []
+        for row_idx, data_str in enumerate(log_parts[1:]):
+            data_values = tuple(value.strip() for value in data_str.split(','))
+
+            # 校验字段数量
+            if len(data_values) != field_count:
+                print(f"警告: 第{row_idx+1}行数据字段不匹配（期望{field_count}个，实际{len(data_values)}个）- {data_str}")
+                continue
+
+            error_records.append(data_values)
+
+        return error_info, error_records
+
+    def iter_failure_records(self, after_id=None):
+        """
+        按写入顺序逐个读取失败测例保存时解析好的日志，每次只从数据库读取一批结果
+
+        Args:
+            after_id: 只读取id大于该值的结果，默认为本次运行的全部结果
+
+        Yields:
+            tuple: (结果id, 时间戳, 测例名称, 表头字段元组, 数据行字段元组的列表)
+        """
+        if after_id is None:
+            after_id = self.start_id
+        for result_id, err_case, timestamp, error_info, error_records in self.store.iter_parsed_failures(after_id):
+            yield result_id, timestamp, err_case, error_info, error_records
+
     def parse_all_case_results(self):
         """
         解析所有已保存的测试用例运行结果，返回按测例分组的错误记录
         """
         grouped_error_records = {}
-        
+
         # 处理失败的测试用例
-        for idx, (timestamp, err_case, log_content) in enumerate(zip(self.failure_timestamp, self.failure_err_case, self.failure_log_content)):
+        for idx, (_, timestamp, err_case, error_info, error_records) in enumerate(self.iter_failure_records()):
             unique_key = f"failure_{timestamp}_{idx}"
-
-            case_name = f"错误测例{err_case}"  # 添加"错误测例"前缀
-            
-            # 直接解析原始log_content（移除多余的分号拼接，避免分割错误）
-            # 过滤空字符串 + 处理末尾分号
-            log_parts = [part.strip() for part in log_content.split(';') if part.strip()]
-            
-            if len(log_parts) < 2:
-                continue
-            
-            # 3. 解析表头和数据
-            header_str = log_parts[0]
-            error_info = [field.strip() for field in header_str.split(',')]
-            field_count = len(error_info)
-            data_rows = log_parts[1:]
-            
-            # 4. 初始化测例记录
             grouped_error_records[unique_key] = {
                 'timestamp': timestamp,
-                'case_name': case_name,
-                'error_info': error_info,
-                'error_records': []
+                'case_name': f"错误测例{err_case}",  # 添加"错误测例"前缀
+                'error_info': list(error_info),
+                'error_records': [dict(zip(error_info, values)) for values in error_records]
             }
-            
-            # 5. 解析每一行数据
-            for row_idx, data_str in enumerate(data_rows):
-                data_values = [value.strip() for value in data_str.split(',')]
-                
-                # 校验字段数量
-                if len(data_values) != field_count:
-                    print(f"警告: 第{row_idx+1}行数据字段不匹配（期望{field_count}个，实际{len(data_values)}个）- {data_str}")
-                    continue
-                
-                # 构建数据记录
-                record = dict(zip(error_info, data_values))
-                grouped_error_records[unique_key]['error_records'].append(record)
-        
+
         # 处理成功的测试用例
-        for idx, (timestamp, case_name, log_content) in enumerate(zip(self.success_timestamp, self.success_case_name, self.success_log_content)):
+        successes = self.store.iter_results(VERDICT_PASS, self.start_id)
+        for idx, (_, _, case_name, _, timestamp, _, _, _) in enumerate(successes):
             unique_key = f"success_{timestamp}_{idx}"
 
-            case_name_formatted = f"正确测例{case_name}"  # 添加"正确测例"前缀
-            
             # 为成功记录创建简单的条目，格式为：时间、正确测例
             grouped_error_records[unique_key] = {
                 'timestamp': timestamp,
-                'case_name': case_name_formatted,
+                'case_name': f"正确测例{case_name}",  # 添加"正确测例"前缀
                 'error_info': [],  # 成功记录不需要额外的状态和说明列
                 'error_records': [{}]  # 空记录，因为不需要状态和说明
             }
-        
+
         return grouped_error_records
 
-    def export_csv(self, file_path):
+    def iter_csv_rows(self, after_id=None):
+        """
+        按写入顺序逐个生成失败测例的CSV行，不保留已生成的行
+
+        Args:
+            after_id: 只生成id大于该值的结果，默认为本次运行的全部结果
+
+        Yields:
+            tuple: (结果id, 一个失败测例的全部CSV行，包括末尾的分隔空行)
+        """
+        for result_id, timestamp, err_case, error_info, error_records in self.iter_failure_records(after_id):
+            # 失败案例：时间 + 错误测例 + 自定义字段
+            rows = [
+                ['时间', '错误测例'] + list(error_info),
+                # 第二行：时间戳 + 测例名（后续列空）
+                [timestamp, f"错误测例{err_case}"] + [''] * len(error_info)
+            ]
+
+            # 数据行：前两列空，填充数据
+            for values in error_records:
+                data_row = ['', '']
+                for value in values:
+                    # 检查值是否为纯数字且长度较长，如果是则在值前添加制表符以确保Excel将其视为文本
+                    data_row.append('\t' + str(value) if self.format_as_text(value) else value)
+                rows.append(data_row)
+
+            # 测例间分隔（空行）
+            rows.append([])
+            rows.append([])
+            yield result_id, rows
+
+    def update_csv_cache(self, progress=None):
+        """
+        把上次导出后新增的失败结果渲染为CSV行，追加到缓存文件
+
+        Args:
+            progress: 进度回调，参数为(已渲染的失败记录数, 失败记录总数)
+        """
+        if self.csv_cache is None:
+            self.csv_cache = io.TextIOWrapper(
+                tempfile.TemporaryFile(buffering=self.CSV_BUFFER_SIZE), encoding='utf-8', newline=''
+            )
+        self.csv_cache.seek(0, io.SEEK_END)
+        writer = csv.writer(self.csv_cache)
+        for result_id, rows in self.iter_csv_rows(self.exported_id):
+            writer.writerows(rows)
+            self.exported_id = result_id
+            self.exported_count += 1
+            if progress is not None and self.exported_count % self.EXPORT_PROGRESS_STEP == 0:
+                progress(self.exported_count, self.failure_count)
+        self.csv_cache.flush()
+
+    def export_csv(self, file_path, progress=None):
         """
         导出所有错误记录到CSV文件
+
+        失败记录按写入顺序（即时间顺序）从数据库分批读取，渲染后的CSV行缓存在临时文件中，
+        重复导出时只读取和渲染上次导出后新增的记录，已有的记录按字节复制。内存占用与记录数量无关。
+
+        Args:
+            file_path: CSV文件路径
+            progress: 进度回调，参数为(已导出的失败记录数, 失败记录总数)
         """
+        # 先渲染新增的失败记录
+        self.update_csv_cache(progress)
+
         # 先写入统计信息
         stats = self.get_statistics()
-        
-        with open(file_path, 'w', newline='', encoding='utf-8-sig') as csvfile:
+
+        with open(file_path, 'w', newline='', encoding='utf-8-sig', buffering=self.CSV_BUFFER_SIZE) as csvfile:
             writer = csv.writer(csvfile)
-            
+
             # 写入统计信息行 - 按要求格式化
             writer.writerow(['总测例数', '成功个数', '失败个数', '成功率'])
             writer.writerow([stats['total_count'], stats['success_count'], stats['failure_count'], f"{stats['success_rate']:.2f}%"])
             writer.writerow([]) # 空行分隔
-            
-            # 获取详细结果
-            grouped_error_records = self.parse_all_case_results()
-            
-            if not grouped_error_records:
-                return
-            
-            # 将所有记录按时间戳排序
-            sorted_records = sorted(grouped_error_records.items(), key=lambda x: x[1]['timestamp'])
-            
-            for _, case_data in sorted_records:
-                # 根据记录前缀判断是成功还是失败案例
-                is_success_case = case_data['case_name'].startswith('正确测例')
-                
-                if is_success_case:
-                    # 如果不保留正确信息，直接跳过成功案例
-                    continue
-
-                    # 成功案例：只需要时间、正确测例两列
-                    header_row = ['时间', '正确测例']
-                    writer.writerow(header_row)
-                    
-                    # 数据行：时间戳 + 测例名（去掉"正确测例"前缀）
-                    time_case_row = [case_data['timestamp'], case_data['case_name'][4:]]
-                    writer.writerow(time_case_row)
-                else:
-                    # 失败案例：时间 + 错误测例 + 自定义字段
-                    header_row = ['时间', '错误测例'] + case_data['error_info']
-                    writer.writerow(header_row)
-                    
-                    # 第二行：时间戳 + 测例名（后续列空）
-                    time_case_row = [case_data['timestamp'], case_data['case_name']] + [''] * len(case_data['error_info'])
-                    writer.writerow(time_case_row)
-                    
-                    # 数据行：前两列空，填充数据
-                    for record in case_data['error_records']:
-                        data_row = ['', ''] # 前两列空
-                        for field in case_data['error_info']:
-                            value = record.get(field, '')
-
-                            # 检查值是否为纯数字且长度较长，如果是则转换为文本格式
-                            if self.format_as_text(value):
-                                # 在值前添加制表符以确保Excel将其视为文本
-                                formatted_value = '\t' + str(value)
-                            else:
-                                formatted_value = value
-                            data_row.append(formatted_value)
-                        writer.writerow(data_row)
-                
-                # 测例间分隔（空行）
-                writer.writerow([])
+
+            # 各测例的运行统计，运行时长单位为秒
+            if self.case_statistics:
+                writer.writerow(['测例', '运行次数', '成功个数', '失败个数', '成功率', '当前连续失败', '最长连续失败',
+                                 '首次失败时间', '最近失败时间', '最短时长', '平均时长', 'P50时长', 'P95时长', 'P99时长'])
+                for case_name, case_stats in self.get_case_statistics().items():
+                    writer.writerow([
+                        case_name, case_stats['total_count'], case_stats['pass_count'], case_stats['fail_count'],
+                        f"{case_stats['pass_rate']:.2f}%", case_stats['fail_streak'], case_stats['max_fail_streak'],
+                        case_stats['first_failure'], case_stats['last_failure'],
+                        *(self.format_duration(case_stats[key]) for key in
+                          ('duration_min', 'duration_mean', 'duration_p50', 'duration_p95', 'duration_p99'))
+                    ])
                 writer.writerow([])
 
+            # 成功案例不写入CSV，只导出失败案例，直接复制缓存文件的内容
+            csvfile.flush()
+            self.csv_cache.buffer.seek(0)
+            shutil.copyfileobj(self.csv_cache.buffer, csvfile.buffer, self.CSV_BUFFER_SIZE)
+
+        if progress is not None:
+            progress(self.exported_count, self.failure_count)
+
     # def export_pdf(self, file_path):
     #     """
     #     导出所有错误记录到PDF文件
@@ -292,6 +471,10 @@ class CaseResultParser():
     #     # 保存PDF
     #     doc.save()
 
+    def format_duration(self, duration):
+        """运行时长(秒)格式化为CSV中的文本，没有记录时为空"""
+        return f"{duration:.3f}" if duration is not None else ''
+
     def format_as_text(self, value):
         """
         判断值是否应该格式化为文本格式
@@ -8,23 +8,57 @@ description: 窗口类，负责处理日志显示、保存、清除、导出等
 """
 
 import datetime
+import logging
 import os
+import queue
 import stat
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from PySide6.QtWidgets import QWidget, QMessageBox, QFileDialog, QMenu
 from PySide6.QtGui import QTextCursor, QTextCharFormat, QColor, QAction
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
+
+# 完整日志文件所在目录
+LOG_DIR = "logs"
 
 class LogWindow(QWidget):
     """
     日志窗口类，负责处理日志显示、保存、清除等操作
+
+    日志框只保留最近max_lines行，更早的行由QTextDocument自动丢弃，每条日志的显示开销
+    不随运行时间增长；完整日志写入LOG_DIR下按大小轮转的日志文件。
+
+    log只把日志记录放入队列，定时器每FLUSH_INTERVAL_MS毫秒在一个编辑块中把队列中的记录
+    一次性插入日志框并滚动一次，连续大量日志时不会阻塞事件循环。
     """
 
-    def __init__(self, application, case_result_parser):
+    # 日志框保留的最大行数
+    MAX_LOG_LINES = 5000
+
+    # 日志文件的最大字节数和保留的历史文件个数
+    LOG_FILE_MAX_BYTES = 10 * 1024 * 1024
+    LOG_FILE_BACKUP_COUNT = 10
+
+    # 日志框刷新间隔(毫秒)
+    FLUSH_INTERVAL_MS = 50
+
+    # 各消息状态的文字颜色
+    STATE_COLORS = {
+        0: 'black',  # 普通消息
+        1: 'green',  # 成功消息
+        2: 'red',    # 错误消息
+        3: 'blue',   # 加载中消息
+    }
+
+    def __init__(self, application, case_result_parser, max_lines=MAX_LOG_LINES, log_dir=LOG_DIR):
         """
         初始化日志窗口
         
         Args:
             application: 主应用程序实例
+            case_result_parser: 测例结果解析器，用于导出
+            max_lines (int): 日志框保留的最大行数，为0时不限制
+            log_dir (str): 完整日志文件所在目录，为None时不写入文件
         """
         super().__init__()
         # 保存UI界面引用和应用程序实例
@@ -33,6 +67,31 @@ class LogWindow(QWidget):
 
         self.case_result_parser = case_result_parser
 
+        # 日志框只保留最近的行
+        self.set_max_lines(max_lines)
+
+        # 等待显示的日志记录 (时间, 消息, 状态)
+        self.pending = deque()
+
+        # 复用的文本格式，时间戳为蓝色，消息内容按状态着色
+        self.time_format = QTextCharFormat()
+        self.time_format.setForeground(QColor('blue'))
+        self.content_formats = {}
+        for state, color in self.STATE_COLORS.items():
+            content_format = QTextCharFormat()
+            content_format.setForeground(QColor(color))
+            self.content_formats[state] = content_format
+
+        # 批量刷新日志框的定时器，有待显示的日志时才启动
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self.flush_timer.timeout.connect(self.flush_log)
+
+        # 完整日志写入轮转的日志文件，由后台线程写入
+        self.file_listener = None
+        self.file_logger = self.create_file_logger(log_dir)
+
         # 设置日志文本框的右键菜单策略
         self.ui.text_log.setContextMenuPolicy(Qt.CustomContextMenu)
         self.ui.text_log.customContextMenuRequested.connect(self.show_text_log_menu)
@@ -40,6 +99,63 @@ class LogWindow(QWidget):
         # 设置信号连接
         self.setup_connect()
 
+    def set_max_lines(self, max_lines):
+        """
+        设置日志框保留的最大行数，超出时丢弃最早的行
+
+        Args:
+            max_lines (int): 最大行数，为0时不限制
+        """
+        self.max_lines = max_lines
+        self.ui.text_log.document().setMaximumBlockCount(max_lines)
+
+    def create_file_logger(self, log_dir):
+        """
+        创建写入轮转日志文件的logger
+
+        logger只把记录放入队列，由QueueListener的后台线程写入文件和检查轮转，GUI线程不做文件IO。
+
+        Args:
+            log_dir (str): 日志文件所在目录，为None时返回None
+
+        Returns:
+            logging.Logger: 文件logger
+        """
+        if log_dir is None:
+            return None
+
+        logger = logging.getLogger(f"{__name__}.file")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        if not logger.handlers:
+            os.makedirs(log_dir, exist_ok=True)
+            handler = RotatingFileHandler(
+                os.path.join(log_dir, "debug_tool.log"),
+                maxBytes=self.LOG_FILE_MAX_BYTES,
+                backupCount=self.LOG_FILE_BACKUP_COUNT,
+                encoding='utf-8'
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            records = queue.SimpleQueue()
+            logger.addHandler(QueueHandler(records))
+            self.file_listener = QueueListener(records, handler)
+            self.file_listener.start()
+        return logger
+
+    def close_file_logger(self):
+        """
+        写完队列中的日志记录并停止写入线程，关闭日志文件
+        """
+        if self.file_listener is None:
+            return
+        self.file_listener.stop()
+        for handler in self.file_logger.handlers[:]:
+            self.file_logger.removeHandler(handler)
+            handler.close()
+        for handler in self.file_listener.handlers:
+            handler.close()
+        self.file_listener = None
+
     def setup_connect(self):
         """
         设置按钮信号与槽函数的连接
@@ -68,7 +184,28 @@ class LogWindow(QWidget):
         """
         # 获取当前时间并格式化为年-月-日 时:分:秒格式
         current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
+
+        # 完整日志放入文件写入队列
+        if self.file_logger is not None:
+            self.file_logger.info(f"[{current_time}]: {message}")
+
+        # 放入队列，由定时器批量显示
+        self.pending.append((current_time, message, state))
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def flush_log(self):
+        """
+        把队列中的日志记录在一个编辑块中插入日志框，插入后滚动一次
+        """
+        if not self.pending:
+            return
+
+        # 超出保留行数的记录插入后也会被丢弃，直接跳过
+        if self.max_lines and len(self.pending) > self.max_lines:
+            for _ in range(len(self.pending) - self.max_lines):
+                self.pending.popleft()
+
         # 获取日志文本框的光标对象，用于控制文本插入位置和格式
         cursor = self.ui.text_log.textCursor()
 
@@ -76,34 +213,15 @@ class LogWindow(QWidget):
         if not cursor.atEnd():
             cursor.movePosition(QTextCursor.End)
 
-        # 创建时间戳文本格式对象，设置为蓝色字体
-        time_format = QTextCharFormat()
-        time_format.setForeground(QColor('blue'))
-        # 应用时间戳格式并插入时间戳文本
-        cursor.setCharFormat(time_format)
-        cursor.insertText(f"[{current_time}]:")
-
-        # 根据消息状态创建内容文本格式对象
-        content_format = QTextCharFormat()
-        if state == 0:
-            # 状态0：默认黑色字体
-            content_format.setForeground(QColor('black'))
-        elif state == 1:
-            # 状态1：绿色字体（表示成功）
-            content_format.setForeground(QColor('green'))
-        elif state == 2:
-            # 状态2：红色字体（表示错误）
-            content_format.setForeground(QColor('red'))
-        elif state == 3:
-            # 状态3：蓝色字体（表示加载中）
-            content_format.setForeground(QColor('blue'))
-
-        # 应用内容格式并插入消息内容和换行符
-        cursor.setCharFormat(content_format)
-        cursor.insertText(f" {message}\n")
-
-        # print(f"需要发送的消息:{message}")
-        
+        cursor.beginEditBlock()
+        while self.pending:
+            current_time, message, state = self.pending.popleft()
+
+            # 插入蓝色时间戳，再按消息状态插入消息内容和换行符
+            cursor.insertText(f"[{current_time}]:", self.time_format)
+            cursor.insertText(f" {message}\n", self.content_formats.get(state, self.content_formats[0]))
+        cursor.endEditBlock()
+
         # 更新文本框的光标位置，确保新消息可见
         self.ui.text_log.setTextCursor(cursor)
 
@@ -143,13 +261,17 @@ class LogWindow(QWidget):
             )
             # 如果用户确认清除，则清空日志文本框
             if reply == QMessageBox.StandardButton.Ok:
+                self.pending.clear()
                 self.ui.text_log.clear()
 
     def log_save(self):
         """
         保存日志内容到文件
         """
-        # 获取日志文本内容
+        # 先显示队列中的日志
+        self.flush_log()
+
+        # 获取日志文本内容，日志框只有最近max_lines行，完整日志见LOG_DIR下的日志文件
         log_content = self.ui.text_log.toPlainText()
 
         # 弹出文件保存对话框，让用户选择保存路径
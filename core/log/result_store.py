@@ -0,0 +1,367 @@
+#!/usr/bin/env python3.13
+"""
+filename: result_store.py
+author: [peixuSu]
+email: [1420209272@qq.com]
+date: 2026-10-18
+description: 测例结果持久化存储，基于sqlite3(WAL模式)只追加写入，每次测例执行一行
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+# 测例结果
+VERDICT_PASS = 0
+VERDICT_FAIL = 1
+
+# 每行的列顺序，与iter_results/query返回的元组一致
+COLUMNS = ("id", "case_id", "case_name", "created_at", "timestamp", "duration", "verdict", "log")
+
+# 写入时的列顺序，header_id和log_rows为失败日志解析后的表头序号和数据行
+INSERT_COLUMNS = ("case_id", "case_name", "created_at", "timestamp", "duration", "verdict", "log", "header_id", "log_rows")
+
+# 解析后数据行的保存格式：行之间以RS分隔，字段之间以US分隔
+ROW_SEPARATOR = "\x1e"
+FIELD_SEPARATOR = "\x1f"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    case_id INTEGER,
+    case_name TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    timestamp TEXT NOT NULL,
+    duration REAL,
+    verdict INTEGER NOT NULL,
+    log BLOB,
+    header_id INTEGER,
+    log_rows TEXT
+);
+CREATE TABLE IF NOT EXISTS log_headers (
+    id INTEGER PRIMARY KEY,
+    fields TEXT NOT NULL UNIQUE
+);
+CREATE INDEX IF NOT EXISTS idx_results_case ON results (case_name, created_at);
+CREATE INDEX IF NOT EXISTS idx_results_time ON results (created_at);
+"""
+
+
+class ResultStore:
+    """
+    测例结果存储
+
+    结果先放入写缓冲，缓冲达到batch_size行或距上次写入超过flush_interval秒时在一个事务中
+    批量插入。数据库文件使用WAL模式，并由后台线程每flush_interval秒写入一次缓冲，运行停止或
+    空闲时缓冲中的结果也会及时写入，程序崩溃时最多丢失最近flush_interval秒的结果。path为
+    ":memory:"时使用内存数据库，用于不需要持久化的场合，不启动后台线程。多个线程可共用一个存储。
+
+    失败日志在写入时由调用方解析一次，表头字段元组单独保存在log_headers表中由所有结果共用，
+    数据行以ASCII分隔符连接后保存（见encode_rows），读取时只需两次split，不再读取和拆分原始日志。
+    iter_parsed_failures按id增量读取，调用方记住已读取的最大id即可只读取新增的结果。
+    """
+
+    def __init__(self, path=":memory:", batch_size=100, flush_interval=1.0, clock=time.time):
+        """
+        打开或创建结果数据库
+
+        Args:
+            path (str): 数据库文件路径，":memory:"为内存数据库
+            batch_size (int): 写缓冲的最大行数
+            flush_interval (float): 写缓冲的最长停留时间（秒）
+            clock: 返回当前时间（秒，Unix时间）的函数，用于记录结果时间
+        """
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+        # 表头字段元组与序号的双向映射
+        self._headers = {}
+        self._header_ids = {}
+        for header_id, fields in self._conn.execute("SELECT id, fields FROM log_headers"):
+            header = tuple(json.loads(fields))
+            self._headers[header_id] = header
+            self._header_ids[header] = header_id
+
+        # 写缓冲和上次写入时间
+        self._pending = []
+        self._last_flush = time.monotonic()
+
+        # 定时写入缓冲的后台线程，close时停止
+        self._closed = threading.Event()
+        self._flusher = None
+        if path != ":memory:" and flush_interval > 0:
+            self._flusher = threading.Thread(target=self._flush_loop, name="ResultStoreFlush", daemon=True)
+            self._flusher.start()
+
+    def append(self, case_name, timestamp, verdict, log="", duration=None, case_id=None, parsed=None):
+        """
+        追加一条测例执行结果
+
+        Args:
+            case_name (str): 测例名称
+            timestamp (str): 显示用的时间戳
+            verdict (int): VERDICT_PASS或VERDICT_FAIL
+            log (str): 原始日志内容
+            duration (float, optional): 运行时长（秒）
+            case_id (bytes or int, optional): 测例ID，bytes按2字节大端解析
+            parsed (tuple, optional): 解析后的日志(表头字段, 数据行列表)
+        """
+        if isinstance(case_id, (bytes, bytearray)):
+            case_id = int.from_bytes(case_id, 'big')
+        self._append((case_id, case_name, self.clock(), timestamp, duration, verdict), log, parsed)
+
+    def _append(self, values, log, parsed):
+        blob = log.encode('utf-8') if log else None
+        log_rows = encode_rows(parsed[1]) if parsed is not None else None
+
+        with self._lock:
+            header_id = self._header_id(parsed[0]) if parsed is not None else None
+            self._pending.append(values + (blob, header_id, log_rows))
+            if (len(self._pending) >= self.batch_size
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self._flush()
+
+    def _header_id(self, header):
+        """返回表头字段元组的序号，新表头写入log_headers表"""
+        header = tuple(header)
+        header_id = self._header_ids.get(header)
+        if header_id is None:
+            header_id = len(self._headers) + 1
+            self._conn.execute(
+                "INSERT INTO log_headers (id, fields) VALUES (?, ?)",
+                (header_id, json.dumps(header, ensure_ascii=False))
+            )
+            self._headers[header_id] = header
+            self._header_ids[header] = header_id
+        return header_id
+
+    def _flush_loop(self):
+        """后台线程：每flush_interval秒写入一次缓冲，直到close"""
+        while not self._closed.wait(self.flush_interval):
+            with self._lock:
+                if self._closed.is_set():
+                    return
+                self._flush()
+
+    def flush(self):
+        """把写缓冲中的结果写入数据库"""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT INTO results ({', '.join(INSERT_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(INSERT_COLUMNS))})",
+                self._pending
+            )
+        self._pending = []
+
+    def close(self):
+        """写入缓冲中的结果并关闭数据库"""
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        with self._lock:
+            self._flush()
+            self._conn.close()
+
+    def count(self, verdict=None):
+        """
+        统计结果行数
+
+        Args:
+            verdict (int, optional): 只统计指定结果，为None时统计全部
+
+        Returns:
+            int: 行数
+        """
+        self.flush()
+        with self._lock:
+            if verdict is None:
+                row = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()
+            else:
+                row = self._conn.execute("SELECT COUNT(*) FROM results WHERE verdict = ?", (verdict,)).fetchone()
+        return row[0]
+
+    def last_id(self):
+        """
+        最后一条结果的id
+
+        Returns:
+            int: 最大的结果id，数据库为空时返回0
+        """
+        self.flush()
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(id) FROM results").fetchone()
+        return row[0] or 0
+
+    def recent_durations(self, limit):
+        """
+        最近limit条带运行时长的结果，按写入顺序返回
+
+        Args:
+            limit (int): 最多返回的行数
+
+        Returns:
+            list: (测例名称, 运行时长(秒))元组
+        """
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT case_name, duration FROM results WHERE duration IS NOT NULL ORDER BY id DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        rows.reverse()
+        return rows
+
+    def query(self, case_name=None, since=None, until=None, verdict=None, after_id=0, limit=None):
+        """
+        按测例和时间查询结果，按写入顺序返回
+
+        Args:
+            case_name (str, optional): 测例名称
+            since (float, optional): 起始时间（Unix时间，含）
+            until (float, optional): 结束时间（Unix时间，不含）
+            verdict (int, optional): VERDICT_PASS或VERDICT_FAIL
+            after_id (int): 只返回id大于该值的结果，用于增量读取
+            limit (int, optional): 最多返回的行数
+
+        Returns:
+            list: 结果行元组，列顺序见COLUMNS，日志已解码为字符串
+        """
+        conditions = ["id > ?"]
+        params = [after_id]
+        if case_name is not None:
+            conditions.append("case_name = ?")
+            params.append(case_name)
+        if since is not None:
+            conditions.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("created_at < ?")
+            params.append(until)
+        if verdict is not None:
+            conditions.append("verdict = ?")
+            params.append(verdict)
+
+        sql = f"SELECT {', '.join(COLUMNS)} FROM results WHERE {' AND '.join(conditions)} ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._decode(row) for row in rows]
+
+    def iter_results(self, verdict=None, after_id=0, batch=1000):
+        """
+        按写入顺序逐行遍历结果，每次只从数据库读取batch行
+
+        Args:
+            verdict (int, optional): 只遍历指定结果
+            after_id (int): 只遍历id大于该值的结果
+            batch (int): 每次读取的行数
+
+        Yields:
+            tuple: 结果行，列顺序见COLUMNS
+        """
+        last_id = after_id
+        while True:
+            rows = self.query(verdict=verdict, after_id=last_id, limit=batch)
+            if not rows:
+                return
+            yield from rows
+            last_id = rows[-1][0]
+
+    def iter_parsed_failures(self, after_id=0, batch=1000):
+        """
+        按写入顺序遍历失败结果的解析后日志，不读取原始日志，日志无法解析的结果被跳过
+
+        Args:
+            after_id (int): 只遍历id大于该值的结果
+            batch (int): 每次读取的行数
+
+        Yields:
+            tuple: (id, 测例名称, 时间戳, 表头字段元组, 数据行列表)，同一表头的结果共用一个元组
+        """
+        last_id = after_id
+        while True:
+            self.flush()
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, case_name, timestamp, header_id, log_rows FROM results "
+                    "WHERE id > ? AND verdict = ? ORDER BY id LIMIT ?",
+                    (last_id, VERDICT_FAIL, batch)
+                ).fetchall()
+                headers = self._headers
+            if not rows:
+                return
+            for result_id, case_name, timestamp, header_id, log_rows in rows:
+                if header_id is not None:
+                    yield result_id, case_name, timestamp, headers[header_id], decode_rows(log_rows)
+            last_id = rows[-1][0]
+
+    def copy_from(self, other, after_id=0):
+        """
+        复制另一个存储中的结果，用于汇总多个设备的运行结果
+
+        Args:
+            other (ResultStore): 另一个结果存储
+            after_id (int): 只复制id大于该值的结果
+        """
+        parsed = {
+            result_id: (header, log_rows)
+            for result_id, _, _, header, log_rows in other.iter_parsed_failures(after_id)
+        }
+        for row in other.iter_results(after_id=after_id):
+            self._append(row[1:7], row[7], parsed.pop(row[0], None))
+        self.flush()
+
+    @staticmethod
+    def _decode(row):
+        log = row[-1]
+        return row[:-1] + (log.decode('utf-8') if log is not None else "",)
+
+
+def encode_rows(rows):
+    """
+    解析后的数据行编码为保存用的文本
+
+    Args:
+        rows (list): 数据行字段元组的列表，字段中不能含有ROW_SEPARATOR和FIELD_SEPARATOR
+
+    Returns:
+        str: 编码后的文本
+    """
+    return ROW_SEPARATOR.join(FIELD_SEPARATOR.join(values) for values in rows)
+
+
+def decode_rows(text):
+    """
+    解码encode_rows保存的文本
+
+    Args:
+        text (str): 编码后的文本
+
+    Returns:
+        list: 数据行字段元组的列表
+    """
+    if not text:
+        return []
+    return [tuple(row.split(FIELD_SEPARATOR)) for row in text.split(ROW_SEPARATOR)]
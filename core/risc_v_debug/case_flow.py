@@ -0,0 +1,105 @@
+#!/usr/bin/env python3.13
+"""
+filename: case_flow.py
+author: [peixuSu]
+email: [1420209272@qq.com]
+date: 2026-10-18
+description: 测例执行流程的状态、超时配置和轮询策略，不依赖Qt，供界面和命令行共用
+"""
+
+# 测例执行状态
+STATE_IDLE = "Idle"                # 未开始
+STATE_WAIT_ACK = "WaitAck"         # 已发送RunCase，等待Ack
+STATE_WAIT_RESULT = "WaitResult"   # 已发送GetCaseResult，等待CaseResult/CaseRunning
+STATE_RUNNING = "Running"          # 测例运行中，等待下一次查询结果
+STATE_WAIT_LOG = "WaitLog"         # 已发送GetLog，等待LogSending/LogFinished
+STATE_DONE = "Done"                # 流程完成
+STATE_FAILED = "Failed"            # 流程出错
+STATE_STOPPED = "Stopped"          # 被用户停止
+
+# 测例执行的超时时间和间隔(毫秒)
+CASE_TIMEOUTS = {
+    "ack": 1000,            # 等待Ack的时限
+    "result": 1000,         # 每次等待CaseResult/CaseRunning应答的时限
+    "log": 1000,            # 每次等待日志分片的时限
+    "case": 200000,         # 单个测例从RunCase到出结果的总时限
+    "poll": 10,             # 未收到完整帧时重新读取的间隔
+    "running_poll_min": 5,      # 收到CaseRunning后再次查询结果的最短间隔
+    "running_poll_max": 2000,   # 收到CaseRunning后再次查询结果的最长间隔
+    "running_poll_factor": 2,   # 查询间隔的退避倍数
+    "retry": 100,           # 出错后重发请求的间隔
+    "retries": 3,           # 单个请求的最大重试次数
+    "case_gap": 0,          # 两个测例之间的间隔
+}
+
+
+class AdaptivePolling:
+    """
+    CaseRunning自适应轮询策略
+
+    首次查询间隔由测例的历史平均运行时长决定（等到预计完成时刻，可超过最长间隔，由调用方
+    限制在测例总时限内），之后按倍数指数退避，间隔不超过上限。短测例在毫秒级得到结果，
+    长测例不会频繁占用总线。
+    """
+
+    # 有历史记录时，基础间隔取历史时长的比例
+    BASE_FRACTION = 0.1
+
+    def __init__(self, min_interval, max_interval, factor=2, expected_duration=None):
+        """
+        初始化轮询策略
+
+        Args:
+            min_interval (int): 最短间隔(毫秒)
+            max_interval (int): 最长间隔(毫秒)
+            factor (float): 退避倍数
+            expected_duration (float): 测例历史平均运行时长(秒)，没有记录时为None
+        """
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.factor = factor
+        self.expected_ms = expected_duration * 1000 if expected_duration is not None else None
+
+        # 基础间隔按历史时长缩放，避免长测例在完成前后以最短间隔轮询
+        base = min_interval
+        if self.expected_ms is not None:
+            base = max(base, self.expected_ms * self.BASE_FRACTION)
+        self.base_interval = min(base, max_interval)
+
+        self.poll_count = 0
+
+    def next_interval(self, elapsed_ms):
+        """
+        计算下一次查询前的等待时间
+
+        Args:
+            elapsed_ms (float): 测例已运行的时间(毫秒)
+
+        Returns:
+            int: 等待时间(毫秒)
+        """
+        interval = self.base_interval * (self.factor ** self.poll_count)
+        interval = max(self.min_interval, min(interval, self.max_interval))
+
+        # 首次查询时若预计尚未完成，直接等到预计完成时刻，不受最长间隔限制
+        if self.poll_count == 0 and self.expected_ms is not None:
+            interval = max(interval, self.expected_ms - elapsed_ms)
+
+        self.poll_count += 1
+        return int(interval)
+
+
+# 各状态对应的超时配置项
+STATE_TIMEOUT_KEYS = {
+    STATE_WAIT_ACK: "ack",
+    STATE_WAIT_RESULT: "result",
+    STATE_RUNNING: "case",
+    STATE_WAIT_LOG: "log",
+}
+
+# 各状态读取应答时使用的帧长度记录键
+STATE_SIZE_KEYS = {
+    STATE_WAIT_ACK: "Ack",
+    STATE_WAIT_RESULT: "CaseResult",
+    STATE_WAIT_LOG: "Log",
+}
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3.13
+"""
+filename: case_item_widget.py
+author: [peixuSu]
+email: [1420209272@qq.com]
+date: 2025-12-02
+description: 测试用例列表中的用例项控件
+"""
+
+from PySide6.QtWidgets import (
+    QWidget, QHBoxLayout,
+    QPushButton, QLineEdit, QLabel
+)
+from PySide6.QtCore import Signal, Qt
+from .case_manager import CasePackage
+
+class CaseItemWidget(QWidget):
+    """
+    用例项控件类
+    
+    继承自QWidget，用于在界面上显示单个用例项，包含名称、输入框和发送按钮
+    """
+
+    # 点击发送按钮时发出的信号，携带打包好的帧数据和发送状态
+    send_frame = Signal(bytearray, bool, str)
+
+    # 右键删除时发出的信号，携带当前控件实例
+    delete_requested = Signal(QWidget)
+    
+    def __init__(self, name="", id=b"", mode="send", parent=None):
+        """
+        初始化用例项控件
+        
+        Args:
+            name (str): 用例名称，默认为空字符串
+            id (bytes): 用例ID，默认为空字节
+            use_crc (bool): 是否使用CRC校验，默认为False
+            mode (str): 控件模式，"send"表示发送模式，"Test"表示测试模式，默认为"send"
+            parent (QWidget): 父控件，默认为None
+        """
+        super().__init__(parent)
+
+        # 用例名称
+        self.name = name
+
+        # 用例ID
+        self.id = id
+
+        # 控件模式
+        self.mode = mode
+
+        # 初始化控件
+        self.init_widget()
+        
+    def init_widget(self, button = True, delay = False):
+        """
+        初始化测例项控件
+        
+        根据不同的模式创建不同的界面元素：
+        - 发送模式：包含名称标签、输入框和发送按钮
+        - 测试模式：包含case+id名称标签、负载输入框和删除按钮
+        """
+        # 创建水平布局
+        layout = QHBoxLayout(self)
+
+        # 设置布局边距
+        layout.setContentsMargins(5, 2, 5, 2)
+        
+        # 左侧：用例名称标签
+        if self.mode == "send":
+            self.name_text = QLabel(self.name)
+            self.name_text.setMinimumWidth(80)  # Send模式保持原来的宽度
+        elif self.mode == "Test":
+            # 在Test模式下，显示为"case+id"格式
+            id_int = int.from_bytes(self.id, byteorder='big') if self.id else 0
+            self.name_text = QLabel(f"case{id_int}")
+            self.name_text.setMaximumWidth(50)  # Test模式使用较小的宽度
+        
+        self.name_text.setMaximumHeight(35)
+        self.name_text.setStyleSheet("color: #696969; font-weight: normal; font-size: 14px;")
+        self.name_text.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
+        layout.addWidget(self.name_text, 2)
+
+        # 忽略长文本换行
+        self.name_text.setWordWrap(False)
+        self.name_text.setTextFormat(Qt.PlainText)
+        self.name_text.setTextInteractionFlags(Qt.NoTextInteraction)
+        
+        # 中间：负载数据输入框
+        self.input_payload = QLineEdit()
+        self.input_payload.setMinimumWidth(60)
+        self.input_payload.setPlaceholderText("请输入负载数据...")
+        self.input_payload.setText("1")
+        layout.addWidget(self.input_payload, 1)
+
+        # 根据模式创建不同的右侧控件
+        if self.mode == "send":
+            # 右侧：发送按钮
+            self.send_button = QPushButton("发送")
+            self.send_button.setMinimumSize(60, 25)
+            self.send_button.setStyleSheet("""
+                QPushButton {
+                    background-color: #4CAF50;
+                    color: white;
+                    border-radius: 4px;
+                    font-size: 12px;
+                }
+                QPushButton:hover {
+                    background-color: #45a049;
+                }
+                QPushButton:pressed {
+                    background-color: #3d8b40;
+                }
+            """)
+            
+            # 连接发送按钮点击信号
+            self.send_button.clicked.connect(self.send_clicked)
+            layout.addWidget(self.send_button, 1)
+
+        elif self.mode == "Test": 
+            # Test模式：只保留删除按钮，不显示延时输入框
+            self.del_button = QPushButton("-")
+            self.del_button.setMaximumSize(25, 25)
+            layout.addWidget(self.del_button, 1)
+            self.del_button.clicked.connect(self.delete_clicked)
+        
+        layout.addStretch()
+        self.setLayout(layout)
+
+    def send_clicked(self):
+        """
+        发送按钮点击事件处理函数
+        
+        获取输入的负载数据，将其转换为十六进制格式，然后打包成帧并发送
+        
+        Process:
+            1. 获取输入框中的文本
+            2. 验证输入是否为数字
+            3. 将输入转换为十六进制格式
+            4. 使用CasePackage打包帧数据
+            5. 发出send_frame信号
+        """
+
+        # 获取输入框中的文本
+        input_text = self.input_payload.text()
+
+        # 检查输入是否为数字，如果不是则发送空帧并返回
+        if input_text.isdigit() is False:
+            self.send_frame.emit(b"", False)
+            # print(f"input_text: {input_text}")
+            return
+
+        # 将输入转换为负载字节
+        payload = CasePackage.parse_payload(input_text)
+
+         # 使用CasePackage打包帧数据
+        frame = CasePackage().package_frame(self.id, payload)
+
+        # 发出发送帧信号，携带打包好的帧和发送状态True
+        self.send_frame.emit(frame, True, self.name)
+
+    def delete_clicked(self):
+        """
+        删除按钮点击事件处理函数
+        
+        发出delete_requested信号，通知父控件删除当前控件
+        """
+        self.delete_requested.emit(self)
\ No newline at end of file
@@ -0,0 +1,901 @@
+#!/usr/bin/env python3.13
+"""
+filename: cli.py
+author: [peixuSu]
+email: [1420209272@qq.com]
+date: 2026-10-18
+description: 无界面命令行回归运行器，不依赖Qt/reportlab，可在CI或远程机器上运行
+
+用法:
+    python -m core.risc_v_debug.cli run --plan plan.yaml --rounds 10
+
+plan.yaml示例:
+    spi:
+      backend: jtool        # jtool/simulated/mcu，未设置时读取环境变量SPI_BACKEND
+      options: {}           # 传给后端构造函数的参数
+      clk_mode: 0
+      bit_order: 0
+      speed: 0
+      vcc: 0
+      vio: 0
+    crc: true               # 帧尾是否带CRC-16(自定义)校验
+    mode: sequential        # sequential顺序执行/random每轮随机打乱
+    seed: null              # random模式的随机数种子
+    rounds: 1
+    timeouts: {case: 60000} # 覆盖CASE_TIMEOUTS中的项(毫秒)
+    pipeline_depth: 1       # 同时等待应答的请求数，固件支持命令排队时可大于1
+    match_msg_id: false     # 是否按消息ID匹配应答，pipeline_depth大于1时总是开启
+    devices: 1              # 并行使用的适配器数量，all为扫描到的全部适配器
+    shard: round_robin      # 测例分配到各设备的方式：round_robin轮流/affinity按affinity固定
+    affinity: {}            # 测例名称到设备序号的映射，如 {case_0001: 0}
+    output: results         # 结果输出目录
+    database: null          # 结果数据库路径，默认为输出目录下的results.db，:memory:时不保存
+    cases:                  # 为空时运行固件返回的全部测例
+      - case_0001
+      - {name: case_0002, payload: 5}
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from ctypes import c_ubyte
+from datetime import datetime
+
+import yaml
+
+from spi.spi_driver import SPIDriver
+from spi.spi_backend import create_backend
+from spi.device_manager import DeviceManager, SHARD_ROUND_ROBIN
+from utils.crc.crc_manager import get_crc_engine
+from core.log.log_manager import CaseResultParser
+from core.log.result_store import ResultStore
+from .frame import Frame, FrameDecoder, CMD, HEADER_LENGTH, frame_msg_id, frame_length
+from .request_tracker import RequestTracker
+from .case_manager import CaseID_Manager, CasePackage
+from .case_flow import CASE_TIMEOUTS, AdaptivePolling
+
+# 测试计划的默认值
+DEFAULT_PLAN = {
+    "spi": {
+        "backend": None,
+        "options": {},
+        "clk_mode": 0,
+        "bit_order": 0,
+        "speed": 0,
+        "vcc": 0,
+        "vio": 0,
+    },
+    "crc": True,
+    "mode": "sequential",
+    "seed": None,
+    "rounds": 1,
+    "timeouts": {},
+    "pipeline_depth": 1,
+    "match_msg_id": False,
+    "devices": 1,
+    "shard": SHARD_ROUND_ROBIN,
+    "affinity": {},
+    "output": "results",
+    "database": None,
+    "cases": [],
+}
+
+# 测例负载的默认值，与界面输入框的默认值一致
+DEFAULT_PAYLOAD = "1"
+
+# 每个实例只模拟一个设备的后端，多设备运行时为每个设备创建一个实例
+SIMULATED_BACKENDS = ("simulated", "mcu")
+
+
+class RunError(Exception):
+    """测例流程出错（无应答、Nack或应答异常）"""
+
+
+def load_plan(path):
+    """
+    读取YAML测试计划并补全默认值
+
+    Args:
+        path (str): 计划文件路径
+
+    Returns:
+        dict: 测试计划
+    """
+    with open(path, 'r', encoding='utf-8') as file:
+        loaded = yaml.safe_load(file) or {}
+
+    plan = dict(DEFAULT_PLAN)
+    plan.update(loaded)
+    plan["spi"] = {**DEFAULT_PLAN["spi"], **(loaded.get("spi") or {})}
+    plan["timeouts"] = {**CASE_TIMEOUTS, **(loaded.get("timeouts") or {})}
+    return plan
+
+
+class HeadlessRunner:
+    """
+    命令行测例运行器
+
+    使用与界面相同的帧格式、测例ID分配和结果记录，按 Ping → GetCaseList → RunCase →
+    GetCaseResult → GetLog 的流程同步执行测例，不需要Qt事件循环。
+    """
+
+    def __init__(self, plan, driver=None, log=print, store=None):
+        """
+        初始化运行器
+
+        Args:
+            plan (dict): 测试计划，见load_plan
+            driver (SPIDriver, optional): SPI驱动，默认按计划中的后端创建
+            log: 输出进度信息的函数
+            store (ResultStore, optional): 测例结果存储，默认为内存数据库
+        """
+        self.plan = plan
+        self.log = log
+        self.timeouts = plan["timeouts"]
+
+        spi = plan["spi"]
+        self.clk_mode = spi["clk_mode"]
+        self.bit_order = spi["bit_order"]
+
+        self.use_crc = bool(plan["crc"])
+        self.crc_engine = get_crc_engine()
+
+        if driver is None:
+            driver = SPIDriver(backend=create_backend(spi["backend"], **spi["options"]))
+        self.driver = driver
+
+        # 协议模拟器需要与主机使用相同的CRC模式
+        if hasattr(self.driver.backend, "configure"):
+            self.driver.backend.configure(self.use_crc, self.crc_engine)
+
+        self.decoder = FrameDecoder(self.use_crc, self.crc_engine)
+
+        # 请求跟踪器，pipeline_depth大于1时必须按消息ID匹配应答
+        depth = plan["pipeline_depth"]
+        self.tracker = RequestTracker(depth, plan["match_msg_id"] or depth > 1)
+
+        # 已匹配但尚未取走的应答，键为消息ID
+        self.replies = {}
+        self.case_manager = CaseID_Manager()
+        self.case_package = CasePackage()
+        self.case_result_parser = CaseResultParser(store)
+
+        # 各测例预先打包的RunCase帧模板，键为测例名称
+        self.templates = {}
+
+        # 流程出错的测例记录 (时间戳, 测例名称, 错误信息)
+        self.errors = []
+
+    def open(self):
+        """
+        打开设备并配置电压和速度
+
+        Raises:
+            RunError: 设备打开失败
+        """
+        # 设备管理器已打开的设备不再重复打开
+        if not self.driver.dev_handle:
+            message, _, _ = self.driver.open_device()
+            if not self.driver.dev_handle:
+                raise RunError(message)
+            self.log(message)
+
+        spi = self.plan["spi"]
+        self.driver.set_vcc(spi["vcc"])
+        self.driver.set_vio(spi["vio"])
+        self.driver.set_speed(spi["speed"])
+
+    def send(self, frame, append_crc=True):
+        """
+        发送一帧，启用CRC时在帧尾附加CRC校验
+
+        Args:
+            frame (bytearray): 数据帧
+            append_crc (bool): 是否附加CRC，帧模板已带CRC时传False
+
+        Raises:
+            RunError: 发送失败
+        """
+        data = bytearray(frame)
+        if append_crc and self.use_crc:
+            data += self.crc_engine.new(data).digest()
+
+        tx_array = (c_ubyte * len(data)).from_buffer(data)
+        result = self.driver.write(self.clk_mode, self.bit_order, len(data), tx_array)
+        if result != 0:
+            raise RunError(f"数据发送失败: {self.driver.ERROR_CODES.get(result)}")
+
+    def read(self, size):
+        """
+        读取size个字节
+
+        Raises:
+            RunError: 接收失败
+        """
+        rx_array = (c_ubyte * size)()
+        result = self.driver.read(self.clk_mode, self.bit_order, size, rx_array)
+        if result != 0:
+            raise RunError(f"数据接收失败: {self.driver.ERROR_CODES.get(result)}")
+        return bytes(rx_array)
+
+    def receive_frame(self):
+        """
+        按帧长度分两阶段读取一次，并从解码器取出一个完整帧
+
+        Returns:
+            tuple: (msg_id, cmd, payload)，没有完整帧时返回None
+        """
+        crc_length = self.crc_engine.byte_length if self.use_crc else 0
+
+        head = self.read(HEADER_LENGTH)
+        length = frame_length(head, crc_length)
+        if length is not None:
+            head += self.read(length - HEADER_LENGTH)
+
+        success, msg_id, cmd, payload, _ = self.decoder.next_frame(head)
+        if not success:
+            return None
+        return msg_id, cmd, payload
+
+    def submit(self, cmd, data=None, timeout_key="ack", frame=None, msg_id=None):
+        """
+        发送请求并登记到请求跟踪器，不等待应答
+
+        Args:
+            cmd (int): 命令码，frame不为None时忽略
+            data (bytes, optional): 负载数据
+            timeout_key (str): CASE_TIMEOUTS中等待时限的键
+            frame (FrameTemplate, optional): 预先打包的帧模板，每次发送时写入新的消息ID
+            msg_id (int, optional): 重发请求时使用原请求的消息ID
+
+        Returns:
+            int: 请求帧的消息ID
+
+        Raises:
+            RunError: 等待应答的请求已满或发送失败
+        """
+        if frame is not None:
+            data = frame.build(msg_id)
+            cmd = frame.cmd
+            self.send(data, append_crc=False)
+        else:
+            data = Frame.generate_frame(cmd, data, msg_id=msg_id)
+            self.send(data)
+
+        msg_id = frame_msg_id(data)
+        if not self.tracker.register(msg_id, cmd, self.timeouts[timeout_key]):
+            raise RunError("等待应答的请求已满")
+        return msg_id
+
+    def wait(self, msg_id):
+        """
+        读取应答直到收到指定请求的应答，其他等待中请求的应答先缓存
+
+        Args:
+            msg_id (int): 请求帧的消息ID
+
+        Returns:
+            tuple: (cmd, payload)，超时时返回None
+        """
+        while True:
+            if msg_id in self.replies:
+                return self.replies.pop(msg_id)
+
+            # 请求已过期
+            self.tracker.expire()
+            if self.tracker.deadline(msg_id) is None:
+                return None
+
+            frame = self.receive_frame()
+            if frame is None:
+                time.sleep(self.timeouts["poll"] / 1000)
+                continue
+
+            # 已取消或已过期请求的迟到应答直接丢弃
+            matched = self.tracker.match(frame[0])
+            if matched is not None:
+                self.replies[matched[0]] = frame[1:]
+
+    def cancel(self, msg_id):
+        """取消等待中的请求，之后到达的应答被丢弃"""
+        self.tracker.cancel(msg_id)
+        self.replies.pop(msg_id, None)
+
+    def request(self, cmd, data=None, timeout_key="ack", frame=None):
+        """
+        发送请求并等待应答，无应答时按retries重试
+
+        重试时使用原请求的消息ID，固件据此识别重发的请求并返回相同的应答。
+
+        Args:
+            cmd (int): 命令码，frame不为None时忽略
+            data (bytes, optional): 负载数据
+            timeout_key (str): CASE_TIMEOUTS中等待时限的键
+            frame (FrameTemplate, optional): 预先打包的帧模板，每次发送时写入新的消息ID
+
+        Returns:
+            tuple: (cmd, payload)
+
+        Raises:
+            RunError: 多次重试后仍无应答
+        """
+        msg_id = self.submit(cmd, data, timeout_key, frame)
+        reply = self.wait(msg_id)
+        if reply is not None:
+            return reply
+        return self.retry(msg_id, cmd, data, timeout_key, frame)
+
+    def retry(self, msg_id, cmd, data=None, timeout_key="ack", frame=None):
+        """
+        以原消息ID重发已超时的请求并等待应答，最多重发retries-1次
+
+        Args:
+            msg_id (int): 原请求的消息ID
+            cmd (int): 命令码，frame不为None时忽略
+            data (bytes, optional): 负载数据
+            timeout_key (str): CASE_TIMEOUTS中等待时限的键
+            frame (FrameTemplate, optional): 预先打包的帧模板
+
+        Returns:
+            tuple: (cmd, payload)
+
+        Raises:
+            RunError: 多次重发后仍无应答
+        """
+        for _ in range(self.timeouts["retries"] - 1):
+            time.sleep(self.timeouts["retry"] / 1000)
+            reply = self.wait(self.submit(cmd, data, timeout_key, frame, msg_id))
+            if reply is not None:
+                return reply
+        raise RunError("等待应答超时")
+
+    def scan_cases(self):
+        """
+        Ping固件并获取测例列表，分配测例ID
+
+        Returns:
+            list: 固件返回的测例名称列表
+        """
+        cmd, payload = self.request(CMD["Ping"])
+        if cmd != CMD["Ack"]:
+            raise RunError(f"Ping未收到Ack，命令字：{hex(cmd)}")
+
+        cmd, payload = self.request(CMD["GetCaseList"])
+        if cmd != CMD["CaseList"]:
+            raise RunError(f"未收到测例列表，命令字：{hex(cmd)}")
+
+        case_list = Frame.parse_case(payload)
+        self.case_manager.assign_id(case_list)
+        self.log(f"扫描到{len(case_list)}个测例")
+        return case_list
+
+    def select_cases(self, case_list):
+        """
+        按计划选择要运行的测例，解析负载并打包RunCase帧模板
+
+        Args:
+            case_list (list): 固件返回的测例名称列表
+
+        Returns:
+            list: 要运行的测例名称
+        """
+        entries = self.plan["cases"] or case_list
+        selected = []
+        for entry in entries:
+            if isinstance(entry, dict):
+                name = entry["name"]
+                text = str(entry.get("payload", DEFAULT_PAYLOAD))
+            else:
+                name = str(entry)
+                text = DEFAULT_PAYLOAD
+
+            payload = CasePackage.parse_payload(text)
+            case_id = self.case_manager.get_case_id(name)
+            if case_id is None:
+                raise RunError(f"测例不存在: {name}")
+            if payload is None:
+                raise RunError(f"测例{name}的负载不是数字: {text}")
+
+            crc_engine = self.crc_engine if self.use_crc else None
+            self.templates[name] = self.case_package.package_template(case_id, payload, crc_engine)
+            selected.append(name)
+        return selected
+
+    def run_case(self, case_name):
+        """
+        运行一个测例并保存结果
+
+        Args:
+            case_name (str): 测例名称
+
+        Returns:
+            bool: 测例是否通过
+
+        Raises:
+            RunError: 流程出错
+        """
+        start_time = time.monotonic()
+        case_deadline = start_time + self.timeouts["case"] / 1000
+
+        template = self.templates[case_name]
+        pipelined = self.tracker.depth > 1
+
+        # 流水线模式下RunCase和首个GetCaseResult一起发出，不等待Ack
+        run_id = self.submit(None, frame=template)
+        result_id = self.submit(CMD["GetCaseResult"], timeout_key="result") if pipelined else None
+
+        reply = self.wait(run_id)
+        if reply is None:
+            if result_id is not None:
+                self.cancel(result_id)
+                result_id = None
+            reply = self.retry(run_id, None, frame=template)
+
+        cmd, payload = reply
+        if cmd != CMD["Ack"]:
+            raise RunError(f"RunCase未收到Ack，命令字：{hex(cmd)}，负载: {bytes(payload).hex()}")
+
+        # 查询结果，CaseRunning时按历史时长自适应轮询
+        polling = AdaptivePolling(
+            self.timeouts["running_poll_min"],
+            self.timeouts["running_poll_max"],
+            self.timeouts["running_poll_factor"],
+            self.case_result_parser.get_case_duration(case_name)
+        )
+        while True:
+            reply = self.wait(result_id) if result_id is not None else None
+            result_id = None
+            if reply is None:
+                reply = self.request(CMD["GetCaseResult"], timeout_key="result")
+
+            cmd, payload = reply
+            if cmd == CMD["CaseResult"]:
+                break
+            if cmd != CMD["CaseRunning"]:
+                raise RunError(f"收到意外命令字：{hex(cmd)}，负载: {bytes(payload).hex()}")
+
+            now = time.monotonic()
+            if now >= case_deadline:
+                raise RunError("运行超时")
+            interval = polling.next_interval((now - start_time) * 1000)
+            time.sleep(max(0, min(interval / 1000, case_deadline - now)))
+
+        duration = time.monotonic() - start_time
+
+        if len(payload) != 3:
+            raise RunError(f"测例结果负载长度异常，负载: {bytes(payload).hex()}")
+
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if payload[2] == 0:
+            self.case_result_parser.save_success_result(
+                timestamp, case_name, f"{case_name}运行结果正确", duration, self.case_manager.get_case_id(case_name))
+            return True
+        if payload[2] != 1:
+            raise RunError(f"测例{case_name}执行结果未知，负载: {bytes(payload).hex()}")
+
+        # 失败时读取全部日志分片
+        log = self.fetch_log() if pipelined else self.fetch_log_sequential()
+
+        self.case_result_parser.save_result(timestamp, case_name, ''.join(log), duration, self.case_manager.get_case_id(case_name))
+        return False
+
+    def fetch_log_sequential(self):
+        """
+        逐个请求日志分片，无应答时重试
+
+        Returns:
+            list: 日志分片文本
+        """
+        log = []
+        while True:
+            cmd, payload = self.request(CMD["GetLog"], timeout_key="log")
+            if cmd != CMD["LogSending"] and cmd != CMD["LogFinished"]:
+                raise RunError(f"收到意外命令字：{hex(cmd)}，负载: {bytes(payload).hex()}")
+            log.append(bytes(payload).decode("latin-1"))
+            if cmd == CMD["LogFinished"]:
+                return log
+
+    def fetch_log(self):
+        """
+        保持depth个GetLog请求等待应答，按发送顺序取出日志分片
+
+        分片的应答丢失时以原消息ID重发该请求；LogFinished之后多发的请求被取消，
+        其应答到达时由请求跟踪器丢弃。
+
+        Returns:
+            list: 日志分片文本
+        """
+        log = []
+        outstanding = deque()
+        try:
+            while True:
+                while not self.tracker.is_full():
+                    outstanding.append(self.submit(CMD["GetLog"], timeout_key="log"))
+
+                msg_id = outstanding.popleft()
+                reply = self.wait(msg_id)
+                if reply is None:
+                    reply = self.retry(msg_id, CMD["GetLog"], timeout_key="log")
+
+                cmd, payload = reply
+                if cmd != CMD["LogSending"] and cmd != CMD["LogFinished"]:
+                    raise RunError(f"收到意外命令字：{hex(cmd)}，负载: {bytes(payload).hex()}")
+                log.append(bytes(payload).decode("latin-1"))
+                if cmd == CMD["LogFinished"]:
+                    return log
+        finally:
+            for msg_id in outstanding:
+                self.cancel(msg_id)
+
+    def prepare(self):
+        """
+        打开设备、扫描并选择测例
+
+        Returns:
+            list: 要运行的测例名称
+        """
+        self.open()
+        return self.select_cases(self.scan_cases())
+
+    def run(self, rounds=None, stop_on_error=False):
+        """
+        按计划运行所有轮次
+
+        Args:
+            rounds (int, optional): 轮数，为None时使用计划中的值
+            stop_on_error (bool): 流程出错时是否停止运行
+
+        Returns:
+            dict: 运行摘要
+        """
+        return self.run_cases(self.prepare(), rounds, stop_on_error)
+
+    def run_cases(self, cases, rounds=None, stop_on_error=False):
+        """
+        运行已选择的测例，需先调用prepare
+
+        Args:
+            cases (list): 测例名称列表
+            rounds (int, optional): 轮数，为None时使用计划中的值
+            stop_on_error (bool): 流程出错时是否停止运行
+
+        Returns:
+            dict: 运行摘要
+        """
+        rounds = self.plan["rounds"] if rounds is None else rounds
+        shuffle = random.Random(self.plan["seed"]) if self.plan["mode"] == "random" else None
+
+        total = rounds * len(cases)
+        done = 0
+        start_time = time.monotonic()
+
+        for round_index in range(rounds):
+            order = list(cases)
+            if shuffle is not None:
+                shuffle.shuffle(order)
+
+            for case_name in order:
+                done += 1
+                try:
+                    passed = self.run_case(case_name)
+                    self.log(f"[{done}/{total}] 第{round_index + 1}轮 {case_name} {'通过' if passed else '未通过'}")
+                except RunError as e:
+                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    self.errors.append((timestamp, case_name, str(e)))
+                    self.log(f"[{done}/{total}] 第{round_index + 1}轮 {case_name} 出错: {e}")
+                    # 丢弃未处理的应答，避免影响下一个测例
+                    self.decoder.reset()
+                    self.tracker.reset()
+                    self.replies.clear()
+                    if stop_on_error:
+                        return self.summary(time.monotonic() - start_time)
+
+                if self.timeouts["case_gap"]:
+                    time.sleep(self.timeouts["case_gap"] / 1000)
+
+        return self.summary(time.monotonic() - start_time)
+
+    def summary(self, elapsed):
+        """
+        生成运行摘要
+
+        Args:
+            elapsed (float): 总耗时(秒)
+
+        Returns:
+            dict: 结果统计、出错记录、各测例平均时长和解码统计
+        """
+        return {
+            'statistics': self.case_result_parser.get_statistics(),
+            'error_count': len(self.errors),
+            'errors': [
+                {'timestamp': timestamp, 'case_name': case_name, 'message': message}
+                for timestamp, case_name, message in self.errors
+            ],
+            'elapsed': elapsed,
+            'case_durations': dict(self.case_result_parser.case_durations),
+            'cases': self.case_result_parser.get_case_statistics(),
+            'decoder': self.decoder.get_statistics(),
+            'requests': self.tracker.get_statistics(),
+        }
+
+    def write_results(self, output_dir, summary):
+        """
+        将结果写入输出目录：results.csv和summary.json
+
+        Args:
+            output_dir (str): 输出目录
+            summary (dict): 运行摘要
+
+        Returns:
+            str: CSV文件路径
+        """
+        return write_results(output_dir, self.case_result_parser, summary)
+
+
+class ParallelRunner:
+    """
+    多设备并行运行器
+
+    通过DeviceManager为每个适配器打开一个设备，每个设备由各自线程中的HeadlessRunner
+    驱动。测例按分片方式分配到各设备，运行结束后各设备的结果合并到一个CaseResultParser。
+    """
+
+    def __init__(self, plan, manager=None, log=print, store=None):
+        """
+        初始化并行运行器
+
+        Args:
+            plan (dict): 测试计划，见load_plan
+            manager (DeviceManager, optional): 设备管理器，默认按计划中的后端创建
+            log: 输出进度信息的函数，由log加锁后调用，各设备的输出不会交错
+            store (ResultStore, optional): 各设备共用的测例结果存储，默认为内存数据库
+        """
+        self.plan = plan
+        self.output = log
+        self.log_lock = threading.Lock()
+
+        if manager is None:
+            spi = plan["spi"]
+            name = spi["backend"] or os.environ.get("SPI_BACKEND", "jtool")
+            if name in SIMULATED_BACKENDS:
+                manager = DeviceManager(
+                    create_backend(name, **spi["options"]),
+                    lambda usb_id: create_backend(name, **spi["options"])
+                )
+            else:
+                manager = DeviceManager(create_backend(name, **spi["options"]))
+        self.manager = manager
+
+        self.runners = []
+        self.store = store if store is not None else ResultStore()
+        self.case_result_parser = CaseResultParser(self.store)
+
+    def open(self):
+        """
+        打开计划指定数量的设备，并为每个设备创建运行器
+
+        Raises:
+            RunError: 没有可用的设备
+        """
+        devices = self.plan["devices"]
+        count = None if devices in (None, "all") else int(devices)
+        if count is None and self.manager.backend_factory is not None:
+            # 模拟后端无法扫描出多个设备，需在计划中指定设备数量
+            self.log("警告: 模拟后端使用devices: all时只打开1个设备，请指定设备数量")
+            count = 1
+
+        for message in self.manager.open_all(count):
+            self.log(message)
+        if self.manager.device_count() == 0:
+            raise RunError("没有可用的SPI设备")
+
+        self.runners = [
+            HeadlessRunner(self.plan, driver, self.device_log(index), self.store)
+            for index, driver in enumerate(self.manager.drivers)
+        ]
+
+    def log(self, message):
+        """输出一行信息，各设备的I/O线程同时输出时逐行串行"""
+        with self.log_lock:
+            self.output(message)
+
+    def device_log(self, index):
+        """返回在信息前加设备序号的输出函数"""
+        return lambda message: self.log(f"[设备{index}] {message}")
+
+    def run(self, rounds=None, stop_on_error=False):
+        """
+        在所有设备上并行运行测试计划
+
+        Args:
+            rounds (int, optional): 轮数，为None时使用计划中的值
+            stop_on_error (bool): 流程出错时是否停止该设备的运行
+
+        Returns:
+            dict: 合并后的运行摘要
+        """
+        start_time = time.monotonic()
+        self.open()
+        try:
+            return self.run_devices(rounds, stop_on_error, start_time)
+        finally:
+            self.manager.close_all()
+
+    def run_devices(self, rounds, stop_on_error, start_time):
+        """
+        在已打开的设备上扫描、分片并运行测例，参数同run
+
+        Returns:
+            dict: 合并后的运行摘要
+        """
+        # 各设备并行扫描测例
+        prepared = self.manager.run(lambda index, driver, runner: runner.prepare(), self.runners)
+        for result in prepared:
+            if isinstance(result, Exception):
+                raise result if isinstance(result, RunError) else RunError(str(result))
+
+        shards = self.manager.shard(self.common_cases(prepared), self.plan["shard"], self.plan["affinity"])
+        for index, shard in enumerate(shards):
+            missing = set(shard) - set(prepared[index])
+            if missing:
+                raise RunError(f"设备{index}没有测例: {', '.join(sorted(missing))}")
+            self.log(f"[设备{index}] 分配到{len(shard)}个测例")
+
+        jobs = list(zip(self.runners, shards))
+        results = self.manager.run(
+            lambda index, driver, job: job[0].run_cases(job[1], rounds, stop_on_error), jobs
+        )
+
+        for runner in self.runners:
+            self.case_result_parser.merge(runner.case_result_parser)
+        return self.summary(results, time.monotonic() - start_time)
+
+    def common_cases(self, prepared):
+        """
+        取所有设备都有的测例，不同固件的测例列表不一致时只运行共同的测例
+
+        Args:
+            prepared (list): 各设备选择的测例名称列表
+
+        Returns:
+            list: 共同的测例，按第一个设备的顺序排列
+
+        Raises:
+            RunError: 没有共同的测例
+        """
+        common = set(prepared[0]).intersection(*prepared[1:])
+        excluded = sorted(set().union(*prepared) - common)
+        if excluded:
+            self.log(f"警告: 以下测例不是所有设备都有，不运行: {', '.join(excluded)}")
+        if not common:
+            raise RunError("各设备没有共同的测例")
+
+        # 固定到不存在的设备的测例会被分配到其他设备
+        count = self.manager.device_count()
+        for case_name, device in (self.plan["affinity"] or {}).items():
+            if not 0 <= device < count:
+                self.log(f"警告: 测例{case_name}指定的设备{device}不存在，改为分配到其他设备")
+
+        return [case for case in prepared[0] if case in common]
+
+    def summary(self, results, elapsed):
+        """
+        合并各设备的运行摘要
+
+        Args:
+            results (list): 各设备的运行摘要，设备线程抛出异常时为异常对象
+            elapsed (float): 总耗时(秒)
+
+        Returns:
+            dict: 合并后的结果统计和出错记录，以及各设备的运行摘要
+        """
+        errors = []
+        devices = []
+        for index, result in enumerate(results):
+            if isinstance(result, Exception):
+                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                result = {'error_count': 1, 'errors': [{'timestamp': timestamp, 'case_name': '', 'message': str(result)}]}
+            for error in result['errors']:
+                errors.append({**error, 'device': index})
+            devices.append(result)
+
+        return {
+            'statistics': self.case_result_parser.get_statistics(),
+            'error_count': len(errors),
+            'errors': errors,
+            'elapsed': elapsed,
+            'case_durations': dict(self.case_result_parser.case_durations),
+            'cases': self.case_result_parser.get_case_statistics(),
+            'devices': devices,
+        }
+
+    def write_results(self, output_dir, summary):
+        """将合并后的结果写入输出目录，见HeadlessRunner.write_results"""
+        return write_results(output_dir, self.case_result_parser, summary)
+
+
+def write_results(output_dir, parser, summary):
+    """
+    将结果写入输出目录：results.csv和summary.json
+
+    Args:
+        output_dir (str): 输出目录
+        parser (CaseResultParser): 测试结果
+        summary (dict): 运行摘要
+
+    Returns:
+        str: CSV文件路径
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    csv_path = os.path.join(output_dir, "results.csv")
+    parser.export_csv(csv_path)
+
+    with open(os.path.join(output_dir, "summary.json"), 'w', encoding='utf-8') as file:
+        json.dump(summary, file, ensure_ascii=False, indent=2)
+    return csv_path
+
+
+def run_command(args):
+    """执行run子命令，返回进程退出码"""
+    plan = load_plan(args.plan)
+    if args.backend is not None:
+        plan["spi"]["backend"] = args.backend
+    if args.devices is not None:
+        plan["devices"] = args.devices if args.devices == "all" else int(args.devices)
+    output_dir = args.output if args.output is not None else plan["output"]
+
+    # 结果边运行边写入数据库，程序中断时已完成的结果不会丢失
+    database = plan["database"]
+    if database is None:
+        os.makedirs(output_dir, exist_ok=True)
+        database = os.path.join(output_dir, "results.db")
+    store = ResultStore(database)
+
+    # 单设备时保持原有的运行方式
+    if plan["devices"] == 1:
+        runner = HeadlessRunner(plan, store=store)
+    else:
+        runner = ParallelRunner(plan, store=store)
+    try:
+        summary = runner.run(args.rounds, args.stop_on_error)
+        csv_path = runner.write_results(output_dir, summary)
+    except RunError as e:
+        print(f"运行失败: {e}", file=sys.stderr)
+        return 2
+    finally:
+        store.close()
+
+    stats = summary['statistics']
+    print(f"完成: 共{stats['total_count']}个, 成功{stats['success_count']}个, "
+          f"失败{stats['failure_count']}个, 出错{summary['error_count']}个, "
+          f"成功率{stats['success_rate']:.2f}%, 耗时{summary['elapsed']:.2f}s")
+    print(f"结果已保存: {csv_path}")
+
+    return 0 if stats['failure_count'] == 0 and summary['error_count'] == 0 else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core.risc_v_debug.cli", description="RISC-V测例命令行运行器")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="按测试计划运行测例")
+    run_parser.add_argument("--plan", required=True, help="YAML测试计划文件")
+    run_parser.add_argument("--rounds", type=int, default=None, help="运行轮数，覆盖计划中的rounds")
+    run_parser.add_argument("--output", default=None, help="结果输出目录，覆盖计划中的output")
+    run_parser.add_argument("--backend", default=None, help="SPI后端(jtool/simulated/mcu)，覆盖计划中的spi.backend")
+    run_parser.add_argument("--devices", default=None, help="并行使用的适配器数量或all，覆盖计划中的devices")
+    run_parser.add_argument("--stop-on-error", action="store_true", help="流程出错时停止运行")
+    run_parser.set_defaults(handler=run_command)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,11 +7,26 @@ date: 2025-12-01
 description: 数据帧相关函数
 """
 
-from utils.crc.crc_manager import CRC
+import struct
+from collections import deque
+from functools import partial
+from utils.crc.crc_manager import get_crc_engine
 
 # 帧头标识，用于识别数据帧的开始
 Header = 0x5AA5
 
+# 帧头结构：帧头(2字节) + 消息ID(2字节) + 命令码(2字节) + 数据长度(4字节)，大端序
+FRAME_HEADER = struct.Struct('>HHHI')
+
+# 基本帧长度（不包含数据和CRC）
+HEADER_LENGTH = FRAME_HEADER.size
+
+# 帧头标识的字节形式，用于在数据流中查找帧的开始
+HEADER_BYTES = Header.to_bytes(2, byteorder='big')
+
+# 单帧允许的最大数据长度，超过时视为错误帧头
+MAX_DATA_LENGTH = 64 * 1024
+
 # 消息ID，用于标识消息的唯一性，递增
 Msg_ID = 0x0000
 
@@ -45,71 +60,148 @@ current_msg_id = Msg_ID
 # 测试用例列表
 # case_list = []
 
+# 消息ID在帧头中的偏移
+MSG_ID_OFFSET = 2
+
+
+def next_msg_id():
+    """
+    获取当前消息ID并递增
+    
+    Returns:
+        int: 消息ID，0x0000-0xFFFF循环
+    """
+    global current_msg_id
+
+    msg_id = current_msg_id
+    current_msg_id = (current_msg_id + 1) % 0x10000
+    return msg_id
+
+
+def frame_length(head, crc_length=0):
+    """
+    按帧头计算整帧长度
+
+    Args:
+        head: 以帧头开始、至少HEADER_LENGTH字节的数据
+        crc_length (int): 帧尾CRC的字节数
+
+    Returns:
+        int: 帧头、负载和CRC的总长度，帧头无效时返回None
+    """
+    header, _, _, data_length = FRAME_HEADER.unpack_from(head, 0)
+    if header != Header or data_length > MAX_DATA_LENGTH:
+        return None
+    return HEADER_LENGTH + data_length + crc_length
+
+
+def frame_length_parser(use_crc=False, crc_engine=None):
+    """
+    返回按帧头计算整帧长度的函数，供SPI层两阶段接收使用
+
+    Args:
+        use_crc (bool): 帧尾是否带CRC校验
+        crc_engine (CRCEngine, optional): CRC计算引擎，用于确定CRC长度，默认为2字节
+
+    Returns:
+        function: 参数为帧头数据，返回值同frame_length
+    """
+    crc_length = (crc_engine.byte_length if crc_engine is not None else 2) if use_crc else 0
+    return partial(frame_length, crc_length=crc_length)
+
+
+def frame_msg_id(frame):
+    """
+    读取已编码帧的消息ID
+    
+    Args:
+        frame: 以帧头开始的字节数据
+        
+    Returns:
+        int: 消息ID
+    """
+    return (frame[MSG_ID_OFFSET] << 8) | frame[MSG_ID_OFFSET + 1]
+
+
 class Frame():
     """
     数据帧处理类
     
     负责生成发送到MCU的数据帧以及解析从MCU接收到的数据帧
     """
-    def generate_frame(cmd, data=None):
+    def generate_frame(cmd, data=None, crc_engine=None, msg_id=None):
         """
         生成数据帧
         
-        根据提供的命令和数据生成符合协议格式的数据帧,不包含CRC校验
+        根据提供的命令和数据生成符合协议格式的数据帧,默认不包含CRC校验
         
         Args:
             cmd (int): 命令码，来自CMD字典中的定义
             data (bytes, optional): 要发送的数据，默认为None
+            crc_engine (CRCEngine, optional): 指定时在帧尾附加CRC校验
+            msg_id (int, optional): 消息ID，默认取下一个全局消息ID，重发请求时传入原请求的消息ID
             
         Returns:
             bytearray: 生成的数据帧
         """
 
-        global current_msg_id
-
         # 获取当前消息ID并递增
-        msg_id = current_msg_id
-        current_msg_id = (current_msg_id + 1) % 0x10000
+        if msg_id is None:
+            msg_id = next_msg_id()
 
-        # 转换数据为字节格式
+        # 获取数据长度，列表需要先转换为字节格式
         if data is None:
-            # 如果没有数据，则数据长度为0，负载为空
-            data_length = 0
-            payload = b''
+            data = b''
+        elif isinstance(data, list):
+            data = bytes(data)
+        data_length = len(data)
+
+        # 不带CRC时直接在预分配的帧上写入，带CRC时交给encode_frame_into
+        if crc_engine is None:
+            frame = bytearray(HEADER_LENGTH + data_length)
+            FRAME_HEADER.pack_into(frame, 0, Header, msg_id, cmd, data_length)
+            frame[HEADER_LENGTH:] = data
         else:
-            # 转换为字节格式
-            payload = bytes(data)
-            # 获取数据长度
-            data_length = len(payload)
+            frame = bytearray(HEADER_LENGTH + data_length + crc_engine.byte_length)
+            Frame.encode_frame_into(frame, 0, msg_id, cmd, data, crc_engine)
 
-        # 生成数据帧
-        frame = bytearray()
+        # 返回生成的数据帧
+        return frame
 
-        # 添加帧头(2字节)
-        frame.append((Header >> 8) & 0xFF)
-        frame.append(Header & 0xFF)
-        
-        # 添加消息ID(2字节)
-        frame.append((msg_id >> 8) & 0xFF)
-        frame.append(msg_id & 0xFF)
-        
-        # 添加命令码(2字节)
-        frame.append((cmd >> 8) & 0xFF)
-        frame.append(cmd & 0xFF)
-        
-        # 添加数据长度(4字节)
-        frame.append((data_length >> 24) & 0xFF)
-        frame.append((data_length >> 16) & 0xFF)
-        frame.append((data_length >> 8) & 0xFF)
-        frame.append(data_length & 0xFF)
+    def encode_frame_into(buffer, offset, msg_id, cmd, data=b'', crc_engine=None):
+        """
+        将数据帧编码到预分配的缓冲区中
         
-        # 添加负载数据
-        frame.extend(payload)
+        Args:
+            buffer (bytearray): 可写缓冲区，剩余空间需容纳整个帧
+            offset (int): 帧在缓冲区中的起始位置
+            msg_id (int): 消息ID
+            cmd (int): 命令码
+            data (bytes, optional): 负载数据
+            crc_engine (CRCEngine, optional): 指定时在负载后写入CRC校验
+            
+        Returns:
+            int: 写入的字节数
+        """
+        data_length = len(data)
+        payload_start = offset + HEADER_LENGTH
+        payload_end = payload_start + data_length
 
-        # 返回生成的数据帧
-        return frame
+        # 写入帧头、消息ID、命令码和数据长度
+        FRAME_HEADER.pack_into(buffer, offset, Header, msg_id, cmd, data_length)
+
+        # 写入负载数据
+        buffer[payload_start:payload_end] = data
+
+        # 写入CRC校验
+        if crc_engine is not None:
+            crc_bytes = crc_engine.new(memoryview(buffer)[offset:payload_end]).digest()
+            buffer[payload_end:payload_end + len(crc_bytes)] = crc_bytes
+            payload_end += len(crc_bytes)
 
-    def parse_receive_frame(receive_data, use_crc=False):
+        return payload_end - offset
+
+    def parse_receive_frame(receive_data, use_crc=False, crc_engine=None):
         """
         解析接收到的数据帧
         
@@ -118,13 +210,14 @@ class Frame():
         Args:
             receive_data (bytes): 接收到的原始数据
             use_crc (bool): 是否使用CRC校验，默认为False
+            crc_engine (CRCEngine, optional): CRC计算引擎，默认为CRC-16(自定义)
             
         Returns:
             tuple: (success, msg_id, cmd, payload, message)
                    - success (bool): 解析是否成功
                    - msg_id (int): 消息ID
                    - cmd (int): 命令码
-                   - payload (bytes): 负载数据
+                   - payload (memoryview): 负载数据，引用接收缓冲区
                    - message (str): 状态信息或错误信息
         """
 
@@ -132,61 +225,55 @@ class Frame():
             return False, None, None, None, "接收到的数据为 None"
 
         # 基本帧长度（不包含数据和CRC）
-        basic_length = 10
+        basic_length = HEADER_LENGTH
 
         # print(f"origin_receive_data: {receive_data.hex()}")
 
         # 检查数据长度是否足够基本帧长度
         if len(receive_data) < basic_length:
             return False,None,None,None,"data length error"
-        
-        # 提取并验证帧头
-        header = (receive_data[0] << 8) | receive_data[1]
+
+        # 整数列表没有缓冲区接口，先转换为字节格式
+        if isinstance(receive_data, list):
+            receive_data = bytes(receive_data)
+
+        # 一次解出帧头、消息ID、命令字和数据长度
+        header, msg_id, cmd, data_length = FRAME_HEADER.unpack_from(receive_data, 0)
+
+        # 验证帧头
         if header != Header:
             # print(f"header: {header:04x}")
             return False,None,None,None,f"帧头错误：{header:04x}"
         
-        # 提取消息ID
-        msg_id = (receive_data[2] << 8) | receive_data[3]
-
-        # 提取命令字
-        cmd = (receive_data[4] << 8) | receive_data[5]
-
-        # 提取数据长度
-        data_length = (receive_data[6] << 24) | (receive_data[7] << 16) | (receive_data[8] << 8) | receive_data[9]
-        
         # 计算期望的数据帧长度
         expected_length = basic_length + data_length
 
-        # 如果启用CRC，则期望长度还需加上CRC字段长度(2字节)
+        # 如果启用CRC，则期望长度还需加上CRC字段长度
         if use_crc:
-            expected_length += 2
+            if crc_engine is None:
+                crc_engine = get_crc_engine()
+            expected_length += crc_engine.byte_length
         
         # 检查实际接收数据长度是否满足期望长度
         if len(receive_data) < expected_length:
-            payload = receive_data[basic_length:basic_length + data_length]
-            # print(f"payload: {payload.hex()}")
-            # print(f"receive_data: {receive_data.hex()}")
             print(f"expected_length: {expected_length}")
             print(f"real_length: {len(receive_data)}")
             return False, None, None, None, "data length error"
 
-        # 提取负载数据
-        payload = receive_data[basic_length:basic_length + data_length]
+        # 负载数据为接收缓冲区的内存视图，不复制数据
+        # ctypes数组的内存视图格式为'<B'，不能索引，统一转换为'B'格式
+        receive_view = memoryview(receive_data).cast('B')
+        payload = receive_view[basic_length:basic_length + data_length]
 
-        # 如果启用CRC校验，检查CRC值是否正确
+        # 如果启用CRC校验，检查CRC值是否正确，与FrameDecoder的校验一致
         if use_crc:
-            original_data = receive_data[:basic_length + data_length]
+            crc_calc = crc_engine.new(receive_view[:basic_length + data_length]).crcvalue
+            receive_crc = crc_engine.from_bytes(receive_view[basic_length + data_length:expected_length])
 
-            crc_calc = CRC.crc_16_user(original_data)
+            # 比较计算的CRC值与接收到的CRC值
+            if crc_calc != receive_crc:
+                return False, None, None, None, "CRC error"
 
-            receive_crc = (receive_data[expected_length - 2] << 8) | receive_data[expected_length - 1]
-            print(f"crc_calc: {crc_calc:04x}, receive_crc: {receive_crc:04x}")
-
-            # # 比较计算的CRC值与接收到的CRC值
-            # if crc_calc != receive_crc:
-            #     return False, None, None, None, "CRC error"
-            
         # 解析成功，返回解析结果
         return True, msg_id, cmd, payload, "Success"
 
@@ -203,9 +290,8 @@ class Frame():
         Returns:
             list or str: 成功时返回测试用例列表，失败时返回错误信息字符串
         """
-        # 如果payload是列表，则转换为字节对象
-        if isinstance(payload, list):
-            # 将整数列表转换为字节对象
+        # 如果payload是列表或内存视图，则转换为字节对象
+        if not isinstance(payload, (bytes, bytearray)):
             payload = bytes(payload)
 
         # 将字节数据解码为ASCII字符串
@@ -236,10 +322,273 @@ class Frame():
         """
 
         # 将字节数据解码为ASCII字符串
-        str = payload.decode('ascii')
+        str = bytes(payload).decode('ascii')
         
         # 将字节数据解码为ASCII字符串
         return str
 
 
+class FrameTemplate():
+    """
+    预编码的帧模板
+    
+    帧头、命令码、数据长度和负载只编码一次，每次发送时只改写消息ID并重新计算CRC，
+    用于循环发送时反复发送相同命令和负载的帧
+    """
 
+    def __init__(self, cmd, data=b'', crc_engine=None):
+        """
+        初始化帧模板
+        
+        Args:
+            cmd (int): 命令码，来自CMD字典中的定义
+            data (bytes, optional): 负载数据
+            crc_engine (CRCEngine, optional): 指定时在帧尾附加CRC校验
+        """
+        self.cmd = cmd
+        self.data = bytes(data)
+        self.crc_engine = crc_engine
+
+        crc_length = crc_engine.byte_length if crc_engine is not None else 0
+        self.payload_end = HEADER_LENGTH + len(self.data)
+        self.frame = bytearray(self.payload_end + crc_length)
+        Frame.encode_frame_into(self.frame, 0, 0, cmd, self.data)
+
+    def build(self, msg_id=None):
+        """
+        写入消息ID和CRC，返回完整的帧
+        
+        返回的帧与模板共享内存，下次build时会被改写，需要保留时应复制
+        
+        Args:
+            msg_id (int, optional): 消息ID，默认取下一个全局消息ID
+            
+        Returns:
+            bytearray: 数据帧
+        """
+        if msg_id is None:
+            msg_id = next_msg_id()
+
+        frame = self.frame
+        frame[MSG_ID_OFFSET] = msg_id >> 8
+        frame[MSG_ID_OFFSET + 1] = msg_id & 0xFF
+
+        if self.crc_engine is not None:
+            crc_bytes = self.crc_engine.new(memoryview(frame)[:self.payload_end]).digest()
+            frame[self.payload_end:] = crc_bytes
+
+        return frame
+
+
+class FrameDecoder():
+    """
+    流式帧解码器
+    
+    接收任意长度的字节块，在数据流中查找帧头0x5AA5，跨多次读取缓存不完整的帧，
+    校验数据长度和CRC后输出完整的帧，并统计重同步次数和丢弃的字节数
+    """
+
+    def __init__(self, use_crc=False, crc_engine=None, max_data_length=MAX_DATA_LENGTH):
+        """
+        初始化流式帧解码器
+        
+        Args:
+            use_crc (bool): 帧尾是否带CRC校验
+            crc_engine (CRCEngine, optional): CRC计算引擎，默认为CRC-16(自定义)
+            max_data_length (int): 单帧允许的最大数据长度
+        """
+        self.use_crc = use_crc
+        self.crc_engine = crc_engine if crc_engine is not None else get_crc_engine()
+        self.max_data_length = max_data_length
+
+        # 接收缓冲区及其中未处理数据的起始位置
+        self._buffer = bytearray()
+        self._start = 0
+
+        # 已解码但尚未取走的帧
+        self._ready = deque()
+
+        # 统计信息
+        self.frame_count = 0
+        self.resync_count = 0
+        self.dropped_bytes = 0
+        self.crc_error_count = 0
+
+    def configure(self, use_crc, crc_engine=None):
+        """
+        更新CRC配置
+        
+        Args:
+            use_crc (bool): 帧尾是否带CRC校验
+            crc_engine (CRCEngine, optional): CRC计算引擎
+        """
+        self.use_crc = use_crc
+        if crc_engine is not None:
+            self.crc_engine = crc_engine
+
+    def feed(self, data):
+        """
+        送入接收到的字节块并解码
+        
+        Args:
+            data: 字节数据，可以是bytes、bytearray、memoryview或ctypes数组
+            
+        Returns:
+            list: 本次解出的完整帧，每项为(msg_id, cmd, payload)
+        """
+        if data is not None:
+            self._buffer += data if not isinstance(data, list) else bytes(data)
+
+        return list(self.frames())
+
+    def frames(self):
+        """
+        从缓冲区中依次解出完整的帧
+        
+        Yields:
+            tuple: (msg_id, cmd, payload)，payload为bytes
+        """
+        buffer = self._buffer
+        crc_length = self.crc_engine.byte_length if self.use_crc else 0
+
+        while True:
+            # 查找帧头
+            position = buffer.find(HEADER_BYTES, self._start)
+            if position < 0:
+                # 未找到帧头，保留可能是帧头第一个字节的末尾字节
+                keep = 1 if buffer[-1:] == HEADER_BYTES[:1] else 0
+                self._drop(len(buffer) - keep - self._start)
+                break
+
+            if position > self._start:
+                self._drop(position - self._start)
+
+            # 等待完整的帧头
+            if len(buffer) - position < HEADER_LENGTH:
+                break
+
+            _, msg_id, cmd, data_length = FRAME_HEADER.unpack_from(buffer, position)
+
+            # 数据长度不合理，说明不是真正的帧头
+            if data_length > self.max_data_length:
+                self._drop(1)
+                continue
+
+            frame_end = position + HEADER_LENGTH + data_length + crc_length
+
+            # 等待完整的帧
+            if len(buffer) < frame_end:
+                break
+
+            payload_end = frame_end - crc_length
+
+            # 校验CRC，错误时跳过该帧头重新同步
+            if crc_length:
+                view = memoryview(buffer)
+                crc_calc = self.crc_engine.new(view[position:payload_end]).crcvalue
+                receive_crc = self.crc_engine.from_bytes(view[payload_end:frame_end])
+                view.release()
+                if crc_calc != receive_crc:
+                    self.crc_error_count += 1
+                    self._drop(1)
+                    continue
+
+            payload = bytes(buffer[position + HEADER_LENGTH:payload_end])
+            self._start = frame_end
+            self.frame_count += 1
+
+            yield msg_id, cmd, payload
+
+        self._compact()
+
+    def next_frame(self, data=None, use_crc=None, crc_engine=None):
+        """
+        送入字节块并取出最早的一个完整帧
+        
+        返回值与Frame.parse_receive_frame一致，多余的帧留到下次调用时取出
+        
+        Args:
+            data: 本次接收到的字节数据，可以为None
+            use_crc (bool, optional): 帧尾是否带CRC校验，None表示保持当前配置
+            crc_engine (CRCEngine, optional): CRC计算引擎
+            
+        Returns:
+            tuple: (success, msg_id, cmd, payload, message)
+        """
+        if use_crc is not None:
+            self.configure(use_crc, crc_engine)
+
+        self._ready.extend(self.feed(data))
+
+        if not self._ready:
+            return False, None, None, None, "未找到完整帧"
+
+        msg_id, cmd, payload = self._ready.popleft()
+        return True, msg_id, cmd, payload, "Success"
+
+    def pending_bytes(self):
+        """
+        获取缓冲区中尚未组成完整帧的字节数
+        
+        Returns:
+            int: 字节数
+        """
+        return len(self._buffer) - self._start
+
+    def resync(self):
+        """
+        丢弃缓冲区开头等待中的帧头的第一个字节，下次解码时从后面重新查找帧头
+
+        误判的帧头带有较大的数据长度时，解码器会一直等待该长度的数据而不输出后面真正的帧；
+        调用方在等待超时后调用此方法跳过该帧头。
+
+        Returns:
+            bool: 是否丢弃了字节，缓冲区为空时返回False
+        """
+        if self.pending_bytes() == 0:
+            return False
+        self._drop(1)
+        return True
+
+    def get_statistics(self):
+        """
+        获取解码统计信息
+        
+        Returns:
+            dict: 解码帧数、重同步次数、丢弃字节数和CRC错误次数
+        """
+        return {
+            'frame_count': self.frame_count,
+            'resync_count': self.resync_count,
+            'dropped_bytes': self.dropped_bytes,
+            'crc_error_count': self.crc_error_count
+        }
+
+    def reset(self):
+        """
+        清空缓冲区和未取走的帧，统计信息保留
+        """
+        self._buffer.clear()
+        self._start = 0
+        self._ready.clear()
+
+    def _drop(self, count):
+        """
+        丢弃缓冲区开头的count个字节并记录一次重同步
+        
+        Args:
+            count (int): 丢弃的字节数
+        """
+        if count <= 0:
+            return
+        self._start += count
+        self.dropped_bytes += count
+        self.resync_count += 1
+
+    def _compact(self):
+        """
+        移除缓冲区中已处理的数据
+        """
+        if self._start:
+            del self._buffer[:self._start]
+            self._start = 0
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3.13
+"""
+filename: mcu_simulator.py
+author: [peixuSu]
+email: [1420209272@qq.com]
+date: 2026-10-18
+description: RISC-V固件协议模拟器，作为SPI后端应答Ping/GetCaseList/RunCase/GetCaseResult/GetLog
+"""
+
+import random
+import time
+from spi.spi_backend import SimulatedBackend
+from .frame import Frame, FrameDecoder, CMD, HEADER_LENGTH
+
+# Nack负载中的错误代码
+NACK_UNKNOWN_CMD = 0x0001     # 未知命令
+NACK_UNKNOWN_CASE = 0x0002    # 测例ID不存在
+NACK_CASE_BUSY = 0x0003       # 已有测例正在运行
+NACK_NO_RESULT = 0x0004       # 没有可返回的测例结果
+NACK_NO_LOG = 0x0005          # 没有可返回的日志
+
+# 失败日志的表头，与CaseResultParser.parse_all_case_results期望的"表头;数据行;数据行"格式一致
+LOG_HEADER = "index,address,expected,actual"
+
+
+class MCUSimulator(SimulatedBackend):
+    """
+    RISC-V固件协议模拟器
+
+    解析主机写入的帧并把应答帧放入待读数据，主机按正常流程读取。支持大量测例、
+    指定测例的运行时长（模拟慢测例）、按比例随机失败以及按比例损坏应答帧。
+
+    主机重发的RunCase和GetLog与原请求使用相同的消息ID，模拟器对其返回与原请求相同的应答，
+    不会重复启动测例或跳过日志分片，应答损坏后主机重发即可恢复。
+    """
+
+    def __init__(self, case_names=None, case_count=100, default_duration=0.0, durations=None,
+                 pass_ratio=1.0, log_rows=3, log_chunk_size=64, corrupt_ratio=0.0,
+                 use_crc=True, crc_engine=None, seed=None, clock=time.monotonic,
+                 latency=0.0, bit_rate=0):
+        """
+        初始化模拟器
+
+        Args:
+            case_names (list): 测例名称列表，为None时按case_count生成case_0001等名称
+            case_count (int): 自动生成的测例数量
+            default_duration (float): 测例默认运行时长（秒）
+            durations (dict): 测例名称到运行时长（秒）的映射，用于模拟慢测例
+            pass_ratio (float): 测例通过的概率（0-1）
+            log_rows (int): 失败日志的数据行数
+            log_chunk_size (int): 每个LogSending帧携带的日志字节数
+            corrupt_ratio (float): 应答帧被损坏（随机翻转一个字节）的概率（0-1）
+            use_crc (bool): 收发的帧是否带CRC校验，需与主机的CRC模式一致
+            crc_engine (CRCEngine, optional): CRC计算引擎，默认为CRC-16(自定义)
+            seed (int, optional): 随机数种子
+            clock: 返回当前时间（秒）的函数
+            latency (float): 每次SPI传输的固定延迟（秒）
+            bit_rate (int): SPI比特率（bit/s），为0时不模拟传输耗时
+        """
+        super().__init__(latency=latency, bit_rate=bit_rate, device_str=b"JTool-Sim SN:00000000")
+
+        if case_names is None:
+            case_names = [f"case_{index + 1:04d}" for index in range(case_count)]
+        self.case_names = list(case_names)
+
+        self.default_duration = default_duration
+        self.durations = dict(durations) if durations else {}
+        self.pass_ratio = pass_ratio
+        self.log_rows = log_rows
+        self.log_chunk_size = log_chunk_size
+        self.corrupt_ratio = corrupt_ratio
+        self.clock = clock
+        self.random = random.Random(seed)
+
+        self.decoder = FrameDecoder(use_crc, crc_engine)
+        self.use_crc = use_crc
+        self.crc_engine = self.decoder.crc_engine
+
+        # 当前测例 (case_id, 开始时间, 运行时长, 是否通过)
+        self.current_case = None
+        self.result_counted = False
+
+        # 当前测例RunCase的消息ID，重发的RunCase直接应答Ack
+        self.run_msg_id = None
+
+        # 待发送的日志分片，以及已发送分片的应答（键为GetLog的消息ID），重发的GetLog返回同一分片
+        self.log_chunks = []
+        self.log_replies = {}
+
+        # 统计信息
+        self.command_counts = {}
+        self.cases_run = 0
+        self.cases_passed = 0
+        self.cases_failed = 0
+        self.corrupted_frames = 0
+
+    def configure(self, use_crc, crc_engine=None):
+        """
+        更新CRC配置
+
+        Args:
+            use_crc (bool): 收发的帧是否带CRC校验
+            crc_engine (CRCEngine, optional): CRC计算引擎
+        """
+        self.decoder.configure(use_crc, crc_engine)
+        self.use_crc = use_crc
+        self.crc_engine = self.decoder.crc_engine
+
+    def on_write(self, data):
+        """解析主机写入的帧并生成应答"""
+        for msg_id, cmd, payload in self.decoder.feed(data):
+            self.command_counts[cmd] = self.command_counts.get(cmd, 0) + 1
+            response_cmd, response_data = self.handle_command(msg_id, cmd, payload)
+            self.rx_data += self.build_response(msg_id, response_cmd, response_data)
+
+    def handle_command(self, msg_id, cmd, payload):
+        """
+        处理一条主机命令
+
+        Args:
+            msg_id (int): 消息ID
+            cmd (int): 命令码
+            payload (bytes): 负载数据
+
+        Returns:
+            tuple: (应答命令码, 应答负载)
+        """
+        if cmd == CMD["Ping"]:
+            return CMD["Ack"], b''
+
+        if cmd == CMD["GetCaseList"]:
+            return CMD["CaseList"], ';'.join(self.case_names).encode('ascii')
+
+        if cmd == CMD["RunCase"]:
+            return self.run_case(msg_id, payload)
+
+        if cmd == CMD["Stop"]:
+            self.current_case = None
+            self.run_msg_id = None
+            return CMD["Ack"], b''
+
+        if cmd == CMD["GetCaseResult"]:
+            return self.case_result()
+
+        if cmd == CMD["GetLog"] or cmd == CMD["Getlog"]:
+            return self.next_log_chunk(msg_id)
+
+        return self.nack(NACK_UNKNOWN_CMD)
+
+    def run_case(self, msg_id, payload):
+        """开始运行测例，ID从1开始与CaseID_Manager一致"""
+        # 主机未收到Ack后重发的RunCase，测例已在运行
+        if self.current_case is not None and msg_id == self.run_msg_id:
+            return CMD["Ack"], b''
+
+        if len(payload) < 2:
+            return self.nack(NACK_UNKNOWN_CASE)
+
+        case_id = int.from_bytes(payload[:2], 'big')
+        if not 1 <= case_id <= len(self.case_names):
+            return self.nack(NACK_UNKNOWN_CASE)
+
+        if self.current_case is not None and not self.case_finished():
+            return self.nack(NACK_CASE_BUSY)
+
+        name = self.case_names[case_id - 1]
+        duration = self.durations.get(name, self.default_duration)
+        passed = self.random.random() < self.pass_ratio
+
+        self.current_case = (case_id, self.clock(), duration, passed)
+        self.run_msg_id = msg_id
+        self.result_counted = False
+        self.log_chunks = []
+        self.log_replies = {}
+        self.cases_run += 1
+        return CMD["Ack"], b''
+
+    def case_finished(self):
+        """当前测例是否已运行完成"""
+        _, start, duration, _ = self.current_case
+        return self.clock() - start >= duration
+
+    def case_result(self):
+        """返回CaseRunning或CaseResult(测例ID + 结果，0通过/1失败)"""
+        if self.current_case is None:
+            return self.nack(NACK_NO_RESULT)
+
+        case_id, _, _, passed = self.current_case
+        id_bytes = case_id.to_bytes(2, 'big')
+
+        if not self.case_finished():
+            return CMD["CaseRunning"], id_bytes
+
+        # 结果只统计一次，重复查询返回相同结果
+        if not self.result_counted:
+            self.result_counted = True
+            if passed:
+                self.cases_passed += 1
+            else:
+                self.cases_failed += 1
+                self.log_chunks = self.build_log_chunks(case_id)
+
+        return CMD["CaseResult"], id_bytes + (b'\x00' if passed else b'\x01')
+
+    def build_log_chunks(self, case_id):
+        """
+        生成失败日志并按log_chunk_size分片
+
+        Args:
+            case_id (int): 测例ID
+
+        Returns:
+            list: 日志分片(bytes)
+        """
+        rows = [LOG_HEADER]
+        for index in range(self.log_rows):
+            address = 0x20000000 + case_id * 0x100 + index * 4
+            expected = self.random.getrandbits(32)
+            actual = expected ^ (1 << self.random.randrange(32))
+            rows.append(f"{index},0x{address:08X},0x{expected:08X},0x{actual:08X}")
+        log = (';'.join(rows) + ';').encode('ascii')
+
+        size = max(1, self.log_chunk_size)
+        return [log[start:start + size] for start in range(0, len(log), size)]
+
+    def next_log_chunk(self, msg_id):
+        """
+        返回下一个日志分片，最后一片使用LogFinished
+
+        Args:
+            msg_id (int): GetLog的消息ID，与已发送分片的请求相同时重发该分片
+        """
+        reply = self.log_replies.get(msg_id)
+        if reply is not None:
+            return reply
+
+        if not self.log_chunks:
+            return self.nack(NACK_NO_LOG)
+
+        chunk = self.log_chunks.pop(0)
+        reply = (CMD["LogSending"] if self.log_chunks else CMD["LogFinished"]), chunk
+        self.log_replies[msg_id] = reply
+        return reply
+
+    def nack(self, code):
+        """生成Nack应答，负载为2字节错误代码"""
+        return CMD["Nack"], code.to_bytes(2, 'big')
+
+    def build_response(self, msg_id, cmd, data):
+        """
+        编码应答帧，按corrupt_ratio随机翻转一个字节
+
+        Args:
+            msg_id (int): 与请求相同的消息ID
+            cmd (int): 应答命令码
+            data (bytes): 应答负载
+
+        Returns:
+            bytearray: 应答帧
+        """
+        crc_engine = self.crc_engine if self.use_crc else None
+        crc_length = crc_engine.byte_length if crc_engine is not None else 0
+        frame = bytearray(HEADER_LENGTH + len(data) + crc_length)
+        Frame.encode_frame_into(frame, 0, msg_id, cmd, data, crc_engine)
+
+        if self.corrupt_ratio and self.random.random() < self.corrupt_ratio:
+            position = self.random.randrange(len(frame))
+            frame[position] ^= 1 << self.random.randrange(8)
+            self.corrupted_frames += 1
+
+        return frame
+
+    def get_statistics(self):
+        """
+        获取模拟器统计信息
+
+        Returns:
+            dict: 传输统计、各命令次数、测例运行/通过/失败次数和损坏帧数
+        """
+        statistics = super().get_statistics()
+        statistics.update({
+            'command_counts': dict(self.command_counts),
+            'cases_run': self.cases_run,
+            'cases_passed': self.cases_passed,
+            'cases_failed': self.cases_failed,
+            'corrupted_frames': self.corrupted_frames
+        })
+        return statistics
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3.13
+"""
+filename: request_tracker.py
+author: [peixuSu]
+email: [1420209272@qq.com]
+date: 2026-10-18
+description: 请求跟踪器，按消息ID匹配应答，支持多个请求同时等待应答，不依赖Qt
+"""
+
+import time
+from collections import OrderedDict
+
+
+class RequestTracker:
+    """
+    请求跟踪器
+
+    记录已发送但尚未收到应答的请求(消息ID、命令码、截止时间)，按消息ID把解码出的应答
+    匹配到请求上，过期的请求由expire取出。depth限制同时等待应答的请求数量，固件支持
+    命令排队时可大于1，使多个RunCase/GetCaseResult交互重叠进行。
+
+    兼容模式(depth=1, match_msg_id=False)用于不回传消息ID的固件：任何应答都匹配到
+    唯一等待中的请求，行为与一问一答的流程一致。
+    """
+
+    def __init__(self, depth=1, match_msg_id=True, clock=time.monotonic):
+        """
+        初始化请求跟踪器
+
+        Args:
+            depth (int): 同时等待应答的最大请求数
+            match_msg_id (bool): 是否按消息ID匹配应答，为False时按发送顺序匹配最早的请求
+            clock: 返回当前时间（秒）的函数
+        """
+        self.depth = max(1, depth)
+        self.match_msg_id = match_msg_id
+        self.clock = clock
+
+        # 等待应答的请求，键为消息ID，值为(命令码, 截止时间, 上下文)，按发送顺序排列
+        self.pending = OrderedDict()
+
+        # 统计信息
+        self.sent_count = 0
+        self.matched_count = 0
+        self.unmatched_count = 0
+        self.expired_count = 0
+        self.max_in_flight = 0
+
+    def in_flight(self):
+        """等待应答的请求数"""
+        return len(self.pending)
+
+    def is_full(self):
+        """等待应答的请求数是否已达到depth"""
+        return len(self.pending) >= self.depth
+
+    def register(self, msg_id, cmd, timeout_ms, context=None):
+        """
+        记录一个已发送的请求
+
+        Args:
+            msg_id (int): 请求帧的消息ID
+            cmd (int): 请求命令码
+            timeout_ms (int): 等待应答的时限(毫秒)
+            context: 收到应答时随请求一起返回的数据
+
+        Returns:
+            bool: 记录成功返回True，等待中的请求已满时返回False
+        """
+        if self.is_full():
+            return False
+
+        # 同一消息ID重新发送时覆盖原来的请求
+        self.pending.pop(msg_id, None)
+        self.pending[msg_id] = (cmd, self.clock() + timeout_ms / 1000, context)
+
+        self.sent_count += 1
+        self.max_in_flight = max(self.max_in_flight, len(self.pending))
+        return True
+
+    def match(self, msg_id):
+        """
+        将应答匹配到等待中的请求并移除该请求
+
+        Args:
+            msg_id (int): 应答帧的消息ID
+
+        Returns:
+            tuple: (消息ID, 命令码, 上下文)，没有对应的请求时返回None
+        """
+        if not self.pending:
+            self.unmatched_count += 1
+            return None
+
+        if self.match_msg_id:
+            if msg_id not in self.pending:
+                # 已超时或已取消的请求的迟到应答
+                self.unmatched_count += 1
+                return None
+            cmd, _, context = self.pending.pop(msg_id)
+        else:
+            msg_id, (cmd, _, context) = self.pending.popitem(last=False)
+
+        self.matched_count += 1
+        return msg_id, cmd, context
+
+    def cancel(self, msg_id):
+        """
+        取消等待中的请求，之后到达的应答视为迟到应答
+
+        Args:
+            msg_id (int): 请求帧的消息ID
+        """
+        self.pending.pop(msg_id, None)
+
+    def expire(self):
+        """
+        取出已超过截止时间的请求
+
+        Returns:
+            list: 过期的请求，每项为(消息ID, 命令码, 上下文)
+        """
+        now = self.clock()
+        expired = [
+            (msg_id, cmd, context)
+            for msg_id, (cmd, deadline, context) in self.pending.items()
+            if deadline <= now
+        ]
+        for msg_id, _, _ in expired:
+            del self.pending[msg_id]
+
+        self.expired_count += len(expired)
+        return expired
+
+    def deadline(self, msg_id):
+        """
+        获取请求的截止时间
+
+        Args:
+            msg_id (int): 请求帧的消息ID
+
+        Returns:
+            float: 截止时间，请求不存在时返回None
+        """
+        request = self.pending.get(msg_id)
+        return request[1] if request is not None else None
+
+    def next_deadline(self):
+        """
+        获取最早到期的截止时间
+
+        Returns:
+            float: 截止时间，没有等待中的请求时返回None
+        """
+        if not self.pending:
+            return None
+        return min(deadline for _, deadline, _ in self.pending.values())
+
+    def get_statistics(self):
+        """
+        获取跟踪统计信息
+
+        Returns:
+            dict: 发送、匹配、迟到/未知应答、过期次数和最大同时等待数
+        """
+        return {
+            'sent_count': self.sent_count,
+            'matched_count': self.matched_count,
+            'unmatched_count': self.unmatched_count,
+            'expired_count': self.expired_count,
+            'max_in_flight': self.max_in_flight
+        }
+
+    def reset(self):
+        """
+        清空等待中的请求，统计信息保留
+        """
+        self.pending.clear()
@@ -10,9 +10,17 @@ description: 测试用例相关函数
 from PySide6.QtWidgets import QListWidgetItem, QMessageBox
 from PySide6.QtCore import QTimer
 from datetime import datetime
+import time
 # from controller.crc import CRC
-from .case_manager import CaseItemWidget, CaseID_Manager
-from .frame import Frame, CMD
+from .case_manager import CaseID_Manager
+from .case_item_widget import CaseItemWidget
+from .frame import Frame, CMD, HEADER_LENGTH, frame_msg_id, frame_length_parser
+from .request_tracker import RequestTracker
+from .case_flow import (
+    STATE_IDLE, STATE_WAIT_ACK, STATE_WAIT_RESULT, STATE_RUNNING, STATE_WAIT_LOG,
+    STATE_DONE, STATE_FAILED, STATE_STOPPED, CASE_TIMEOUTS, STATE_TIMEOUT_KEYS,
+    STATE_SIZE_KEYS, AdaptivePolling
+)
 
 
 class ScanCase:
@@ -42,13 +50,16 @@ class ScanCase:
 
         self.application.log_window.log("开始扫描测例····", 3)
 
+        # 丢弃之前流程遗留的帧和字节
+        self.application.frame_decoder.reset()
+
         send_data = Frame.generate_frame(CMD["GetCaseList"])
 
         # print(f"发送的数据：{send_data}，类型：{type(send_data)}")  # 打印发送数据（调试用）
         
         # 发送数据
-        self.application.spi_controller.spi_send(
-            send_data.hex(),
+        self.application.spi_controller.send_bytes_async(
+            send_data,
             self.clk_mode,              # SPI时钟模式
             self.bit_order,
             log = False 
@@ -62,28 +73,39 @@ class ScanCase:
     def receive(self):
         """执行实际的扫描操作"""
         
-        # 提供一个128字节的接收区域来接收数据
-        received_data = self.application.spi_controller.spi_receive(
-            self.clk_mode,
-            self.bit_order,
-            1024,                        # 接收缓冲区大小为1024字节
-            log = False
-        )
-        
-        # print(f"测试接收128字节数据：received_data: {received_data.hex()}")  # 打印接收数据（调试用）
-
         # 根据CRC模式设置解析标志
         if self.application.current_crc_mode == 0:
             use_crc = True
         else:
             use_crc = False
 
+        self.use_crc = use_crc
+
+        # 先读帧头，再按数据长度读取测例列表，在SPI工作线程中执行
+        self.application.spi_controller.receive_frame_async(
+            self.clk_mode,
+            self.bit_order,
+            HEADER_LENGTH,
+            frame_length_parser(use_crc, self.application.crc_engine),
+            size_key = "CaseList",
+            log = False,
+            callback = self.handle_receive
+        )
+
+    def handle_receive(self, received_data):
+        """处理接收到的测例列表
+
+        Args:
+            received_data: SPI工作线程接收到的数据
+        """
+        use_crc = self.use_crc
+
         # 恢复按钮
         self.ui.button_mcu_connect.setEnabled(True)
         self.ui.button_mcu_scan.setEnabled(True)
 
         # 解析接收到的帧数据
-        success, msg_id, cmd, payload, result = Frame.parse_receive_frame(received_data, use_crc)
+        success, msg_id, cmd, payload, result = self.application.frame_decoder.next_frame(received_data, use_crc, self.application.crc_engine)
 
         # 检查解析是否成功
         if success is False:
@@ -162,8 +184,8 @@ class ScanCase:
         self.bit_order = self.ui.combo_box_bit.currentIndex()
 
         # print(f"发送的数据：{frame.hex()}")
-        self.spi_controller.spi_send(
-            frame.hex(),
+        self.spi_controller.send_bytes_async(
+            frame,
             self.clk_mode,
             self.bit_order,
             log = False
@@ -173,13 +195,18 @@ class ScanCase:
 
         # 处理后续命令下发流程
         self.case_execution = CaseExecution(self.application, self.spi_controller, self.case_result_parser, self.case_manager, case_name)
-        QTimer.singleShot(1000, lambda: self.case_execution.receive_ack_response())
+        self.case_execution.start(frame_msg_id(frame))
 
 
 class CaseExecution:
-    """测例执行类，用于执行测例运行、获取结果和日志等操作"""
-    
-    def __init__(self, application, spi_controller, case_result_parser, case_manager, case_name, completion_callback=None, error_callback=None):
+    """
+    测例执行类，用于执行测例运行、获取结果和日志等操作
+
+    以状态机驱动 RunCase → Ack → GetCaseResult → GetLog 流程：每个状态在收到有效应答后
+    立即进入下一状态，未收到完整帧时按poll间隔重新读取，超过该状态的超时时间后重试或报错。
+    """
+
+    def __init__(self, application, spi_controller, case_result_parser, case_manager, case_name, completion_callback=None, error_callback=None, timeouts=None, match_msg_id=False):
         self.application = application
         self.ui = self.application.ui
         self.spi_controller = spi_controller
@@ -191,26 +218,195 @@ class CaseExecution:
         self.case_name = case_name
         self.get_case_result_retry_count = 0
         self.get_log_retry_count = 0
+        # 最近一次GetLog的消息ID，应答超时后以相同的消息ID重发
+        self.log_msg_id = None
         self.completion_callback = completion_callback
         self.error_callback = error_callback  # 添加错误回调引用
 
+        # 各状态的超时时间和轮询间隔(毫秒)
+        self.timeouts = dict(CASE_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+
+        # 当前状态及其截止时间
+        self.state = STATE_IDLE
+        self.state_deadline = 0.0
+        self.case_deadline = 0.0
+
+        # 状态机定时器，同一时刻只有一个等待中的动作
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.on_timer)
+        self.timer_action = None
+
+        self.use_crc = self.application.current_crc_mode == 0
+
+        # 请求跟踪器，同一时刻只有一个请求等待应答；match_msg_id为False时兼容不回传消息ID的固件
+        self.tracker = RequestTracker(1, match_msg_id)
+
+        # 测例开始时间和CaseRunning轮询策略，轮询首个间隔由历史平均时长决定
+        self.start_time = 0.0
+        self.duration = None
+        self.polling = AdaptivePolling(
+            self.timeouts["running_poll_min"],
+            self.timeouts["running_poll_max"],
+            self.timeouts["running_poll_factor"],
+            self.case_result_parser.get_case_duration(case_name)
+        )
+
+    def start(self, msg_id=None):
+        """RunCase帧已提交发送，开始等待Ack.
+
+        Args:
+            msg_id (int): RunCase帧的消息ID
+        """
+        self.start_time = time.monotonic()
+        self.case_deadline = self.start_time + self.timeouts["case"] / 1000
+        self.enter_state(STATE_WAIT_ACK)
+        self.track_request(msg_id, CMD["RunCase"])
+        self.read_response()
+
     def receive_ack_response(self):
-        """接收Ack响应."""
+        """接收Ack响应，兼容旧的调用入口."""
+        self.start()
+
+    def stop(self):
+        """停止状态机，丢弃之后到达的应答."""
+        self.tracker.reset()
+        # 清空解码器中未取走的帧和字节，避免被当作下一个请求的应答
+        self.application.frame_decoder.reset()
+        self.timer.stop()
+        self.timer_action = None
+        self.state = STATE_STOPPED
+
+    def is_active(self):
+        """状态机是否仍在运行."""
+        return self.state not in (STATE_IDLE, STATE_DONE, STATE_FAILED, STATE_STOPPED)
+
+    def enter_state(self, state):
+        """
+        进入新状态并设置该状态的截止时间
 
-        if self.application.current_crc_mode == 0:
-            use_crc = True
-        else:
-            use_crc = False
+        Args:
+            state (str): 新状态
+        """
+        self.state = state
+        timeout = self.timeouts[STATE_TIMEOUT_KEYS[state]]
+        self.state_deadline = time.monotonic() + timeout / 1000
 
-        received_data = self.spi_controller.spi_receive(
-            self.clk_mode, 
-            self.bit_order, 
-            128, 
-            log=False
+    def schedule(self, delay_ms, action):
+        """
+        延时执行动作，延时为0时在下一次事件循环中执行
+
+        Args:
+            delay_ms (int): 延时(毫秒)
+            action: 需要执行的函数
+        """
+        self.timer_action = action
+        self.timer.start(int(delay_ms))
+
+    def on_timer(self):
+        """执行定时器到期的动作."""
+        action = self.timer_action
+        self.timer_action = None
+        if action is not None and self.is_active():
+            action()
+
+    def finish(self):
+        """测例流程正常结束."""
+        self.timer.stop()
+        self.state = STATE_DONE
+        if self.completion_callback:
+            self.completion_callback()
+
+    def fail(self):
+        """测例流程出错结束，通知send_controller停止."""
+        self.timer.stop()
+        self.application.frame_decoder.reset()
+        self.state = STATE_FAILED
+        if self.error_callback:
+            self.error_callback()
+
+    def track_request(self, msg_id, cmd):
+        """
+        记录当前等待应答的请求，之前未收到应答的请求作废
+
+        Args:
+            msg_id (int): 请求帧的消息ID
+            cmd (int): 请求命令码
+        """
+        self.tracker.reset()
+        self.tracker.register(msg_id, cmd, self.timeouts[STATE_TIMEOUT_KEYS[self.state]])
+
+    def read_response(self):
+        """在SPI工作线程中读取当前状态的应答帧."""
+        self.spi_controller.receive_frame_async(
+            self.clk_mode,
+            self.bit_order,
+            HEADER_LENGTH,
+            frame_length_parser(self.use_crc, self.application.crc_engine),
+            size_key=STATE_SIZE_KEYS[self.state],
+            log=False,
+            callback=self.handle_response
         )
 
-        success, msg_id, cmd, payload, result = Frame.parse_receive_frame(received_data, use_crc)
-        
+    def handle_response(self, received_data):
+        """
+        解码应答帧并交给当前状态处理，未收到完整帧时在截止时间前继续读取
+
+        Args:
+            received_data: SPI工作线程接收到的数据
+        """
+        if not self.is_active():
+            return
+
+        decoder = self.application.frame_decoder
+        success, msg_id, cmd, payload, result = decoder.next_frame(received_data, self.use_crc, self.application.crc_engine)
+
+        # 截止时间已到仍未组成完整帧时，缓冲区开头可能是数据长度很大的误判帧头，逐字节跳过后重新同步
+        if not success and time.monotonic() >= self.state_deadline:
+            while not success and decoder.resync():
+                success, msg_id, cmd, payload, result = decoder.next_frame()
+
+        # 丢弃已作废请求的迟到应答
+        while success and self.tracker.match(msg_id) is None:
+            self.application.log_window.log(f"丢弃迟到的应答，消息ID: {msg_id}, 命令字: {hex(int(cmd))}", 0)
+            success, msg_id, cmd, payload, result = decoder.next_frame()
+
+        if not success:
+            if time.monotonic() < self.state_deadline:
+                self.schedule(self.timeouts["poll"], self.read_response)
+                return
+            self.handle_timeout(result)
+            return
+
+        if self.state == STATE_WAIT_ACK:
+            self.handle_ack_response(cmd, payload)
+        elif self.state == STATE_WAIT_RESULT:
+            self.handle_case_result(cmd, payload)
+        elif self.state == STATE_WAIT_LOG:
+            self.handle_log_response(cmd, payload)
+
+    def handle_timeout(self, result):
+        """
+        当前状态超时处理
+
+        Args:
+            result (str): 最后一次解码的错误信息
+        """
+        if self.state == STATE_WAIT_ACK:
+            self.application.log_window.log(f"接收Ack失败：{result}", 2)
+            self.fail()
+        elif self.state == STATE_WAIT_RESULT:
+            self.application.log_window.log(f"接收CaseResult失败：{result}", 2)
+            self.retry_case_result()
+        elif self.state == STATE_WAIT_LOG:
+            self.application.log_window.log(f"接收Log失败：{result}", 2)
+            self.retry_log_request(resend=True)
+
+    def handle_ack_response(self, cmd, payload):
+        """处理接收到的Ack响应."""
+
         # 检查命令字是否为Ack
         if cmd == CMD["Ack"]:
 
@@ -222,17 +418,15 @@ class CaseExecution:
         else:
             self.application.log_window.log(f"收到非Ack命令：{hex(int(cmd))}", 2)
             # 在遇到错误时调用完成回调，通知send_controller停止
-            if self.error_callback:
-                self.error_callback()
-            return
-    
+            self.fail()
+
     def send_get_case_result(self):
         """发送GetCaseResult指令."""
 
         generate_frame = Frame.generate_frame(CMD["GetCaseResult"])
 
-        self.spi_controller.spi_send(
-            generate_frame.hex(), 
+        self.spi_controller.send_bytes_async(
+            generate_frame, 
             self.clk_mode, 
             self.bit_order,
             log = False
@@ -241,127 +435,70 @@ class CaseExecution:
         # self.application.log_window.log("发送GetCaseResult指令", 1)
 
         # 准备接收响应
-        QTimer.singleShot(1000, self.receive_case_result)
-
-    def receive_case_result(self):
-        """接收CaseResult响应."""
-
-        # self.application.log_window.log("接收CaseResult响应", 1)
-        
-        if self.application.current_crc_mode == 0:
-            use_crc = True
-        else:
-            use_crc = False
-
-        received_data = self.spi_controller.spi_receive(
-            self.clk_mode, 
-            self.bit_order, 
-            1024, 
-            log=False
-        )
-
-        success, msg_id, cmd, payload, result = Frame.parse_receive_frame(received_data, use_crc)
-
-        # 检查帧解析是否成功
-        if not success:
-            self.application.log_window.log(f"接收CaseResult失败：{result}", 2)
-            # 增加重试计数
-            self.get_case_result_retry_count += 1
-            if self.get_case_result_retry_count >= 3:
-                self.application.log_window.log("无法接收到测例结果", 2)
-                # 重置计数器
-                self.get_case_result_retry_count = 0
-                # 在多次尝试失败后调用完成回调，通知send_controller停止
-                if self.error_callback:
-                    self.error_callback()
-                return
-            # 重新尝试获取CaseResult
-            QTimer.singleShot(5000, self.send_get_case_result)
+        self.enter_state(STATE_WAIT_RESULT)
+        self.track_request(frame_msg_id(generate_frame), CMD["GetCaseResult"])
+        self.read_response()
+
+    def retry_case_result(self):
+        """重新发送GetCaseResult，超过重试次数时报错."""
+        # 增加重试计数
+        self.get_case_result_retry_count += 1
+        if self.get_case_result_retry_count >= self.timeouts["retries"]:
+            self.application.log_window.log("无法接收到测例结果", 2)
+            # 重置计数器
+            self.get_case_result_retry_count = 0
+            # 在多次尝试失败后调用完成回调，通知send_controller停止
+            self.fail()
             return
+        # 重新尝试获取CaseResult
+        self.schedule(self.timeouts["retry"], self.send_get_case_result)
+
+    def handle_case_result(self, cmd, payload):
+        """处理接收到的CaseResult响应."""
 
         # 检查命令字类型
         if cmd == CMD["CaseResult"]:
             # self.application.log_window.log("测例运行完成", 1)
-            self.result_parse(received_data)
             self.get_case_result_retry_count = 0
+            # 记录测例运行时长，随结果保存
+            self.duration = time.monotonic() - self.start_time
+            self.result_parse(cmd, payload)
         elif cmd == CMD["CaseRunning"]:
             self.application.log_window.log(f"{self.case_name}运行中····", 3)
-            # 测例运行，重新尝试获取结果
-            # 增加重试计数
-            self.get_case_result_retry_count += 1
-            if self.get_case_result_retry_count >= 40:
+            # 测例运行，超过测例总时限时报超时
+            if time.monotonic() >= self.case_deadline:
                 self.application.log_window.log("运行超时", 2)
-                # 重置计数器
-                self.get_case_result_retry_count = 0
-                # 在超时后调用完成回调，通知send_controller停止
-                if self.error_callback:
-                    self.error_callback()
+                self.fail()
                 return
-            QTimer.singleShot(5000, self.send_get_case_result)
+            self.enter_state(STATE_RUNNING)
+            elapsed_ms = (time.monotonic() - self.start_time) * 1000
+            interval = self.polling.next_interval(elapsed_ms)
+            # 不超过测例总时限
+            remaining_ms = (self.case_deadline - time.monotonic()) * 1000
+            self.schedule(max(0, min(interval, remaining_ms)), self.send_get_case_result)
         elif cmd == CMD["Nack"]:
-            # if bytes(payload).hex() == "250a":
-            #     self.application.log_window.log("退出测试", 2)
-            #     return
-            
             self.application.log_window.log(f"收到Nack响应，负载: {bytes(payload).hex()}", 2)
             # Nack响应，重新尝试获取结果
-            # 增加重试计数
-            self.get_case_result_retry_count += 1
-            if self.get_case_result_retry_count >= 3:
-                self.application.log_window.log("无法接收到测例结果", 2)
-                # 重置计数器
-                self.get_case_result_retry_count = 0
-                # 在多次Nack后调用完成回调，通知send_controller停止
-                if self.error_callback:
-                    self.error_callback()
-                return
-            QTimer.singleShot(5000, self.send_get_case_result)
+            self.retry_case_result()
         else:
             self.application.log_window.log(f"收到意外命令字：{hex(int(cmd))}，负载: {bytes(payload).hex()}", 2)
             # 重新尝试获取结果
-            # 增加重试计数
-            self.get_case_result_retry_count += 1
-            if self.get_case_result_retry_count >= 3:
-                self.application.log_window.log("无法接收到测例结果", 2)
-                # 重置计数器
-                self.get_case_result_retry_count = 0
-                # 在收到意外命令后调用完成回调，通知send_controller停止
-                if self.error_callback:
-                    self.error_callback()
-                return
-            QTimer.singleShot(5000, self.send_get_case_result)
+            self.retry_case_result()
 
-    def result_parse(self, received_data):
+    def result_parse(self, cmd, payload):
         """解析测例结果.
 
         Args:
-            received_data: 接收到的数据
+            cmd: 已解码帧的命令字
+            payload: 已解码帧的负载数据
         """
 
-        # 检查是否使用CRC校验
-        if self.application.current_crc_mode == 0:
-            use_crc = True
-        else:
-            use_crc = False
-
-        # 解析接收到的帧数据
-        success, msg_id, cmd, payload, result = Frame.parse_receive_frame(received_data, use_crc)
-
-        # 检查解析结果是否成功
-        if success is False:
-            self.application.log_window.log(f"接收数据失败：{result}", 2)
-            # 在解析失败时调用完成回调，通知send_controller停止
-            if self.error_callback:
-                self.error_callback()
-            return
-        
         # 检查命令是否为否定应答(Nack)
         if cmd == (CMD["Nack"]):
             self.application.log_window.log("RISC-V答应失败", 2)
             self.application.log_window.log(f"负载: {bytes(payload[:2])}")
             # 在Nack响应时调用完成回调，通知send_controller停止
-            if self.error_callback:
-                self.error_callback()
+            self.fail()
             return
         
         if cmd == (CMD["CaseResult"]):
@@ -369,15 +506,13 @@ class CaseExecution:
             if len(payload) > 3:
                 self.application.log_window.log(f"测例结果负载长度过长，负载: {bytes(payload).hex()}", 2)
                 # 在负载长度异常时调用完成回调，通知send_controller停止
-                if self.error_callback:
-                    self.error_callback()
+                self.fail()
                 return
             
             if len(payload) < 3:
                 self.application.log_window.log(f"测例结果负载长度过短，负载: {bytes(payload).hex()}", 2)
                 # 在负载长度异常时调用完成回调，通知send_controller停止
-                if self.error_callback:
-                    self.error_callback()
+                self.fail()
                 return
 
             # 格式化结果负载
@@ -385,25 +520,20 @@ class CaseExecution:
             case_id = payload[0:2]
             case_result = payload[2]
 
-            # 获取已处理的测例信息
-            processed_result = self.case_manager.get_processed_case()
-
-            # 查找对应的测例, 并记录测例名称
-            for case_name, case_payload in processed_result.items():
-                if bytes(case_id) == case_payload:
-                    self.case_name = case_name
-                    break
+            # 按测例ID查找对应的测例, 并记录测例名称
+            case_name = self.case_manager.get_case_name(case_id)
+            if case_name is not None:
+                self.case_name = case_name
 
             if case_result == 0:
                 self.application.log_window.log(f"{self.case_name}测试通过", 1)
                 
                 # 记录成功的测试结果
-                timestamp = datetime.now().strftime("%H:%M:%S")
-                self.case_result_parser.save_success_result(timestamp, self.case_name, f"{self.case_name}运行结果正确")
+                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                self.case_result_parser.save_success_result(timestamp, self.case_name, f"{self.case_name}运行结果正确", self.duration, case_id)
                 
                 # 测例成功，直接调用完成回调
-                if self.completion_callback:
-                    self.completion_callback()
+                self.finish()
             elif case_result == 1:
                 self.application.log_window.log(f"{self.case_name}测试未通过", 2)
 
@@ -412,13 +542,11 @@ class CaseExecution:
             else:
                 self.application.log_window.log(f"测例{self.case_name}执行结果未知，负载: {bytes(payload).hex()}", 2)
                 # 在未知结果时调用完成回调，通知send_controller停止
-                if self.error_callback:
-                    self.error_callback()
+                self.fail()
         else:
             self.application.log_window.log(f"收到意外命令字：{hex(int(cmd))}，负载: {bytes(payload).hex()}", 2)
             # 对于未知结果也调用完成回调
-            if self.error_callback:
-                self.error_callback()
+            self.fail()
             return
 
     def ask_log(self):
@@ -430,74 +558,57 @@ class CaseExecution:
         self.get_log_retry_count = 0
         
         # 发送GetLog命令
-        QTimer.singleShot(1000, self.log_request)
+        self.log_request()
 
-    def log_request(self):
+    def log_request(self, msg_id=None):
         """
         发送GetLog命令，请求获取日志信息.
+
+        Args:
+            msg_id (int, optional): 重发时使用原请求的消息ID，固件据此返回同一日志分片
         """
 
-        generate_frame = Frame.generate_frame(CMD["GetLog"])
-        self.spi_controller.spi_send(
-            generate_frame.hex(), 
+        generate_frame = Frame.generate_frame(CMD["GetLog"], msg_id=msg_id)
+        self.log_msg_id = frame_msg_id(generate_frame)
+        self.spi_controller.send_bytes_async(
+            generate_frame, 
             self.clk_mode, 
             self.bit_order,
             log = False
         )
 
         # 准备接收Log响应
-        QTimer.singleShot(1000, self.log_response)
+        self.enter_state(STATE_WAIT_LOG)
+        self.track_request(frame_msg_id(generate_frame), CMD["GetLog"])
+        self.read_response()
 
-    def log_response(self):
-        """
-        接收Log响应
-        """
-
-        if self.application.current_crc_mode == 0:
-            use_crc = True
-        else:
-            use_crc = False
+    def retry_log_request(self, resend=False):
+        """重新发送GetLog，超过重试次数时报错.
 
-        received_data = self.spi_controller.spi_receive(
-            self.clk_mode, 
-            self.bit_order, 
-            512, 
-            log=False
-        )
+        Args:
+            resend (bool): 应答超时时为True，以原消息ID重发，避免跳过应答丢失的日志分片
+        """
+        # 增加重试计数
+        self.get_log_retry_count += 1
+        if self.get_log_retry_count >= self.timeouts["retries"]:
+            self.application.log_window.log("无法接收到日志信息", 2)
+            # 重置计数器
+            self.get_log_retry_count = 0
+            # 在多次尝试失败后调用完成回调，通知send_controller停止
+            self.fail()
+            return
+        # 重新尝试获取Log
+        msg_id = self.log_msg_id if resend else None
+        self.schedule(self.timeouts["retry"], lambda: self.log_request(msg_id))
 
-        success, msg_id, cmd, payload, result = Frame.parse_receive_frame(received_data, use_crc)
+    def handle_log_response(self, cmd, payload):
+        """
+        处理接收到的Log响应
+        """
 
-        # 检查帧解析是否成功
-        if not success:
-            self.application.log_window.log(f"接收CaseResult失败：{result}", 2)
-            # 增加重试计数
-            self.get_log_retry_count += 1
-            if self.get_log_retry_count >= 3:
-                self.application.log_window.log("无法接收到日志信息", 2)
-                # 重置计数器
-                self.get_log_retry_count = 0
-                # 在多次尝试失败后调用完成回调，通知send_controller停止
-                if self.error_callback:
-                    self.error_callback()
-                return
-            # 重新尝试获取Log
-            QTimer.singleShot(1000, self.log_request)
-            return
-        
         if cmd != CMD["LogSending"] and cmd != CMD["LogFinished"]:
             self.application.log_window.log(f"收到意外命令字：{hex(int(cmd))}，负载: {bytes(payload).hex()}", 2)
-            # 增加重试计数
-            self.get_log_retry_count += 1
-            if self.get_log_retry_count >= 3:
-                self.application.log_window.log("无法接收到日志信息", 2)
-                # 重置计数器
-                self.get_log_retry_count = 0
-                # 在收到意外命令时调用完成回调，通知send_controller停止
-                if self.error_callback:
-                    self.error_callback()
-                return
-            # 重新尝试获取Log
-            QTimer.singleShot(1000, self.log_request)
+            self.retry_log_request()
             return
 
         if cmd == CMD["LogSending"]:
@@ -506,14 +617,16 @@ class CaseExecution:
             # print(f"解码成功: {bytes(payload).decode('ascii')}")
 
             self.log.append(bytes(payload).decode("latin-1"))
-            print(f"解码成功: {bytes(payload).decode('latin-1')}") 
+            # print(f"解码成功: {bytes(payload).decode('latin-1')}") 
 
-            QTimer.singleShot(1000, self.log_request)
+            # 立即请求下一段日志
+            self.get_log_retry_count = 0
+            self.log_request()
                 
         elif cmd == CMD["LogFinished"]:
 
             self.log.append(bytes(payload).decode("latin-1"))
-            print(f"解码成功: {bytes(payload).decode('latin-1')}") 
+            # print(f"解码成功: {bytes(payload).decode('latin-1')}") 
 
             self.application.log_window.log("日志传输完成", 0)
 
@@ -524,14 +637,13 @@ class CaseExecution:
             log = ''.join(self.log)
 
             # 格式化时间戳
-            timestamp = datetime.now().strftime("%H:%M:%S")
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 
             # 保存失败案例的详细日志
-            self.case_result_parser.save_result(timestamp, self.case_name, log)
+            self.case_result_parser.save_result(timestamp, self.case_name, log, self.duration, self.case_manager.get_case_id(self.case_name))
 
             # 清空日志缓冲区，为下次使用做准备
             self.log.clear()
 
-            if self.completion_callback:
-                self.completion_callback()
+            self.finish()
@@ -12,7 +12,8 @@ from PySide6.QtCore import QObject
 from PySide6.QtGui import QDragEnterEvent, QDropEvent
 from .scan_device import ScanDevice
 from .risc_v_case import ScanCase
-from .case_manager import CaseID_Manager, CaseItemWidget
+from .case_manager import CaseID_Manager
+from .case_item_widget import CaseItemWidget
 from .send_controller import SendController
 # from .log.log_ import CsvManager
 
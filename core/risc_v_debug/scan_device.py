@@ -1,5 +1,5 @@
 from PySide6.QtCore import QTimer
-from .frame import Frame, CMD
+from .frame import Frame, CMD, HEADER_LENGTH, frame_length_parser
 
 class ScanDevice:
     """设备扫描类，用于执行设备连接检测操作"""
@@ -21,6 +21,9 @@ class ScanDevice:
 
         self.application.log_window.log("开始连接设备····", 3)
 
+        # 丢弃之前流程遗留的帧和字节
+        self.application.frame_decoder.reset()
+
         # 生成帧
         send_data = Frame.generate_frame(CMD["Ping"])
 
@@ -28,8 +31,8 @@ class ScanDevice:
 
         # self.LogManager.frame_record(Frame.current_msg_id, "Ping")  # 帧记录（被注释）
 
-        self.application.spi_controller.spi_send(
-            send_data.hex(),
+        self.application.spi_controller.send_bytes_async(
+            send_data,
             self.clk_mode,
             self.bit_order,
             log = False 
@@ -41,27 +44,35 @@ class ScanDevice:
     def receive(self):
         """执行实际的扫描操作"""
 
-        # 根据CRC模式接收响应数据
+        # 根据CRC模式设置解析标志
         if self.application.current_crc_mode == 0:
-            # CRC模式下接收数据
-            received_data = self.application.spi_controller.spi_receive(
-                self.clk_mode,
-                self.bit_order,
-                20,  # 接收缓冲区大小为20字节
-                log = False
-            )
-            # print(f"received_data: {received_data.hex()}")  # 打印接收数据（调试用）
             use_crc = True  # 设置CRC使用标志
         else:
-            # 非CRC模式下接收数据
-            received_data = self.application.spi_controller.spi_receive(
-                self.clk_mode,
-                self.bit_order,
-                20  # 接收缓冲区大小为20字节
-            )
-            # print(f"received_data: {received_data.hex()}")  # 打印接收数据（调试用）
             use_crc = False  # 设置CRC使用标志
 
+        self.use_crc = use_crc
+
+        # 先读帧头，再按数据长度读取剩余数据，在SPI工作线程中执行
+        self.application.spi_controller.receive_frame_async(
+            self.clk_mode,
+            self.bit_order,
+            HEADER_LENGTH,
+            frame_length_parser(use_crc, self.application.crc_engine),
+            size_key = "Ack",
+            log = not use_crc,
+            callback = self.handle_receive
+        )
+
+    def handle_receive(self, received_data):
+        """处理接收到的Ping响应
+
+        Args:
+            received_data: SPI工作线程接收到的数据
+        """
+        use_crc = self.use_crc
+
+        # print(f"received_data: {received_data.hex()}")  # 打印接收数据（调试用）
+
         print("运行到接收响应")
 
         # 接收到数据,恢复按钮
@@ -69,7 +80,7 @@ class ScanDevice:
         self.ui.button_mcu_scan.setEnabled(True)
 
         # 解析接收到的帧数据
-        success, _, cmd, payload, result = Frame.parse_receive_frame(received_data, use_crc)
+        success, _, cmd, payload, result = self.application.frame_decoder.next_frame(received_data, use_crc, self.application.crc_engine)
         
         # 根据解析结果处理响应
         if success is True:
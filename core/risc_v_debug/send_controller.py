@@ -1,11 +1,14 @@
 from PySide6.QtCore import QObject, Signal, QTimer
 import random
 from .risc_v_case import CaseExecution  # 导入CaseExecution类
+from .case_flow import CASE_TIMEOUTS
+from .case_manager import CasePackage
+from .frame import frame_msg_id
 import time
 
 class SendController(QObject):
     """
-        非线程发送控制器，负责从MCU_list_test中获取item并发送
+        非线程发送控制器，开始时从MCU_list_test生成运行计划并按计划发送
     """
     log_signal = Signal(str, int)
     finished_signal = Signal()
@@ -23,6 +26,9 @@ class SendController(QObject):
         self.case_manager = case_manager
         self.spi_controller = spi_controller
 
+        # 运行计划，每项为(测例名称, 测例ID, 负载, RunCase帧模板)，开始时从列表生成一次
+        self.run_plan = []
+
         # 初始化变量
         self.current_item_index = 0
         self.item_count = 0
@@ -38,6 +44,13 @@ class SendController(QObject):
         self.timer = QTimer()
         self.timer.timeout.connect(self.execute_next_case)
         
+        # 测例执行的超时时间和间隔(毫秒)，可在启动前修改
+        self.case_timeouts = dict(CASE_TIMEOUTS)
+        self.case_execution = None
+
+        # 是否按消息ID匹配应答，固件回传请求的消息ID时可开启以丢弃迟到的应答
+        self.match_msg_id = False
+
         # 添加开始时间记录和运行的case计数
         self.start_time = None
         self.executed_case_count = 0
@@ -49,6 +62,9 @@ class SendController(QObject):
         self.start_time = time.time()  # 记录开始时间
         self.executed_case_count = 0  # 重置执行的case计数
 
+        # 丢弃上次运行遗留在解码器中的帧和字节
+        self.application.frame_decoder.reset()
+
         # 获取模式选择
         self.mode = self.ui.comboBox_mode_select.currentText()
 
@@ -74,21 +90,55 @@ class SendController(QObject):
         else:
             self.round_count = 0  # 无限循环用0表示
         
-        # 从MCU_list_test中获取所有item
-        test_list = self.ui.MCU_list_test
-        self.item_count = test_list.count()
+        # 从MCU_list_test生成运行计划，运行过程中不再访问列表控件
+        if not self.build_run_plan():
+            self.show_time()
+            return
+
+        self.item_count = len(self.run_plan)
         
         if self.item_count == 0:
             self.log_signal.emit("MCU测试列表为空，无法进行测试", 2)
             self.show_time()
             return
         
-        # 初始化当前轮次
+        # 初始化当前轮次和测例位置
         self.current_round = 0
+        self.current_item_index = 0
         
         # 开始执行第一个测例
         self.execute_next_case()
 
+    def build_run_plan(self):
+        """
+        读取MCU_list_test中的测例和负载，预先打包RunCase帧模板
+        
+        Returns:
+            bool: 负载均有效时返回True
+        """
+        test_list = self.ui.MCU_list_test
+
+        # CRC模式在运行期间保持不变，CRC直接写入帧模板
+        crc_engine = self.application.crc_engine if self.application.current_crc_mode == 0 else None
+        case_package = CasePackage()
+
+        self.run_plan = []
+        for index in range(test_list.count()):
+            widget = test_list.itemWidget(test_list.item(index))
+            # 没有控件的列表项直接跳过
+            if not widget:
+                continue
+
+            payload = CasePackage.parse_payload(widget.input_payload.text())
+            if payload is None or widget.input_payload.text() == "":
+                self.log_signal.emit(f"请输入正确的数据: {widget.name}", 2)
+                return False
+
+            template = case_package.package_template(widget.id, payload, crc_engine)
+            self.run_plan.append((widget.name, widget.id, payload, template))
+
+        return True
+
     def execute_next_case(self):
         """执行下一个测例"""
         # 检查是否仍在运行
@@ -104,9 +154,6 @@ class SendController(QObject):
             self.show_time()
             return
 
-        # 获取列表项
-        test_list = self.ui.MCU_list_test
-
         if self.mode == "循环发送":
             # 循环发送模式
             if self.current_item_index >= self.item_count:
@@ -118,92 +165,59 @@ class SendController(QObject):
                     self.running = False
                     self.show_time()
                     return
-            list_item = test_list.item(self.current_item_index)
-        elif self.mode == "随机发送":
+            entry = self.run_plan[self.current_item_index]
+        else:
             # 随机发送模式
-            if self.item_count > 0:
-                random_index = random.randint(0, self.item_count - 1)
-                list_item = test_list.item(random_index)
-
-                # 在随机模式下，每次执行完一个case就增加round计数
-                # 因为每次都是随机选择，所以需要通过round计数来控制总次数
-                if self.current_round >= self.round_count and self.round_count > 0:
-                    self.log_signal.emit("已达到设定的随机次数", 1)
-                    self.running = False
-                    self.show_time()
-                    return
-                
-                # 对于随机模式，我们增加round计数，而不是item_index
-                self.current_round += 1
-            else:
-                list_item = None
-
-        if not list_item:
-            # 如果没有找到列表项，继续下一个
-            if self.running:  # 检查是否需要继续
-                if self.mode == "循环发送":
-                    self.current_item_index += 1
-                QTimer.singleShot(1000, self.execute_next_case)  # 非阻塞延时1s后继续
-            return
+            # 在随机模式下，每次执行完一个case就增加round计数
+            # 因为每次都是随机选择，所以需要通过round计数来控制总次数
+            if self.current_round >= self.round_count and self.round_count > 0:
+                self.log_signal.emit("已达到设定的随机次数", 1)
+                self.running = False
+                self.show_time()
+                return
+            entry = self.run_plan[random.randint(0, self.item_count - 1)]
 
-        # 获取item对应的widget（这是一个CaseItemWidget）
-        widget = test_list.itemWidget(list_item)
-        if not widget:
-            if self.running:  # 检查是否需要继续
-                if self.mode == "循环发送":
-                    self.current_item_index += 1
-                QTimer.singleShot(1000, self.execute_next_case)  # 非阻塞延时1s后继续
-            return
+            # 对于随机模式，我们增加round计数，而不是item_index
+            self.current_round += 1
 
         # 记录当前执行的测例名称
-        self.current_case_name = widget.name
+        self.current_case_name = entry[0]
 
-        # 临时连接信号以发送数据
-        widget.send_frame.connect(self.send_frame_data)
-        try:
-            # 开始执行测例
-            # self.log_signal.emit(f"开始执行测例: {widget.name}", 1)
-            widget.send_clicked()
-            
-            # 增加执行的case计数
-            self.executed_case_count += 1
-        except Exception as e:
-            self.log_signal.emit(f"执行测例 {widget.name} 时出错: {str(e)}", 2)
-        finally:
-            # 断开临时连接
-            try:
-                widget.send_frame.disconnect(self.send_frame_data)
-            except TypeError:
-                pass  # 如果没有连接，则忽略错误
-
-    def send_frame_data(self, frame, correct, case_name=None):
-        """发送帧数据并启动CaseExecution实例来处理后续流程"""
-        if correct is False:
-            self.log_signal.emit("请输入正确的数据", 2)
-            return
+        # 增加执行的case计数
+        self.executed_case_count += 1
+
+        # 开始执行测例
+        # self.log_signal.emit(f"开始执行测例: {entry[0]}", 1)
+        self.send_case(entry)
+
+    def send_case(self, entry):
+        """
+        发送RunCase帧并启动CaseExecution实例来处理后续流程
         
+        Args:
+            entry (tuple): 运行计划中的一项(测例名称, 测例ID, 负载, RunCase帧模板)
+        """
+        case_name, _, _, template = entry
+
         try:
-            # 发送数据到SPI
-            self.application.spi_controller.spi_send(
-                frame.hex(),
+            # 帧模板只需写入消息ID和CRC，提交时复制，模板可立即复用
+            frame = template.build()
+            self.application.spi_controller.send_bytes_async(
+                frame,
                 self.clk_mode,
                 self.bit_order,
-                log=False
+                log=False,
+                append_crc=False
             )
 
-            # 创建CaseExecution实例来处理后续流程
-            # 注意：这里需要传递case_name参数和完成回调
-            if case_name is None:
-                case_name = self.current_case_name  # 如果没有传递case_name，则使用当前记录的名称
-            
             # 定义完成回调，用于继续执行下一个测例
             def on_case_completion():
                 # 在执行下一个测例前，先递增索引
                 if self.mode == "循环发送":
                     self.current_item_index += 1
-                QTimer.singleShot(3000, self.execute_next_case)  # 3秒后执行下一个测例
+                QTimer.singleShot(self.case_timeouts["case_gap"], self.execute_next_case)  # 间隔case_gap后执行下一个测例
 
-                    # 定义错误回调，用于在出现错误时停止控制器
+            # 定义错误回调，用于在出现错误时停止控制器
             def on_error_callback(error_message=None):
                 self.running = False
                 self.log_signal.emit("出现错误，已终止", 2)
@@ -218,16 +232,20 @@ class SendController(QObject):
                 self.case_manager,
                 case_name,
                 completion_callback=on_case_completion,  # 传递完成回调
-                error_callback=on_error_callback  # 传递错误回调
+                error_callback=on_error_callback,  # 传递错误回调
+                timeouts=self.case_timeouts,
+                match_msg_id=self.match_msg_id
             )
 
-            # 启动CaseExecution的流程
+            # 启动CaseExecution的流程，RunCase已排在SPI工作线程队列中，收到Ack后立即进入下一状态
             # self.log_signal.emit(f"启动CaseExecution来处理 {case_name} 的响应", 1)
-            QTimer.singleShot(1000, lambda: self.case_execution.receive_ack_response())
+            self.case_execution.start(frame_msg_id(frame))
 
         except Exception as e:
             self.log_signal.emit(f"发送数据时出错: {str(e)}", 2)
             # 即使发生错误，也要继续执行下一个测例
+            if self.mode == "循环发送":
+                self.current_item_index += 1
             QTimer.singleShot(1000, self.execute_next_case)
     
     def stop(self):
@@ -239,6 +257,11 @@ class SendController(QObject):
         # 停止任何正在运行的计时器
         if self.timer.isActive():
             self.timer.stop()
+
+        # 停止正在执行的测例状态机，之后不会再有完成回调，直接结束
+        if self.case_execution is not None and self.case_execution.is_active():
+            self.case_execution.stop()
+            self.show_time()
     
     def is_user_stopped(self):
         """
@@ -267,5 +290,11 @@ class SendController(QObject):
                 self.log_signal.emit(f"用户手动停止 - 总运行时间: {time_str}, 执行了 {self.executed_case_count} 个case", 1)
             else:
                 self.log_signal.emit(f"测试完成 - 总运行时间: {time_str}, 执行了 {self.executed_case_count} 个case", 1)
+
+            # 显示帧解码统计信息
+            stats = self.application.frame_decoder.get_statistics()
+            self.log_signal.emit(
+                f"帧解码统计 - 完整帧: {stats['frame_count']}, 重同步: {stats['resync_count']}次, "
+                f"丢弃: {stats['dropped_bytes']}字节, CRC错误: {stats['crc_error_count']}次", 0)
         
         self.finished_signal.emit()
\ No newline at end of file
@@ -7,9 +7,10 @@ date: 2025-11-25
 description: CRC配置子窗口，处理CRC校验相关的配置和设置
 """
 
-from PySide6.QtWidgets import QWidget
+from PySide6.QtWidgets import QWidget, QMessageBox
 from PySide6.QtCore import Signal
 from core.ui.Ui_sub_crc import Ui_SubForm_CRC
+from utils.crc.crc_manager import CRCEngine, get_crc_engine
 
 
 class SubWindowCRC(QWidget):
@@ -19,6 +20,9 @@ class SubWindowCRC(QWidget):
     # 定义CRC更新信号，用于通知主窗口CRC配置已更改
     crc_updated = Signal(int)
 
+    # 定义CRC参数更新信号，携带根据界面参数生成的CRC引擎
+    crc_config_updated = Signal(object)
+
     # 用户自定义标志
     user_define = False
 
@@ -53,6 +57,8 @@ class SubWindowCRC(QWidget):
         self.ui.check_box_crc_enable.stateChanged.connect(self.crc_enable)
         self.ui.button_crc_confirm.clicked.connect(self.crc_confirm)
         self.ui.button_crc_cancel.clicked.connect(self.crc_close)        
+        self.ui.line_edit_crc_poly.textChanged.connect(self.update_formula)
+        self.ui.combo_box_crc_width.currentTextChanged.connect(self.update_formula)
 
     def crc_init(self):
         """
@@ -168,31 +174,108 @@ class SubWindowCRC(QWidget):
         """
         显示CRC-16用户配置
         
-        设置CRC-16的默认参数值
+        显示主窗口当前使用的CRC参数，并启用参数输入控件
         """
-        # 设置CRC宽度为16
-        self.ui.combo_box_crc_width.addItems(["16"])
+        # 获取当前CRC引擎，未配置时使用默认的CRC-16参数
+        engine = getattr(self.application, "crc_engine", None) or get_crc_engine()
+
+        # 设置CRC宽度
+        self.ui.combo_box_crc_width.addItems([str(width) for width in CRCEngine.SUPPORTED_WIDTHS])
+        self.ui.combo_box_crc_width.setCurrentText(str(engine.width))
         
         # 设置CRC多项式
-        self.ui.line_edit_crc_poly.setText("8005")
+        hex_digits = engine.width // 4
+        self.ui.line_edit_crc_poly.setText(f"{engine.poly:0{hex_digits}X}")
         
         # 设置CRC公式
-        self.ui.line_edit_crc_formula.setText("x16 + x15 + x2 + 1")
+        self.ui.line_edit_crc_formula.setText(self.poly_formula(engine.width, engine.poly))
         
         # 设置CRC初始值
-        self.ui.line_edit_crc_init.setText("FFFF")
+        self.ui.line_edit_crc_init.setText(f"{engine.init:0{hex_digits}X}")
         
         # 设置CRC异或输出值
-        self.ui.line_edit_crc_xorout.setText("0000")
+        self.ui.line_edit_crc_xorout.setText(f"{engine.xorout:0{hex_digits}X}")
         
-        # 设置输入反转为False
-        self.ui.check_box_in_reversal.setChecked(False)
+        # 设置输入反转
+        self.ui.check_box_in_reversal.setChecked(engine.refin)
         
-        # 设置输出反转为False
-        self.ui.check_box_out_reversal.setChecked(False)
+        # 设置输出反转
+        self.ui.check_box_out_reversal.setChecked(engine.refout)
+        
+        # 设置高位在前
+        self.ui.check_box_high_first.setChecked(engine.high_first)
+
+        # 启用参数输入控件，公式由多项式生成，保持只读
+        param_widgets = [
+            self.ui.combo_box_crc_width,
+            self.ui.line_edit_crc_poly,
+            self.ui.line_edit_crc_init,
+            self.ui.line_edit_crc_xorout,
+            self.ui.check_box_in_reversal,
+            self.ui.check_box_out_reversal,
+            self.ui.check_box_high_first
+        ]
+        for widget in param_widgets:
+            widget.setEnabled(True)
+
+    def poly_formula(self, width, poly):
+        """
+        根据多项式生成公式文本
         
-        # 设置高位在前为True
-        self.ui.check_box_high_first.setChecked(True)
+        Args:
+            width (int): CRC位宽
+            poly (int): CRC多项式（不含最高位）
+            
+        Returns:
+            str: 公式文本，例如 "x16 + x15 + x2 + 1"
+        """
+        terms = [f"x{width}"]
+        for bit in range(width - 1, -1, -1):
+            if poly & (1 << bit):
+                if bit == 0:
+                    terms.append("1")
+                elif bit == 1:
+                    terms.append("x")
+                else:
+                    terms.append(f"x{bit}")
+        return " + ".join(terms)
+
+    def update_formula(self):
+        """
+        多项式或位宽修改后同步更新公式显示
+        """
+        try:
+            width = int(self.ui.combo_box_crc_width.currentText())
+            poly = int(self.ui.line_edit_crc_poly.text().strip(), 16)
+        except ValueError:
+            return
+
+        self.ui.line_edit_crc_formula.setText(self.poly_formula(width, poly))
+
+    def read_crc_engine(self):
+        """
+        根据界面参数生成CRC引擎
+        
+        Returns:
+            CRCEngine: CRC计算引擎
+            
+        Raises:
+            ValueError: 参数格式错误或超出位宽范围时抛出
+        """
+        width = int(self.ui.combo_box_crc_width.currentText())
+        poly = int(self.ui.line_edit_crc_poly.text().strip(), 16)
+        init = int(self.ui.line_edit_crc_init.text().strip(), 16)
+        xorout = int(self.ui.line_edit_crc_xorout.text().strip(), 16)
+
+        return get_crc_engine(
+            width=width,
+            poly=poly,
+            init=init,
+            xorout=xorout,
+            refin=self.ui.check_box_in_reversal.isChecked(),
+            refout=self.ui.check_box_out_reversal.isChecked(),
+            high_first=self.ui.check_box_high_first.isChecked()
+        )
     
     def crc_confirm(self):
         """
@@ -204,6 +287,15 @@ class SubWindowCRC(QWidget):
         if not self.ui.check_box_crc_enable.isChecked():
             self.crc_updated.emit(-1)
         else:
+            # 根据界面参数生成CRC引擎，参数错误时提示并保持窗口打开
+            try:
+                engine = self.read_crc_engine()
+            except ValueError as e:
+                QMessageBox.warning(self, "警告", f"CRC参数错误：{str(e)}")
+                return
+
+            self.crc_config_updated.emit(engine)
+
             # 如果启用了CRC，则发送当前CRC类型的索引信号
             self.crc_updated.emit(self.ui.combo_box_crc_type.currentIndex())
         
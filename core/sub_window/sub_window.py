@@ -41,6 +41,7 @@ class SubWindow(QWidget):
         打开CRC窗口
         """
         self.crc_window_instance = SubWindowCRC(self.application)
+        self.crc_window_instance.crc_config_updated.connect(self.application.crc_config_updated)
         self.crc_window_instance.crc_updated.connect(self.application.crc_mode_updated)
         self.crc_window_instance.show()
 
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3.13
+"""
+filename: device_manager.py
+author: [peixuSu]
+email: [1420209272@qq.com]
+date: 2026-10-18
+description: 多适配器设备管理，每个JTool适配器一个设备句柄和一个I/O线程，测例按设备分片并行运行
+"""
+
+from .device_worker import DeviceWorker
+from .spi_backend import DEV_SPI, create_backend
+from .spi_driver import SPIDriver
+
+# 测例分片方式
+SHARD_ROUND_ROBIN = "round_robin"   # 按顺序轮流分配到各设备
+SHARD_AFFINITY = "affinity"         # 指定的测例固定在指定设备，其余分配到测例最少的设备
+
+
+class DeviceManager:
+    """
+    多适配器设备管理器
+
+    扫描所有SPI适配器，为每个适配器创建一个SPIDriver和独占它的DeviceWorker，设备句柄在
+    该I/O线程中打开和关闭。run把每个设备的任务提交到该设备的I/O线程执行，不同适配器上的
+    传输互不阻塞，总耗时随设备数量缩短。
+    """
+
+    def __init__(self, backend=None, backend_factory=None):
+        """
+        初始化设备管理器
+
+        Args:
+            backend (SPIBackend): 用于扫描的SPI后端，未提供backend_factory时所有适配器共用，
+                默认由环境变量SPI_BACKEND选择
+            backend_factory: 为每个适配器创建独立后端的函数，参数为usb_id，
+                用于每个实例只模拟一个设备的模拟后端
+        """
+        self.backend = backend if backend is not None else create_backend()
+        self.backend_factory = backend_factory
+
+        # 已打开设备的I/O线程，下标为设备序号
+        self.workers = []
+
+    @property
+    def drivers(self):
+        """已打开的设备驱动，下标为设备序号"""
+        return [worker.driver for worker in self.workers]
+
+    def scan(self):
+        """
+        扫描SPI适配器
+
+        Returns:
+            tuple: (dev_count, devices_str)
+        """
+        return self.backend.scan(DEV_SPI)
+
+    def open_all(self, count=None):
+        """
+        为每个适配器启动一个I/O线程，并在该线程中打开设备句柄
+
+        Args:
+            count (int, optional): 打开的设备数量，默认为扫描到的适配器数量；
+                使用backend_factory时可直接指定
+
+        Returns:
+            list: 每个适配器的打开结果信息
+        """
+        if count is None:
+            count, _ = self.scan()
+
+        self.close_all()
+        messages = []
+        for usb_id in range(count):
+            backend = self.backend_factory(usb_id) if self.backend_factory is not None else self.backend
+            worker = DeviceWorker(SPIDriver(usb_id, backend), name=f"SPIDevice{usb_id}")
+
+            # 每个I/O线程持有各自适配器的设备句柄
+            message, _, _ = worker.open_device()
+            if worker.is_open():
+                messages.append(f"[设备{len(self.workers)}] {message}")
+                self.workers.append(worker)
+            else:
+                messages.append(f"适配器{usb_id}: {message}")
+                worker.stop()
+
+        return messages
+
+    def close_all(self):
+        """
+        释放所有设备句柄并停止I/O线程
+        """
+        for worker in self.workers:
+            worker.close_device()
+            worker.stop()
+        self.workers = []
+
+    def device_count(self):
+        """已打开的设备数量"""
+        return len(self.workers)
+
+    def shard(self, cases, mode=SHARD_ROUND_ROBIN, affinity=None):
+        """
+        将测例分配到各设备
+
+        Args:
+            cases (list): 测例名称列表
+            mode (str): 分片方式，SHARD_ROUND_ROBIN或SHARD_AFFINITY
+            affinity (dict, optional): 测例名称到设备序号的映射，仅SHARD_AFFINITY使用
+
+        Returns:
+            list: 每个设备的测例名称列表，下标与workers一致
+
+        Raises:
+            ValueError: 没有已打开的设备或未知的分片方式
+        """
+        count = len(self.workers)
+        if count == 0:
+            raise ValueError("没有已打开的设备")
+
+        shards = [[] for _ in range(count)]
+
+        if mode == SHARD_ROUND_ROBIN:
+            for index, case in enumerate(cases):
+                shards[index % count].append(case)
+            return shards
+
+        if mode == SHARD_AFFINITY:
+            affinity = affinity or {}
+            unpinned = []
+            for case in cases:
+                device = affinity.get(case)
+                if device is not None and 0 <= device < count:
+                    shards[device].append(case)
+                else:
+                    unpinned.append(case)
+
+            # 未指定设备的测例分配到当前测例最少的设备
+            for case in unpinned:
+                min(shards, key=len).append(case)
+            return shards
+
+        raise ValueError(f"未知的分片方式: {mode}")
+
+    def run(self, func, jobs):
+        """
+        在每个设备各自的I/O线程中执行任务，等待全部完成
+
+        任务在独占该设备驱动的线程中执行，可以直接调用驱动进行传输。
+
+        Args:
+            func: 任务函数，参数为(设备序号, SPIDriver, 任务参数)
+            jobs (list): 每个设备的任务参数，下标与workers一致
+
+        Returns:
+            list: 每个设备的任务返回值，任务抛出异常时该项为异常对象
+        """
+        count = min(len(self.workers), len(jobs))
+        futures = [
+            self.workers[index].submit(func, index, self.workers[index].driver, jobs[index])
+            for index in range(count)
+        ]
+
+        results = []
+        for future in futures:
+            error = future.exception()
+            results.append(error if error is not None else future.result())
+        return results
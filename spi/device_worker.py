@@ -0,0 +1,172 @@
+#!/usr/bin/env python3.13
+"""
+filename: device_worker.py
+author: [peixuSu]
+email: [1420209272@qq.com]
+date: 2026-10-18
+description: SPI设备I/O线程，独占一个设备驱动，按提交顺序串行执行该设备的所有传输，不依赖Qt
+"""
+
+import queue
+import threading
+from concurrent.futures import Future
+
+
+class DeviceWorker:
+    """
+    SPI设备I/O线程
+
+    独占一个SPIDriver：设备的打开/关闭和所有传输都在该线程中执行。请求按提交顺序串行执行，
+    每个请求返回一个Future。传输方法(open_device/write/read等)在工作线程中直接调用驱动，
+    在其他线程中调用时提交到工作线程并等待结果。
+    """
+
+    def __init__(self, driver, name="SPIWorker", on_done=None, on_error=None):
+        """
+        初始化并启动工作线程
+
+        Args:
+            driver: SPI驱动实例，由工作线程独占
+            name (str): 线程名称
+            on_done: 请求完成后在工作线程中调用的函数，参数为(callback, result)，
+                默认直接调用callback(result)
+            on_error: 请求抛出异常时在工作线程中调用的函数，参数为异常对象
+        """
+        self.driver = driver
+        self.on_done = on_done
+        self.on_error = on_error
+
+        # 请求队列，元素为(future, func, args, kwargs, callback)，None表示退出
+        self._requests = queue.Queue()
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, func, *args, callback=None, **kwargs):
+        """
+        提交一个在工作线程中执行的请求
+
+        Args:
+            func: 需要执行的函数
+            *args: 位置参数
+            callback: 完成后调用的函数，参数为func的返回值，异常时为None
+            **kwargs: 关键字参数
+
+        Returns:
+            Future: 请求结果
+        """
+        future = Future()
+        self._requests.put((future, func, args, kwargs, callback))
+        return future
+
+    def call(self, func, *args, **kwargs):
+        """
+        在工作线程中执行函数并返回结果，已在工作线程中时直接执行
+
+        Args:
+            func: 需要执行的函数
+            *args: 位置参数
+            **kwargs: 关键字参数
+
+        Returns:
+            func的返回值
+        """
+        if self.is_worker_thread():
+            return func(*args, **kwargs)
+        return self.submit(func, *args, **kwargs).result()
+
+    def is_worker_thread(self):
+        """
+        判断当前是否运行在工作线程中
+
+        Returns:
+            bool: 当前线程是否为工作线程
+        """
+        return threading.current_thread() is self._thread
+
+    def pending_count(self):
+        """
+        获取尚未执行的请求数量
+
+        Returns:
+            int: 队列中的请求数量
+        """
+        return self._requests.qsize()
+
+    def stop(self, timeout=1.0):
+        """
+        停止工作线程，已提交的请求执行完后退出
+
+        Args:
+            timeout (float): 等待线程退出的最长时间（秒）
+        """
+        if self._thread.is_alive():
+            self._requests.put(None)
+            self._thread.join(timeout)
+
+    def is_open(self):
+        """设备句柄是否已打开"""
+        return self.driver.backend is not None and self.driver.dev_handle is not None
+
+    def scan(self):
+        """扫描SPI设备，返回(dev_count, devices_str)"""
+        return self.call(self.driver.scan)
+
+    def open_device(self):
+        """打开设备，返回值同SPIDriver.open_device"""
+        return self.call(self.driver.open_device)
+
+    def close_device(self):
+        """释放设备句柄"""
+        self.call(setattr, self.driver, "dev_handle", None)
+
+    def set_vcc(self, index):
+        """设置VCC电压，返回错误代码"""
+        return self.call(self.driver.set_vcc, index)
+
+    def set_vio(self, index):
+        """设置IO电压，返回错误代码"""
+        return self.call(self.driver.set_vio, index)
+
+    def set_speed(self, index):
+        """设置SPI速度档位，返回错误代码"""
+        return self.call(self.driver.set_speed, index)
+
+    def write(self, clk_mode, bit_order, length, tx_buffer):
+        """只写传输，返回错误代码"""
+        return self.call(self.driver.write, clk_mode, bit_order, length, tx_buffer)
+
+    def read(self, clk_mode, bit_order, length, rx_buffer):
+        """只读传输，返回错误代码"""
+        return self.call(self.driver.read, clk_mode, bit_order, length, rx_buffer)
+
+    def write_read(self, clk_mode, bit_order, length, tx_buffer, rx_buffer):
+        """全双工传输，返回错误代码"""
+        return self.call(self.driver.write_read, clk_mode, bit_order, length, tx_buffer, rx_buffer)
+
+    def _run(self):
+        """工作线程主循环"""
+        while True:
+            request = self._requests.get()
+            if request is None:
+                break
+
+            future, func, args, kwargs, callback = request
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                future.set_exception(e)
+                if self.on_error is not None:
+                    self.on_error(e)
+                result = None
+            else:
+                future.set_result(result)
+
+            if callback is not None:
+                if self.on_done is not None:
+                    self.on_done(callback, result)
+                else:
+                    callback(result)
@@ -0,0 +1,457 @@
+#!/usr/bin/env python3.13
+"""
+filename: spi_backend.py
+author: [peixuSu]
+email: [1420209272@qq.com]
+date: 2026-10-18
+description: SPI传输后端接口，包含jtool.dll后端和纯Python模拟后端
+"""
+
+import os
+import time
+import threading
+from abc import ABC, abstractmethod
+from ctypes import (c_int, POINTER, c_void_p,
+        c_uint32, c_ubyte, byref, c_char_p, memmove
+    )
+
+# 设备类型标识符，与jtool.dll的SPI设备类型一致
+DEV_SPI = 2
+
+# SPI速度档位对应的时钟频率（Hz），与SPI窗口速度下拉框一致
+SPEED_RATES = [468750, 937500, 1875000, 3750000, 7500000, 15000000, 30000000, 60000000]
+
+
+class SPIBackend(ABC):
+    """
+    SPI传输后端接口
+
+    数据缓冲区统一使用ctypes c_ubyte数组，返回值与jtool.dll一致：0表示成功，
+    非0为SPIDriver.ERROR_CODES中的错误代码
+    """
+
+    @abstractmethod
+    def scan(self, dev_type=DEV_SPI):
+        """
+        扫描设备
+
+        Args:
+            dev_type (int): 设备类型标识符
+
+        Returns:
+            tuple: (dev_count, devices_str)
+                - dev_count (int): 设备数量
+                - devices_str (bytes): 设备信息字符串，无设备时为None或b''
+        """
+
+    @abstractmethod
+    def open(self, dev_type=DEV_SPI, usb_id=-1):
+        """
+        打开设备
+
+        Args:
+            dev_type (int): 设备类型标识符
+            usb_id (int): USB设备ID
+
+        Returns:
+            设备句柄，失败时为None
+        """
+
+    @abstractmethod
+    def set_vcc(self, handle, index):
+        """设置VCC电压，返回错误代码"""
+
+    @abstractmethod
+    def set_vio(self, handle, index):
+        """设置IO电压，返回错误代码"""
+
+    @abstractmethod
+    def set_speed(self, handle, index):
+        """设置SPI速度档位，返回错误代码"""
+
+    @abstractmethod
+    def write(self, handle, clk_mode, bit_order, length, tx_buffer):
+        """
+        只写传输
+
+        Args:
+            handle: 设备句柄
+            clk_mode (int): SPI时钟模式（0-3）
+            bit_order (int): 位序模式（0-1）
+            length (int): 数据长度
+            tx_buffer: 发送数据缓冲区
+
+        Returns:
+            int: 错误代码
+        """
+
+    @abstractmethod
+    def read(self, handle, clk_mode, bit_order, length, rx_buffer):
+        """
+        只读传输
+
+        Args:
+            handle: 设备句柄
+            clk_mode (int): SPI时钟模式（0-3）
+            bit_order (int): 位序模式（0-1）
+            length (int): 数据长度
+            rx_buffer: 接收数据缓冲区
+
+        Returns:
+            int: 错误代码
+        """
+
+    @abstractmethod
+    def write_read(self, handle, clk_mode, bit_order, length, tx_buffer, rx_buffer):
+        """
+        全双工传输
+
+        Args:
+            handle: 设备句柄
+            clk_mode (int): SPI时钟模式（0-3）
+            bit_order (int): 位序模式（0-1）
+            length (int): 数据长度
+            tx_buffer: 发送数据缓冲区
+            rx_buffer: 接收数据缓冲区
+
+        Returns:
+            int: 错误代码
+        """
+
+
+class JToolBackend(SPIBackend):
+    """
+    jtool.dll后端
+
+    首次使用时才加载jtool.dll，非Windows平台导入本模块不会失败
+    """
+
+    def __init__(self, dll_path=None):
+        """
+        初始化jtool.dll后端
+
+        Args:
+            dll_path (str): jtool.dll路径，默认为本模块所在目录
+        """
+        if dll_path is None:
+            dll_path = os.path.join(
+                os.path.dirname(os.path.abspath(__file__)), "jtool.dll"
+            )
+        self.dll_path = dll_path
+        self.jtool = None
+        self.load_error = None
+
+    def load(self):
+        """
+        加载jtool.dll并设置函数参数类型
+
+        Returns:
+            jtool.dll句柄
+
+        Raises:
+            OSError: 当前平台不支持或jtool.dll加载失败
+        """
+        if self.jtool is not None:
+            return self.jtool
+
+        try:
+            from ctypes import windll
+            jtool = windll.LoadLibrary(self.dll_path)
+        except (ImportError, OSError) as e:
+            self.load_error = str(e)
+            raise OSError(f"jtool.dll加载失败: {e}") from e
+
+        # 设备扫描函数 - 扫描可用的SPI设备
+        jtool.DevicesScan.argtypes = [c_int, POINTER(c_int)]
+        jtool.DevicesScan.restype = c_char_p
+
+        # 设备打开函数 - 建立与SPI设备的连接
+        jtool.DevOpen.argtypes = [c_int, c_void_p, c_int]
+        jtool.DevOpen.restype = c_void_p
+
+        # SPI配置函数 - 设置电压和IO电平
+        jtool.JSPISetVcc.argtypes = [c_void_p, c_int]  # 设置VCC电压
+        jtool.JSPISetVcc.restype = c_int
+        jtool.JSPISetVio.argtypes = [c_void_p, c_int]  # 设置IO电压
+        jtool.JSPISetVio.restype = c_int
+        jtool.JSPISetSpeed.argtypes = [c_void_p, c_int]  # 设置SPI速度
+        jtool.JSPISetSpeed.restype = c_int
+
+        # SPI数据传输函数 - 只写模式
+        jtool.SPIWriteOnly.argtypes = [
+            c_void_p,    # 设备句柄
+            c_int,       # SPI模式
+            c_int,       # 数据位顺序MSB\LSB
+            c_uint32,    # 数据长度
+            POINTER(c_ubyte)  # 数据缓冲区指针
+        ]
+        jtool.SPIWriteOnly.restype = c_int
+
+        # SPI数据传输函数 - 只读模式
+        jtool.SPIReadOnly.argtypes = [
+            c_void_p,    # 设备句柄
+            c_int,       # SPI模式
+            c_int,       # 数据位顺序MSB\LSB
+            c_uint32,    # 数据长度
+            POINTER(c_ubyte)  # 数据缓冲区指针
+        ]
+        jtool.SPIReadOnly.restype = c_int
+
+        # 全双工模式函数
+        jtool.SPIWriteRead.argtypes = [
+            c_void_p,    # 设备句柄
+            c_int,       # SPI模式
+            c_int,       # 数据位顺序MSB\LSB
+            c_uint32,    # 数据长度
+            POINTER(c_ubyte),  # 发送数据缓冲区指针
+            POINTER(c_ubyte)   # 接收数据缓冲区指针
+        ]
+        jtool.SPIWriteRead.restype = c_int
+
+        self.jtool = jtool
+        return jtool
+
+    def scan(self, dev_type=DEV_SPI):
+        # jtool.dll无法加载时视为没有设备，避免定时检测反复报错
+        try:
+            jtool = self.load()
+        except OSError:
+            return 0, None
+
+        dev_cnt = c_int(0)
+        devices_str = jtool.DevicesScan(dev_type, byref(dev_cnt))
+        return dev_cnt.value, devices_str
+
+    def open(self, dev_type=DEV_SPI, usb_id=-1):
+        handle = self.load().DevOpen(dev_type, None, usb_id)
+        return handle if handle else None
+
+    def set_vcc(self, handle, index):
+        return self.load().JSPISetVcc(handle, c_int(index))
+
+    def set_vio(self, handle, index):
+        return self.load().JSPISetVio(handle, c_int(index))
+
+    def set_speed(self, handle, index):
+        return self.load().JSPISetSpeed(handle, c_int(index))
+
+    def write(self, handle, clk_mode, bit_order, length, tx_buffer):
+        return self.load().SPIWriteOnly(
+            handle, c_int(clk_mode), c_int(bit_order), c_uint32(length), tx_buffer
+        )
+
+    def read(self, handle, clk_mode, bit_order, length, rx_buffer):
+        return self.load().SPIReadOnly(
+            handle, c_int(clk_mode), c_int(bit_order), c_uint32(length), rx_buffer
+        )
+
+    def write_read(self, handle, clk_mode, bit_order, length, tx_buffer, rx_buffer):
+        return self.load().SPIWriteRead(
+            handle, c_int(clk_mode), c_int(bit_order), c_uint32(length), tx_buffer, rx_buffer
+        )
+
+
+class SimulatedBackend(SPIBackend):
+    """
+    纯Python模拟后端
+
+    默认作为回环设备：写入的数据在后续读取时原样返回，全双工传输时接收数据等于发送数据。
+    每次传输按固定延迟加上数据长度/比特率模拟耗时。子类可重写on_write和on_read
+    模拟具体的从设备协议。
+    """
+
+    # 无待读数据时读取到的填充字节
+    IDLE_BYTE = 0xFF
+
+    def __init__(self, latency=0.0, bit_rate=None, device_str=b"JTool-Sim SN:00000000"):
+        """
+        初始化模拟后端
+
+        Args:
+            latency (float): 每次传输的固定延迟（秒），模拟USB往返
+            bit_rate (int): SPI比特率（bit/s），为None时跟随set_speed设置的速度档位，
+                为0时不模拟传输耗时
+            device_str (bytes): 扫描返回的设备信息字符串
+        """
+        self.latency = latency
+        self.fixed_bit_rate = bit_rate
+        self.bit_rate = bit_rate if bit_rate is not None else SPEED_RATES[0]
+        self.device_str = device_str
+
+        # 模拟设备是否插入
+        self.connected = True
+        self.handle = None
+
+        # 待读取的数据
+        self.rx_data = bytearray()
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.transaction_count = 0
+        self.bytes_written = 0
+        self.bytes_read = 0
+
+    def scan(self, dev_type=DEV_SPI):
+        if not self.connected:
+            return 0, None
+        return 1, self.device_str
+
+    def open(self, dev_type=DEV_SPI, usb_id=-1):
+        if not self.connected:
+            return None
+        self.handle = 1
+        return self.handle
+
+    def set_vcc(self, handle, index):
+        return self._check_handle(handle)
+
+    def set_vio(self, handle, index):
+        return self._check_handle(handle)
+
+    def set_speed(self, handle, index):
+        result = self._check_handle(handle)
+        if result != 0:
+            return result
+        if not 0 <= index < len(SPEED_RATES):
+            return 1
+        if self.fixed_bit_rate is None:
+            self.bit_rate = SPEED_RATES[index]
+        return 0
+
+    def write(self, handle, clk_mode, bit_order, length, tx_buffer):
+        result = self._check_handle(handle)
+        if result != 0:
+            return result
+
+        self._wait(length)
+        data = bytes(memoryview(tx_buffer)[:length])
+        with self._lock:
+            self.transaction_count += 1
+            self.bytes_written += length
+            self.on_write(data)
+        return 0
+
+    def read(self, handle, clk_mode, bit_order, length, rx_buffer):
+        result = self._check_handle(handle)
+        if result != 0:
+            return result
+
+        self._wait(length)
+        with self._lock:
+            self.transaction_count += 1
+            self.bytes_read += length
+            data = self.on_read(length)
+        memmove(rx_buffer, data, length)
+        return 0
+
+    def write_read(self, handle, clk_mode, bit_order, length, tx_buffer, rx_buffer):
+        result = self._check_handle(handle)
+        if result != 0:
+            return result
+
+        self._wait(length)
+        data = bytes(memoryview(tx_buffer)[:length])
+        with self._lock:
+            self.transaction_count += 1
+            self.bytes_written += length
+            self.bytes_read += length
+            # 与write/read经过相同的处理，默认回环时接收数据等于发送数据
+            self.on_write(data)
+            received = self.on_read(length)
+        memmove(rx_buffer, received, length)
+        return 0
+
+    def on_write(self, data):
+        """
+        处理主机写入的数据，默认加入待读数据实现回环
+
+        Args:
+            data (bytes): 写入的数据
+        """
+        self.rx_data += data
+
+    def on_read(self, length):
+        """
+        取出主机读取的数据，不足部分用IDLE_BYTE填充
+
+        Args:
+            length (int): 读取长度
+
+        Returns:
+            bytes: 长度为length的数据
+        """
+        data = bytes(self.rx_data[:length])
+        del self.rx_data[:length]
+        if len(data) < length:
+            data += bytes([self.IDLE_BYTE]) * (length - len(data))
+        return data
+
+    def transfer_time(self, length):
+        """
+        计算一次传输的模拟耗时
+
+        Args:
+            length (int): 数据长度
+
+        Returns:
+            float: 耗时（秒）
+        """
+        if not self.bit_rate:
+            return self.latency
+        return self.latency + length * 8 / self.bit_rate
+
+    def get_statistics(self):
+        """
+        获取传输统计信息
+
+        Returns:
+            dict: 传输次数、写入字节数和读取字节数
+        """
+        return {
+            'transaction_count': self.transaction_count,
+            'bytes_written': self.bytes_written,
+            'bytes_read': self.bytes_read
+        }
+
+    def _check_handle(self, handle):
+        """检查设备句柄，设备拔出时返回USB断开"""
+        if not self.connected:
+            return 2
+        if handle is None or handle != self.handle:
+            return 1
+        return 0
+
+    def _wait(self, length):
+        """按模拟耗时阻塞"""
+        delay = self.transfer_time(length)
+        if delay > 0:
+            time.sleep(delay)
+
+
+def create_backend(name=None, **kwargs):
+    """
+    根据名称创建SPI传输后端
+
+    Args:
+        name (str): 后端名称，"jtool"、"simulated"或"mcu"，默认读取环境变量SPI_BACKEND，
+            未设置时为"jtool"
+        **kwargs: 传给后端构造函数的参数
+
+    Returns:
+        SPIBackend: SPI传输后端
+
+    Raises:
+        ValueError: 未知的后端名称
+    """
+    if name is None:
+        name = os.environ.get("SPI_BACKEND", "jtool")
+
+    if name == "jtool":
+        return JToolBackend(**kwargs)
+    if name == "simulated":
+        return SimulatedBackend(**kwargs)
+    if name == "mcu":
+        # 协议模拟器依赖帧定义，按需导入
+        from core.risc_v_debug.mcu_simulator import MCUSimulator
+        return MCUSimulator(**kwargs)
+    raise ValueError(f"未知的SPI后端: {name}")
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3.13
+"""
+filename: spi_buffer.py
+author: [peixuSu]
+email: [1420209272@qq.com]
+date: 2026-10-18
+description: SPI传输缓冲区池，复用预分配的ctypes数组
+"""
+
+import threading
+from ctypes import c_ubyte
+
+
+class TransferBuffer:
+    """
+    SPI传输缓冲区
+
+    bytearray与ctypes数组共享同一块内存：bytearray用于在Python侧写入和读取，
+    ctypes数组直接传给jtool.dll
+    """
+
+    def __init__(self, size):
+        """
+        初始化传输缓冲区
+
+        Args:
+            size (int): 缓冲区容量（字节）
+        """
+        self.size = size
+        self.data = bytearray(size)
+        self.array = (c_ubyte * size).from_buffer(self.data)
+
+    def write(self, data, offset=0):
+        """
+        将数据写入缓冲区
+
+        Args:
+            data: 字节数据
+            offset (int): 写入位置
+
+        Returns:
+            int: 写入结束位置
+        """
+        end = offset + len(data)
+        self.data[offset:end] = data
+        return end
+
+    def read(self, length):
+        """
+        以一次复制取出缓冲区前length个字节
+
+        Args:
+            length (int): 读取长度
+
+        Returns:
+            bytes: 读取的数据
+        """
+        return bytes(memoryview(self.data)[:length])
+
+
+class TransferBufferPool:
+    """
+    SPI传输缓冲区池
+
+    按容量等级（2的幂，最小16字节）缓存传输缓冲区，每次传输从池中取出，
+    传输结束后归还，避免每次传输都分配新的ctypes数组
+    """
+
+    # 最小容量等级
+    MIN_SIZE_CLASS = 16
+
+    def __init__(self, max_per_class=4):
+        """
+        初始化缓冲区池
+
+        Args:
+            max_per_class (int): 每个容量等级最多缓存的缓冲区数量
+        """
+        self.max_per_class = max_per_class
+        self._free = {}
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.allocation_count = 0
+        self.reuse_count = 0
+
+    def size_class(self, size):
+        """
+        计算容量等级
+
+        Args:
+            size (int): 需要的字节数
+
+        Returns:
+            int: 不小于size的容量等级
+        """
+        if size <= self.MIN_SIZE_CLASS:
+            return self.MIN_SIZE_CLASS
+        return 1 << (size - 1).bit_length()
+
+    def acquire(self, size):
+        """
+        取出一个容量不小于size的缓冲区
+
+        Args:
+            size (int): 需要的字节数
+
+        Returns:
+            TransferBuffer: 传输缓冲区
+        """
+        size_class = self.size_class(size)
+
+        with self._lock:
+            free_list = self._free.get(size_class)
+            if free_list:
+                self.reuse_count += 1
+                return free_list.pop()
+            self.allocation_count += 1
+
+        return TransferBuffer(size_class)
+
+    def release(self, buffer):
+        """
+        归还缓冲区
+
+        Args:
+            buffer (TransferBuffer): 传输缓冲区
+        """
+        with self._lock:
+            free_list = self._free.setdefault(buffer.size, [])
+            if len(free_list) < self.max_per_class:
+                free_list.append(buffer)
+
+    def get_statistics(self):
+        """
+        获取缓冲区池统计信息
+
+        Returns:
+            dict: 新分配次数和复用次数
+        """
+        return {
+            'allocation_count': self.allocation_count,
+            'reuse_count': self.reuse_count
+        }
@@ -8,8 +8,10 @@ description:
 """
 
 from PySide6.QtCore import Signal, QObject
-from ctypes import c_ubyte, c_uint32, c_int
-from utils.crc.crc_manager import CRC
+from ctypes import c_ubyte
+from .spi_buffer import TransferBufferPool
+from .spi_driver import SPIDriver
+from .spi_worker import SPIWorker
 
 class SPIController(QObject):
     """
@@ -20,211 +22,431 @@ class SPIController(QObject):
     
     log_signal = Signal(str, int)
 
+    # 预读长度上限，避免历史记录异常时读取过多数据
+    MAX_SPECULATIVE_SIZE = 1024
+
     def __init__(self, application, driver=None):
+        """
+        Args:
+            application: 主应用程序实例
+            driver (SPIDriver, optional): SPI驱动，交给工作线程独占，默认新建
+        """
         super().__init__()
 
         self.application = application
         self.ui = application.ui
-        self.driver = driver
+
+        # 每类命令最近一次响应帧的长度，用于确定首次预读长度
+        self.frame_size_history = {}
+
+        # 传输缓冲区池，复用ctypes数组
+        self.buffer_pool = TransferBufferPool()
+
+        # 自测(全双工)模式，工作线程中不直接访问控件
+        self.loopback_test = self.ui.check_box_test.isChecked()
+        self.ui.check_box_test.toggled.connect(self.set_loopback_test)
+
+        # SPI I/O工作线程，独占驱动句柄，所有jtool调用在该线程中串行执行
+        self.worker = SPIWorker(driver if driver is not None else SPIDriver())
+        self.worker.log_signal.connect(self.log_signal)
+
+    def set_loopback_test(self, checked):
+        """
+        更新自测(全双工)模式
+        
+        Args:
+            checked (bool): 自测复选框是否勾选
+        """
+        self.loopback_test = checked
+
+    def submit(self, func, *args, callback=None, **kwargs):
+        """
+        将SPI操作提交到工作线程执行
+        
+        Args:
+            func: 需要执行的函数
+            *args: 位置参数
+            callback: 完成后在GUI线程中调用的函数，参数为func的返回值
+            **kwargs: 关键字参数
+            
+        Returns:
+            Future: 请求结果
+        """
+        return self.worker.submit(func, *args, callback=callback, **kwargs)
+
+    def send_bytes_async(self, data, clk_mode, bit_order, callback=None, **kwargs):
+        """
+        在工作线程中发送字节数据，参数同send_bytes
+        
+        Returns:
+            Future: 发送结果，完成后为bool
+        """
+        return self.submit(self.send_bytes, bytes(data), clk_mode, bit_order, callback=callback, **kwargs)
+
+    def receive_frame_async(self, clk_mode, bit_order, callback=None, **kwargs):
+        """
+        在工作线程中接收一帧数据，参数同spi_receive_frame
+        
+        Returns:
+            Future: 接收结果，完成后为bytes或None
+        """
+        return self.submit(self.spi_receive_frame, clk_mode, bit_order, callback=callback, **kwargs)
+
+    def shutdown(self):
+        """
+        停止SPI工作线程
+        """
+        self.worker.stop()
 
     def spi_send(self, data, clk_mode, bit_order, log = True, data_name = ""):
         """
-        发送SPI数据
+        发送十六进制字符串数据
         
-        格式化输入数据，添加CRC校验（可选），并通过SPI驱动发送。
+        仅用于手动调试输入框(MCU_line_test)，格式化输入的十六进制字符串后
+        交给工作线程中的send_bytes发送。
         
         Args:
             data (str): 要发送的十六进制数据字符串（例如 "A1B2C3"）
             clk_mode (int): SPI时钟模式（0-3）
             bit_order (int): 位序模式（0-1）
-            crc (bool, optional): 是否添加CRC校验。默认为True。
+            log (bool): 是否输出发送日志
+            data_name (str): 日志中显示的数据名称
+        """
+        self.send_bytes_async(self.hex_to_bytes(data), clk_mode, bit_order, log=log, data_name=data_name)
+
+    def hex_to_bytes(self, text):
+        """
+        将十六进制字符串转换为字节数据
         
+        Args:
+            text (str): 十六进制字符串，非十六进制字符会被忽略
+            
         Returns:
-            str: 发送结果消息
+            bytearray: 字节数据
         """
-
-        # 检查SPI设备是否已连接
-        if self.driver.jtool is None or self.driver.dev_handle is None:
-            self.log_signal.emit("设备未连接", 2)
-            return
-
-        data_bytes = []
-
         # 清理非法字符，只保留有效的十六进制字符 (0-9, A-F, a-f)
-        clean_text = ''.join(c for c in data if c in '0123456789ABCDEFabcdef')
+        clean_text = ''.join(c for c in text if c in '0123456789ABCDEFabcdef')
 
         # 如果数据长度为奇数，在前面补0
         if len(clean_text) % 2 != 0:
             clean_text = '0' + clean_text
 
-        # 将十六进制字符串转换为字节数组
-        for i in range(0, len(clean_text), 2):
-            data_bytes.append(int(clean_text[i:i+2], 16))
+        return bytearray.fromhex(clean_text)
+
+    def device_ready(self):
+        """
+        检查SPI设备是否已连接，未连接时输出日志
+        
+        Returns:
+            bool: 设备是否已连接
+        """
+        if not self.worker.is_open():
+            self.log_signal.emit("设备未连接", 2)
+            return False
+        return True
+
+    def build_tx_buffer(self, data, append_crc=True):
+        """
+        根据待发送数据构造ctypes发送缓冲区
+        
+        需要附加CRC或数据只读时复制一次到缓冲区池的缓冲区中；
+        不附加CRC且数据可写时直接共享内存。
+        
+        Args:
+            data: 字节数据，可以是bytes、bytearray或memoryview
+            append_crc (bool): 启用CRC模式时是否附加CRC校验
+            
+        Returns:
+            tuple: (tx_array, length, pooled)
+                - tx_array: 传给jtool的ctypes数组
+                - length (int): 发送字节数
+                - pooled (TransferBuffer): 使用后需归还缓冲区池的缓冲区，未使用时为None
+        """
+        view = memoryview(data)
+        length = view.nbytes
+
+        if append_crc and self.application.current_crc_mode != -1:
+            crc_engine = self.application.crc_engine
+            pooled = self.buffer_pool.acquire(length + crc_engine.byte_length)
+            end = pooled.write(view)
+            end = pooled.write(crc_engine.new(view).digest(), end)
+            return pooled.array, end, pooled
 
+        if view.readonly:
+            pooled = self.buffer_pool.acquire(length)
+            pooled.write(view)
+            return pooled.array, length, pooled
 
-        # 如果启用CRC校验，则计算并添加CRC16校验码
-        if self.application.current_crc_mode != -1:
-            crc_value = CRC.crc_16_user(data_bytes)
-            crc_high = (crc_value >> 8) & 0xFF
-            crc_low = crc_value & 0xFF
-            data_bytes.append(crc_high)
-            data_bytes.append(crc_low)
+        return (c_ubyte * length).from_buffer(view), length, None
 
-         # 将数据转换为C兼容的数组格式
-        data_array = (c_ubyte * len(data_bytes))(*data_bytes)
+    def format_hex(self, array, length):
+        """
+        将ctypes数组前length个字节格式化为十六进制字符串
+        
+        Args:
+            array: ctypes数组
+            length (int): 字节数
+            
+        Returns:
+            str: 以空格分隔的大写十六进制字符串
+        """
+        return bytes(memoryview(array)[:length]).hex(' ').upper()
 
-        # print(f"发送的数据：{data_bytes}")
+    def send_bytes(self, data, clk_mode, bit_order, log = True, data_name = "", append_crc = True):
+        """
+        发送字节数据
         
-        # 若开启自测，使用全双工模式
-        if self.ui.check_box_test.isChecked():
+        数据直接交给SPI后端的只写传输，不经过十六进制字符串和列表转换。
+        
+        Args:
+            data: 字节数据，可以是bytes、bytearray或memoryview
+            clk_mode (int): SPI时钟模式（0-3）
+            bit_order (int): 位序模式（0-1）
+            log (bool): 是否输出发送日志
+            data_name (str): 日志中显示的数据名称
+            append_crc (bool): 启用CRC模式时是否附加CRC校验，数据已带CRC时传False
             
-            self.spi_transfer(data, clk_mode, bit_order)
-        else:
-            # 否则，使用单工模式发送数据
-            result = self.driver.jtool.SPIWriteOnly(
-                self.driver.dev_handle,
-                c_int(clk_mode),
-                c_int(bit_order),
-                c_uint32(len(data_bytes)),
-                data_array
-            )
+        Returns:
+            bool: 发送是否成功
+        """
 
-            # print(f"发送成功: {' '.join([f'{byte:02X}' for byte in data_bytes])}")
+        # 检查SPI设备是否已连接
+        if not self.device_ready():
+            return False
+
+        # 若开启自测，使用全双工模式
+        if self.loopback_test:
+            return self.transfer_bytes(data, clk_mode, bit_order, log=log, append_crc=append_crc) is not None
+
+        tx_array, length, pooled = self.build_tx_buffer(data, append_crc)
+
+        try:
+            # 使用单工模式发送数据
+            result = self.worker.write(
+                clk_mode,
+                bit_order,
+                length,
+                tx_array
+            )
 
             # 检查发送结果
             if result == 0:
-                if log is True and data_name != "":
-                    self.log_signal.emit(f"发送成功,{data_name},{' '.join([f'{byte:02X}' for byte in data_bytes])}", 1)
-                elif log is True:
-                    self.log_signal.emit(f"发送成功: {' '.join([f'{byte:02X}' for byte in data_bytes])}", 1)
-            else:
                 if log is True:
-                    self.log_signal.emit(f"数据发送失败: {self.driver.ERROR_CODES.get(result)}", 2)
+                    formatted_data = self.format_hex(tx_array, length)
+                    if data_name != "":
+                        self.log_signal.emit(f"发送成功,{data_name},{formatted_data}", 1)
+                    else:
+                        self.log_signal.emit(f"发送成功: {formatted_data}", 1)
+                return True
 
-    def spi_receive(self, clk_mode, bit_order, rx_size, log = True):
+            if log is True:
+                self.log_signal.emit(f"数据发送失败: {SPIDriver.ERROR_CODES.get(result)}", 2)
+            return False
+        finally:
+            if pooled is not None:
+                self.buffer_pool.release(pooled)
+
+    def receive_into(self, buffer, clk_mode, bit_order, size = None, log = True):
         """
-        从SPI设备接收数据
-        
-        通过SPI接口从连接的设备接收指定长度的数据，并将接收到的数据
-        以十六进制格式显示在日志中。
+        从SPI设备接收数据到调用方提供的缓冲区
         
         Args:
+            buffer: 可写缓冲区，可以是bytearray、可写memoryview或ctypes数组
             clk_mode (int): SPI时钟模式（0-3）
             bit_order (int): 位序模式（0-1）
-            rx_size (int): 要接收的数据字节数
-
+            size (int, optional): 接收字节数，默认为缓冲区长度
+            log (bool): 是否输出接收日志
+            
         Returns:
-            str: 接收结果消息
+            int: 接收的字节数，失败时返回None
         """
 
         # 检查SPI设备是否已连接
-        if self.driver.jtool is None or self.driver.dev_handle is None:
-            self.log_signal.emit("设备未连接", 2)
-            return
+        if not self.device_ready():
+            return None
+
+        view = memoryview(buffer)
+        if size is None:
+            size = view.nbytes
+        rx_buffer = (c_ubyte * size).from_buffer(view)
 
-        # 创建接收数据缓冲区
-        rx_buffer = (c_ubyte * rx_size)()
-        
         # 通过SPI驱动接收数据
-        result = self.driver.jtool.SPIReadOnly(
-            self.driver.dev_handle,
-            c_int(clk_mode),
-            c_int(bit_order),
-            c_uint32(rx_size),
+        result = self.worker.read(
+            clk_mode,
+            bit_order,
+            size,
             rx_buffer
         )
-        
-        # print(f"clk_mode: {clk_mode}, bit_order: {bit_order}, rx_size: {rx_size}")
 
-         # 检查接收结果
+        # 检查接收结果
         if result == 0:
-            # 将接收到的数据转换为列表
-            received_data = [rx_buffer[i] for i in range(rx_size)]
-            
-            # 格式化数据为十六进制字符串
-            formatted_data = ' '.join([f"{byte:02X}" for byte in received_data])
-
-            print(f"接收的数据：{formatted_data}")
-
             if log is True:
-                self.log_signal.emit(f"数据接收: {formatted_data}", 1)
+                self.log_signal.emit(f"数据接收: {bytes(rx_buffer).hex(' ').upper()}", 1)
+            return size
 
-            return rx_buffer
-        else:
-            if log is True:
-                self.log_signal.emit(f"数据接收失败: {self.driver.ERROR_CODES.get(result)}", 2)
+        if log is True:
+            self.log_signal.emit(f"数据接收失败: {SPIDriver.ERROR_CODES.get(result)}", 2)
+        return None
 
-    def spi_transfer(self, data, clk_mode, bit_order, log = True):
-        """全双工SPI传输模式
+    def transfer_bytes(self, data, clk_mode, bit_order, log = True, append_crc = True):
+        """
+        全双工SPI传输字节数据
         
         Args:
-            data: 要发送的数据，可以是bytes、bytearray、list或hex字符串
-            clk_mode: 时钟模式，默认为low_1edg
-            bit_order: 位序，默认为msb
+            data: 字节数据，可以是bytes、bytearray或memoryview
+            clk_mode (int): SPI时钟模式（0-3）
+            bit_order (int): 位序模式（0-1）
+            log (bool): 是否输出传输日志
+            append_crc (bool): 启用CRC模式时是否附加CRC校验
             
         Returns:
             bytes: 接收到的数据，如果失败则返回None
         """
 
         # 检查SPI设备是否已连接
-        if self.driver.jtool is None or self.driver.dev_handle is None:
-            self.log_signal.emit("设备未连接", 2)
-            return
+        if not self.device_ready():
+            return None
+
+        tx_array, length, pooled = self.build_tx_buffer(data, append_crc)
+
+        # 从缓冲区池取出接收缓冲区
+        rx_pooled = self.buffer_pool.acquire(length)
+
+        try:
+            # 执行全双工传输
+            result = self.worker.write_read(
+                clk_mode,
+                bit_order,
+                length,
+                tx_array,
+                rx_pooled.array
+            )
 
-        data_bytes = []
+            # 检查传输结果
+            if result == 0:
+                received_data = rx_pooled.read(length)
+                if log is True:
+                    self.log_signal.emit(f"发送成功: {self.format_hex(tx_array, length)}", 1)
+                    self.log_signal.emit(f"接收成功: {received_data.hex(' ').upper()}", 1)
+                return received_data
 
-        # 清理非法字符，只保留有效的十六进制字符 (0-9, A-F, a-f)
-        clean_text = ''.join(c for c in data if c in '0123456789ABCDEFabcdef')
+            if log is True:
+                self.log_signal.emit(f"SPI全双工传输异常: {SPIDriver.ERROR_CODES.get(result)}", 2)
+            return None
+        finally:
+            if pooled is not None:
+                self.buffer_pool.release(pooled)
+            self.buffer_pool.release(rx_pooled)
 
-        # 如果数据长度为奇数，在前面补0
-        if len(clean_text) % 2 != 0:
-            clean_text = '0' + clean_text
+    def spi_receive(self, clk_mode, bit_order, rx_size, log = True):
+        """
+        从SPI设备接收数据
+        
+        通过SPI接口从连接的设备接收指定长度的数据，并将接收到的数据
+        以十六进制格式显示在日志中。接收缓冲区从缓冲区池中复用。
+        
+        Args:
+            clk_mode (int): SPI时钟模式（0-3）
+            bit_order (int): 位序模式（0-1）
+            rx_size (int): 要接收的数据字节数
+
+        Returns:
+            bytes: 接收到的数据，失败时返回None
+        """
 
-        # 将十六进制字符串转换为字节数组
-        for i in range(0, len(clean_text), 2):
-            data_bytes.append(int(clean_text[i:i+2], 16))
+        # 检查SPI设备是否已连接
+        if not self.device_ready():
+            return None
+
+        # 从缓冲区池取出接收缓冲区
+        rx_pooled = self.buffer_pool.acquire(rx_size)
+
+        try:
+            # 通过SPI驱动接收数据
+            result = self.worker.read(
+                clk_mode,
+                bit_order,
+                rx_size,
+                rx_pooled.array
+            )
 
+            # print(f"clk_mode: {clk_mode}, bit_order: {bit_order}, rx_size: {rx_size}")
 
-        # 如果启用CRC校验，则计算并添加CRC16校验码
-        if self.application.current_crc_mode != -1:
-            crc_value = CRC.crc_16_user(data_bytes)
-            crc_high = (crc_value >> 8) & 0xFF
-            crc_low = crc_value & 0xFF
-            data_bytes.append(crc_high)
-            data_bytes.append(crc_low)
+            # 检查接收结果
+            if result == 0:
+                # 一次复制取出接收到的数据
+                received_data = rx_pooled.read(rx_size)
 
-         # 将数据转换为C兼容的数组格式
-        data_array = (c_ubyte * len(data_bytes))(*data_bytes)
+                # print(f"接收的数据：{received_data.hex(' ').upper()}")
 
+                if log is True:
+                    self.log_signal.emit(f"数据接收: {received_data.hex(' ').upper()}", 1)
+
+                return received_data
+
+            if log is True:
+                self.log_signal.emit(f"数据接收失败: {SPIDriver.ERROR_CODES.get(result)}", 2)
+            return None
+        finally:
+            self.buffer_pool.release(rx_pooled)
+
+    def spi_transfer(self, data, clk_mode, bit_order, log = True):
+        """全双工SPI传输十六进制字符串数据
+        
+        Args:
+            data (str): 要发送的十六进制数据字符串
+            clk_mode: 时钟模式，默认为low_1edg
+            bit_order: 位序，默认为msb
             
-        # 创建接收缓冲区
-        rx_buffer = (c_ubyte * len(data_bytes))()
+        Returns:
+            bytes: 接收到的数据，如果失败则返回None
+        """
+        return self.transfer_bytes(self.hex_to_bytes(data), clk_mode, bit_order, log=log)
+
+    def spi_receive_frame(self, clk_mode, bit_order, header_length, frame_length, size_key=None, log=False):
+        """
+        按帧长度分两阶段接收一帧数据
+        
+        先读取帧头（或按历史记录预读整帧），根据帧头中的数据长度再读取剩余的
+        负载和CRC，使每次传输的总线时间与实际帧长度一致。帧格式由调用方提供，
+        SPI层不依赖具体的协议。
+        
+        Args:
+            clk_mode (int): SPI时钟模式（0-3）
+            bit_order (int): 位序模式（0-1）
+            header_length (int): 帧头长度，首次至少读取该长度
+            frame_length: 按帧头计算整帧长度（含CRC）的函数，参数为首次读取的数据，
+                帧头无效时返回None
+            size_key (str, optional): 命令类型，用于记录和查询历史帧长度
+            log (bool): 是否输出接收日志
             
-        # 执行全双工传输
-        result = self.driver.jtool.SPIWriteRead(
-            self.driver.dev_handle,
-            c_int(clk_mode),
-            c_int(bit_order),
-            c_uint32(len(data_bytes)),
-            data_array,
-            rx_buffer
-        )
+        Returns:
+            bytes: 接收到的数据，帧头无效时返回首次读取的原始数据，失败时返回None
+        """
 
-        # print(f"clk_mode: {clk_mode}, bit_order: {bit_order}, data_bytes: {data_array}, rx_buffer: {rx_buffer}")
+        # 根据历史记录确定首次读取长度，至少读取完整帧头
+        first_size = self.frame_size_history.get(size_key, header_length)
+        first_size = max(header_length, min(first_size, self.MAX_SPECULATIVE_SIZE))
 
-        # 检查发送结果
-        if result == 0:
-            if log is True:
-                self.log_signal.emit(f"发送成功: {' '.join([f'{byte:02X}' for byte in data_bytes])}", 1)
+        head = self.spi_receive(clk_mode, bit_order, first_size, log=log)
+        if head is None:
+            return None
 
-                # 将接收到的数据转换为列表
-                received_data = [rx_buffer[i] for i in range(len(data_bytes))]
-                
-                # 格式化数据为十六进制字符串
-                formatted_data = ' '.join([f"{byte:02X}" for byte in received_data])
+        # 帧头无效时直接返回，由帧解码器处理重同步
+        length = frame_length(head)
+        if length is None:
+            return head
 
-                self.log_signal.emit(f"接收成功: {formatted_data}", 1)
-        else:
-            if log is True:
-                self.log_signal.emit(f"SPI全双工传输异常: {self.driver.ERROR_CODES.get(result)}", 2)
+        # 记录本次帧长度，供下次预读
+        self.frame_size_history[size_key] = length
+
+        # 预读已覆盖整帧
+        if length <= first_size:
+            return head
+
+        # 读取剩余的负载和CRC
+        rest = self.spi_receive(clk_mode, bit_order, length - first_size, log=log)
+        if rest is None:
+            return None
 
+        return head + rest
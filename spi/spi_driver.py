@@ -7,18 +7,15 @@ date: 2025-11-22
 description:
 """
 
-import os
 import re
-from ctypes import (c_int, POINTER, c_void_p, 
-        c_uint32, c_ubyte, byref, windll, c_char_p
-    )
+from .spi_backend import DEV_SPI, create_backend
 
 class SPIDriver:
     """
     SPI设备驱动类
     
     该类封装了SPI设备的底层操作，包括设备扫描、连接、配置和数据传输。
-    通过调用jtool.dll实现与硬件设备的通信。
+    具体传输由SPI后端实现，默认通过jtool.dll与硬件设备通信。
     """
 
     # SPI错误代码映射表，这些错误代码对应jtool.dll返回的错误状态
@@ -35,78 +32,52 @@ class SPIDriver:
     # 设备句柄，用于标识已打开的SPI设备
     dev_handle = None
     
-    def __init__(self, usb_dev=-1):
+    def __init__(self, usb_dev=-1, backend=None):
         """
         初始化SPI驱动器
         
-        加载jtool.dll并初始化SPI设备的相关函数指针。
-        
         Args:
             usb_dev (int): USB设备ID，默认为-1表示使用默认设备
-        Raises:
-            Exception: 当jtool.dll加载失败时抛出异常
+            backend (SPIBackend): SPI传输后端，默认由环境变量SPI_BACKEND选择，
+                未设置时使用jtool.dll后端
         """
         self.usb_id = usb_dev
-        self.jtool = None
+        self.backend = backend if backend is not None else create_backend()
         self.device_name = ""
-        self.dev_spi = 2  # SPI设备类型标识符，默认为2
+        self.dev_spi = DEV_SPI  # SPI设备类型标识符，默认为2
 
-        # 构建DLL文件的完整路径
-        dll_path = os.path.join(
-            os.path.dirname(os.path.abspath(__file__)), "jtool.dll"
-        )
-        
-        # 加载jtool.dll动态链接库
-        self.jtool = windll.LoadLibrary(dll_path)
+    def scan(self):
+        """
+        扫描可用的SPI设备
         
-        # 设置DLL函数的参数类型和返回类型，确保数据类型正确转换
+        Returns:
+            tuple: (dev_count, devices_str)
+        """
+        return self.backend.scan(self.dev_spi)
 
-        # 设备扫描函数 - 扫描可用的SPI设备
-        self.jtool.DevicesScan.argtypes = [c_int, POINTER(c_int)]
-        self.jtool.DevicesScan.restype = c_char_p
-        
-        # 设备打开函数 - 建立与SPI设备的连接
-        self.jtool.DevOpen.argtypes = [c_int, c_void_p, c_int]
-        self.jtool.DevOpen.restype = c_void_p
-
-        # SPI配置函数 - 设置电压和IO电平
-        self.jtool.JSPISetVcc.argtypes = [c_void_p, c_int]  # 设置VCC电压
-        self.jtool.JSPISetVcc.restype = c_int
-        self.jtool.JSPISetVio.argtypes = [c_void_p, c_int]  # 设置IO电压
-        self.jtool.JSPISetVio.restype = c_int
-        self.jtool.JSPISetSpeed.argtypes = [c_void_p, c_int]  # 设置SPI速度
-        self.jtool.JSPISetSpeed.restype = c_int
-
-        # SPI数据传输函数 - 只写模式
-        self.jtool.SPIWriteOnly.argtypes = [
-            c_void_p,    # 设备句柄
-            c_int,       # SPI模式
-            c_int,       # 数据位顺序MSB\LSB
-            c_uint32,    # 数据长度
-            POINTER(c_ubyte)  # 数据缓冲区指针
-        ]
-        self.jtool.SPIWriteOnly.restype = c_int
-
-        # SPI数据传输函数 - 只读模式
-        self.jtool.SPIReadOnly.argtypes = [
-            c_void_p,    # 设备句柄
-            c_int,       # SPI模式
-            c_int,       # 数据位顺序MSB\LSB
-            c_uint32,    # 数据长度
-            POINTER(c_ubyte)  # 数据缓冲区指针
-        ]
-        self.jtool.SPIReadOnly.restype = c_int
-        
-        # 添加全双工模式函数声明
-        self.jtool.SPIWriteRead.argtypes = [
-            c_void_p,    # 设备句柄
-            c_int,       # SPI模式
-            c_int,       # 数据位顺序MSB\LSB
-            c_uint32,    # 数据长度
-            POINTER(c_ubyte),  # 发送数据缓冲区指针
-            POINTER(c_ubyte)   # 接收数据缓冲区指针
-        ]
-        self.jtool.SPIWriteRead.restype = c_int
+    def set_vcc(self, index):
+        """设置VCC电压，返回错误代码"""
+        return self.backend.set_vcc(self.dev_handle, index)
+
+    def set_vio(self, index):
+        """设置IO电压，返回错误代码"""
+        return self.backend.set_vio(self.dev_handle, index)
+
+    def set_speed(self, index):
+        """设置SPI速度档位，返回错误代码"""
+        return self.backend.set_speed(self.dev_handle, index)
+
+    def write(self, clk_mode, bit_order, length, tx_buffer):
+        """只写传输，返回错误代码"""
+        return self.backend.write(self.dev_handle, clk_mode, bit_order, length, tx_buffer)
+
+    def read(self, clk_mode, bit_order, length, rx_buffer):
+        """只读传输，返回错误代码"""
+        return self.backend.read(self.dev_handle, clk_mode, bit_order, length, rx_buffer)
+
+    def write_read(self, clk_mode, bit_order, length, tx_buffer, rx_buffer):
+        """全双工传输，返回错误代码"""
+        return self.backend.write_read(self.dev_handle, clk_mode, bit_order, length, tx_buffer, rx_buffer)
 
     def open_device(self):
         """
@@ -120,49 +91,41 @@ class SPIDriver:
                 - device_count (int): 设备数量，出错时为0
                 - devices_string (str): 设备信息字符串，出错时为None
         """
-        if self.jtool is None:
-            print("错误：jtool.dll未加载")
-            return "错误：jtool.dll未加载"
-        
         try:
             # 关闭已存在的设备连接，重新连接前释放之前的资源
             if self.dev_handle is not None:
                 self.dev_handle = None
 
-            # 初始化设备计数器
-            dev_cnt = c_int(0)
-
             # 获取设备列表和设备数量
-            devices_str = self.jtool.DevicesScan(self.dev_spi, byref(dev_cnt))
+            dev_cnt, devices_str = self.scan()
 
             # 打开SPI设备连接
             # 使用指定的USB ID选择设备
-            self.dev_handle = self.jtool.DevOpen(
-                self.dev_spi, None, self.usb_id
-            )
+            self.dev_handle = self.backend.open(self.dev_spi, self.usb_id)
 
             # print(f"打开设备句柄: {self.dev_handle}")
 
             # 验证设备是否成功打开
             if not self.dev_handle:
                 # print("错误：SPI设备打开失败")
+                self.dev_handle = None
                 return "错误：SPI设备打开失败", 0, None
             
             # 配置设备基本参数
             # 设置默认的VCC电压、IO电平和SPI速度
-            if self.dev_handle and self.jtool:
-                self.jtool.JSPISetVcc(self.dev_handle, c_int(0))    # 设置VCC电压为默认值
-                self.jtool.JSPISetVio(self.dev_handle, c_int(0))   # 设置IO电平为默认值
-                self.jtool.JSPISetSpeed(self.dev_handle, c_int(0))   # 设置SPI速度为默认值
-                # print(dev_cnt.value, devices_str)
-                return f"成功：SPI设备已打开 - {self.device_name}", dev_cnt.value, devices_str
+            self.set_vcc(0)    # 设置VCC电压为默认值
+            self.set_vio(0)    # 设置IO电平为默认值
+            self.set_speed(0)  # 设置SPI速度为默认值
+            # print(dev_cnt, devices_str)
+            return f"成功：SPI设备已打开 - {self.device_name}", dev_cnt, devices_str
 
         except Exception as e:
             self.dev_handle = None
             # print(f"异常：打开设备时发生错误 - {str(e)}")
             return f"异常：打开设备时发生错误 - {str(e)}", 0, None
         
-    def parse_device_info(self, devices_str):
+    @staticmethod
+    def parse_device_info(devices_str):
         """
         解析设备信息字符串
         
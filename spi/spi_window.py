@@ -7,11 +7,12 @@ date: 2025-11-22
 description: 
 """
 
+from functools import partial
 from PySide6.QtCore import QObject
 from PySide6.QtCore import QTimer, Signal
-from ctypes import c_int, byref
 from core.log.log_window import LogWindow
 from core.log.log_manager import CaseResultParser
+from .spi_driver import SPIDriver
 
 class SPIWindow(QObject):
     """
@@ -28,7 +29,7 @@ class SPIWindow(QObject):
     current_s_or_q_index = 0
     current_size_index = 0
 
-    def __init__(self, application, log_window, driver=None):
+    def __init__(self, application, log_window):
         """
         初始化SPI通信窗口
         
@@ -47,7 +48,6 @@ class SPIWindow(QObject):
         super().__init__()
         self.application = application
         self.ui = application.ui
-        self.driver = driver
         self.log_window = log_window
         self.spi_controller = application.spi_controller
 
@@ -69,6 +69,9 @@ class SPIWindow(QObject):
         # 标记设备是否已连接
         self.device_connected = False
 
+        # 标记设备扫描是否正在工作线程中执行
+        self.scan_pending = False
+
         self.vcc_index = False
         self.io_index = False
         self.speed_index = False
@@ -90,7 +93,8 @@ class SPIWindow(QObject):
         从SPI设备接收数据并显示在日志窗口中。
         """
 
-        self.spi_controller.spi_receive(
+        self.spi_controller.submit(
+            self.spi_controller.spi_receive,
             self.ui.combo_box_clk.currentData(),
             self.ui.combo_box_bit.currentData(),
             self.ui.combo_box_size.currentData()
@@ -118,27 +122,15 @@ class SPIWindow(QObject):
         Args:
             index (int): 选中的电压选项索引
         """
-        if not self.device_connected or self.driver.dev_handle is None:
+        if not self.device_connected or not self.spi_controller.worker.is_open():
             return
 
-        try:
-            result = self.driver.jtool.JSPISetVcc(
-                self.driver.dev_handle, c_int(index)
-            )
-            if result != 0:
-                self.log_window.log(f"VCC设置失败,{self.driver.ERROR_CODES.get(result)}",2)
-                return
-
-            # self.log_window.log(f"VCC设置为: {self.ui.combo_box_vcc.currentText()}",1)
-
-            # self.application.yaml_window.update_spi_config()
-
-            # 存储索引值
-            self.vcc_index = index
-
-        except Exception as e:
-            self.log_window.log(f"VCC设置失败: {str(e)}",2)
-
+        # 在SPI工作线程中设置，结果返回GUI线程后再记录
+        self.spi_controller.submit(
+            self.spi_controller.worker.set_vcc,
+            index,
+            callback=partial(self.setting_finished, "VCC设置", "vcc_index", index)
+        )
 
     def io_changed(self, index):
         """
@@ -149,26 +141,15 @@ class SPIWindow(QObject):
         Args:
             index (int): 选中的电压选项索引
         """
-        if not self.device_connected or self.driver.dev_handle is None:
+        if not self.device_connected or not self.spi_controller.worker.is_open():
             return
 
-        try:
-            result = self.driver.jtool.JSPISetVio(
-                self.driver.dev_handle, c_int(index)
-            )
-            if result != 0:
-                self.log_window.log(f"IO电压设置失败,{self.driver.ERROR_CODES.get(result)}",2)
-                return
-
-            # self.log_window.log(f"IO电压设置为: {self.ui.combo_box_io.currentText()}",1)
-
-            # self.application.yaml_window.update_spi_config()
-
-            # 存储索引值
-            self.io_index = index
-        except Exception as e:
-            self.log_window.log(f"IO电压设置失败: {str(e)}",2)
-
+        # 在SPI工作线程中设置，结果返回GUI线程后再记录
+        self.spi_controller.submit(
+            self.spi_controller.worker.set_vio,
+            index,
+            callback=partial(self.setting_finished, "IO电压设置", "io_index", index)
+        )
 
     def speed_changed(self, index):
         """
@@ -179,25 +160,37 @@ class SPIWindow(QObject):
         Args:
             index (int): 选中的速度选项索引
         """
-        if not self.device_connected or self.driver.dev_handle is None:
+        if not self.device_connected or not self.spi_controller.worker.is_open():
             return
 
-        try:
-            result = self.driver.jtool.JSPISetSpeed(
-                self.driver.dev_handle, c_int(index)
-            )
-            if result != 0:
-                self.log_window.log(f"SPI速度设置失败,{self.driver.ERROR_CODES.get(result)}",2)
-                return
-            
-            # self.log_window.log(f"SPI速度设置为: {self.ui.combo_box_speed.currentText()}",1)
+        # 在SPI工作线程中设置，结果返回GUI线程后再记录
+        self.spi_controller.submit(
+            self.spi_controller.worker.set_speed,
+            index,
+            callback=partial(self.setting_finished, "SPI速度设置", "speed_index", index)
+        )
 
-            # self.application.yaml_window.update_spi_config()
+    def setting_finished(self, name, attr, index, result):
+        """
+        SPI设备参数设置完成处理
+        
+        在GUI线程中检查工作线程返回的设置结果，成功时存储索引值。
+        
+        Args:
+            name (str): 日志中显示的设置名称
+            attr (str): 存储索引值的属性名
+            index (int): 选中的选项索引
+            result (int): jtool返回值，异常时为None
+        """
+        if result is None:
+            return
 
-            # 存储索引值
-            self.speed_index = index
-        except Exception as e:
-            self.log_window.log(f"SPI速度设置失败: {str(e)}",2)
+        if result != 0:
+            self.log_window.log(f"{name}失败,{SPIDriver.ERROR_CODES.get(result)}",2)
+            return
+
+        # 存储索引值
+        setattr(self, attr, index)
 
     def clk_changed(self, index):
         """
@@ -208,7 +201,7 @@ class SPIWindow(QObject):
         Args:
             index (int): 选中的时钟模式索引
         """
-        if not self.device_connected or self.driver.dev_handle is None:
+        if not self.device_connected or not self.spi_controller.worker.is_open():
             return
 
         SPIWindow.current_clk_index = index
@@ -229,7 +222,7 @@ class SPIWindow(QObject):
         Args:
             index (int): 选中的位序模式索引
         """
-        if not self.device_connected or self.driver.dev_handle is None:
+        if not self.device_connected or not self.spi_controller.worker.is_open():
             return
         
         SPIWindow.current_bit_index = index
@@ -250,7 +243,7 @@ class SPIWindow(QObject):
         Args:
             index (int): 选中的SPI模式索引
         """
-        if not self.device_connected or self.driver.dev_handle is None:
+        if not self.device_connected or not self.spi_controller.worker.is_open():
             return
 
         SPIWindow.current_s_or_q_index = index
@@ -271,7 +264,7 @@ class SPIWindow(QObject):
         Args:
             index (int): 选中的数据长度选项索引
         """
-        if not self.device_connected or self.driver.dev_handle is None:
+        if not self.device_connected or not self.spi_controller.worker.is_open():
             return
 
         SPIWindow.current_size_index = index
@@ -350,29 +343,76 @@ class SPIWindow(QObject):
         """
         建立SPI设备连接
         
-        通过调用驱动程序的设备扫描功能，检测SPI设备是否连接。
+        将设备扫描提交到SPI工作线程，上一次扫描未完成时跳过本次检测。
         """
-        try:
-            # 仅执行设备扫描，不每次都打开设备
-            dev_cnt = c_int(0)
-            devices_str = self.driver.jtool.DevicesScan(self.driver.dev_spi, byref(dev_cnt))
-            # print(f"设备数量: {dev_cnt.value}, 设备信息: {devices_str}")
+        if self.scan_pending:
+            return
+
+        self.scan_pending = True
+        self.spi_controller.submit(
+            self.scan_devices,
+            self.device_connected,
+            callback=self.handle_scan_result
+        )
+
+    def scan_devices(self, device_connected):
+        """
+        扫描SPI设备，在SPI工作线程中执行
+        
+        检测到新设备时打开设备，设备断开时清除设备句柄。
+        
+        Args:
+            device_connected (bool): 提交扫描时的设备连接状态
+            
+        Returns:
+            tuple: (dev_count, devices_str)
+                - dev_count (int): 设备数量
+                - devices_str (bytes): 设备信息字符串
+        """
+        # 仅执行设备扫描，不每次都打开设备
+        dev_cnt, devices_str = self.spi_controller.worker.scan()
+        # print(f"设备数量: {dev_cnt}, 设备信息: {devices_str}")
+
+        # 检查是否有设备连接
+        if dev_cnt > 0 and devices_str and devices_str != b'':
+            # 检测到新设备，建立连接
+            if not device_connected:
+                result_msg, _, _ = self.spi_controller.worker.open_device()
+                # print(f"连接情况: {result_msg}")
+        elif device_connected:
+            self.spi_controller.worker.close_device()  # 清除设备句柄
+
+        return dev_cnt, devices_str
+
+    def handle_scan_result(self, scan_result):
+        """
+        处理设备扫描结果
+        
+        在GUI线程中根据工作线程的扫描结果更新界面。
+        
+        Args:
+            scan_result (tuple): scan_devices的返回值，异常时为None
+        """
+        self.scan_pending = False
+
+        if scan_result is None:
+            return
+
+        dev_count, devices_str = scan_result
 
+        try:
             # 检查是否有设备连接
-            if dev_cnt.value > 0 and devices_str and devices_str != b'':
+            if dev_count > 0 and devices_str and devices_str != b'':
 
                 # 检查是否之前未连接设备
                 if self.device_connected:
                     return
                 
-                # 检测到新设备，建立连接
-                result_msg, _, _ = self.driver.open_device()
-                if self.driver.dev_handle is not None:
-                    # print(f"SPIWindow:dev_handle: {self.driver.dev_handle}")
+                if self.spi_controller.worker.is_open():
                     self.device_connected = True
 
                     # 解析设备信息并显示在界面上
-                    device_name = self.driver.parse_device_info(devices_str)
+                    device_name = SPIDriver.parse_device_info(devices_str)
                     self.ui.line_device.setText(device_name)
                             
                     # 初始化SPI配置下拉框
@@ -381,14 +421,12 @@ class SPIWindow(QObject):
 
                     # 连接成功后，设置按键颜色为绿色
                     self.ui.button_fold_config.setStyleSheet("background-color: #BFFFCE;")
-                    # print(f"连接情况: {result_msg}")
 
                     self.log_window.log("设备连接成功", 1)
             else:
                 # 没有检测到设备，如果之前是连接状态则断开连接
                 if self.device_connected:
                     self.device_connected = False
-                    self.driver.dev_handle = None  # 清除设备句柄
 
                     # 清空设备信息显示框
                     self.ui.line_device.clear()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3.13
+"""
+filename: spi_worker.py
+author: [peixuSu]
+email: [1420209272@qq.com]
+date: 2026-10-18
+description: SPI I/O工作线程，串行执行所有jtool调用，结果通过信号回到GUI线程
+"""
+
+from PySide6.QtCore import QObject, Signal
+from .device_worker import DeviceWorker
+
+
+class SPIWorker(QObject):
+    """
+    SPI I/O工作线程
+
+    由DeviceWorker独占SPI驱动句柄，按提交顺序串行执行传输请求，避免USB阻塞时冻结GUI线程。
+    每个请求返回一个Future；提供callback时，结果通过信号在GUI线程中回调。
+    """
+
+    # 日志信号 (消息, 状态)
+    log_signal = Signal(str, int)
+
+    # 请求完成信号 (callback, result)，跨线程发射时由Qt排队到GUI线程执行
+    result_ready = Signal(object, object)
+
+    def __init__(self, driver):
+        """
+        初始化并启动工作线程
+
+        Args:
+            driver: SPI驱动实例，由工作线程独占
+        """
+        super().__init__()
+
+        self.result_ready.connect(self._dispatch)
+
+        self.device = DeviceWorker(
+            driver,
+            on_done=self.result_ready.emit,
+            on_error=lambda e: self.log_signal.emit(f"SPI传输异常: {str(e)}", 2)
+        )
+
+        # 设备操作和传输由DeviceWorker在工作线程中调用驱动
+        self.is_open = self.device.is_open
+        self.scan = self.device.scan
+        self.open_device = self.device.open_device
+        self.close_device = self.device.close_device
+        self.set_vcc = self.device.set_vcc
+        self.set_vio = self.device.set_vio
+        self.set_speed = self.device.set_speed
+        self.write = self.device.write
+        self.read = self.device.read
+        self.write_read = self.device.write_read
+
+    def submit(self, func, *args, callback=None, **kwargs):
+        """
+        提交一个在工作线程中执行的请求
+
+        Args:
+            func: 需要执行的函数，通常为SPIController的方法
+            *args: 位置参数
+            callback: 完成后在GUI线程中调用的函数，参数为func的返回值，异常时为None
+            **kwargs: 关键字参数
+
+        Returns:
+            Future: 请求结果
+        """
+        return self.device.submit(func, *args, callback=callback, **kwargs)
+
+    def is_worker_thread(self):
+        """
+        判断当前是否运行在工作线程中
+
+        Returns:
+            bool: 当前线程是否为工作线程
+        """
+        return self.device.is_worker_thread()
+
+    def pending_count(self):
+        """
+        获取尚未执行的请求数量
+
+        Returns:
+            int: 队列中的请求数量
+        """
+        return self.device.pending_count()
+
+    def stop(self, timeout=1.0):
+        """
+        停止工作线程，已提交的请求执行完后退出
+
+        Args:
+            timeout (float): 等待线程退出的最长时间（秒）
+        """
+        self.device.stop(timeout)
+
+    def _dispatch(self, callback, result):
+        """
+        在GUI线程中执行回调
+
+        Args:
+            callback: 回调函数
+            result: 请求结果
+        """
+        callback(result)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3.13
+"""
+filename: test_case_flow.py
+author: [peixuSu]
+email: [1420209272@qq.com]
+date: 2026-10-18
+description: CaseRunning自适应轮询策略单元测试
+"""
+
+import unittest
+
+from core.risc_v_debug.case_flow import AdaptivePolling
+
+
+class TestAdaptivePolling(unittest.TestCase):
+    """自适应轮询间隔"""
+
+    def intervals(self, polling, count, elapsed_ms=0):
+        return [polling.next_interval(elapsed_ms) for _ in range(count)]
+
+    def test_backoff_without_history(self):
+        polling = AdaptivePolling(5, 100, factor=2)
+        self.assertEqual(self.intervals(polling, 7), [5, 10, 20, 40, 80, 100, 100])
+
+    def test_base_scaled_by_history(self):
+        # 历史时长0.5秒：基础间隔为其10%，首次直接等到预计完成时刻
+        polling = AdaptivePolling(5, 2000, factor=2, expected_duration=0.5)
+        self.assertEqual(polling.base_interval, 50)
+        self.assertEqual(polling.next_interval(100), 400)
+        self.assertEqual(self.intervals(polling, 3), [100, 200, 400])
+
+    def test_first_interval_may_exceed_max(self):
+        polling = AdaptivePolling(5, 2000, expected_duration=10)
+        self.assertEqual(polling.base_interval, 1000)
+        self.assertEqual(polling.next_interval(0), 10000)
+        self.assertEqual(self.intervals(polling, 2), [2000, 2000])
+
+    def test_overdue_case_uses_backoff(self):
+        # 已超过预计时长时，首次间隔回到基础间隔
+        polling = AdaptivePolling(5, 2000, expected_duration=0.2)
+        self.assertEqual(polling.next_interval(500), 20)
+
+    def test_short_history_clamped_to_min(self):
+        polling = AdaptivePolling(5, 2000, expected_duration=0.001)
+        self.assertEqual(polling.base_interval, 5)
+        self.assertEqual(polling.next_interval(1), 5)
+
+    def test_fractional_factor(self):
+        polling = AdaptivePolling(10, 100, factor=1.5)
+        self.assertEqual(self.intervals(polling, 4), [10, 15, 22, 33])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3.13
+"""
+filename: test_case_statistics.py
+author: [peixuSu]
+email: [1420209272@qq.com]
+date: 2026-10-18
+description: 测例运行统计单元测试，覆盖P²分位数精度、次数与连续失败统计和多设备统计合并
+"""
+
+import random
+import unittest
+
+from core.log.case_statistics import QUANTILES, CaseStatistics, P2Quantile
+
+
+def exact_quantile(values, p):
+    """排序后取最近秩的精确分位数"""
+    ordered = sorted(values)
+    return ordered[round(p * (len(ordered) - 1))]
+
+
+class TestP2Quantile(unittest.TestCase):
+    """P²流式分位数"""
+
+    def test_empty_and_small_counts_are_exact(self):
+        quantile = P2Quantile(0.5)
+        self.assertIsNone(quantile.value())
+        for value in (5, 1, 3):
+            quantile.add(value)
+        self.assertEqual(quantile.value(), 3)
+
+    def test_accuracy_on_uniform_data(self):
+        rng = random.Random(0)
+        values = [rng.uniform(0, 10) for _ in range(5000)]
+        for p in QUANTILES:
+            quantile = P2Quantile(p)
+            for value in values:
+                quantile.add(value)
+            with self.subTest(p=p):
+                self.assertAlmostEqual(quantile.value(), exact_quantile(values, p), delta=0.2)
+
+    def test_accuracy_on_skewed_data(self):
+        rng = random.Random(1)
+        values = [rng.expovariate(1.0) for _ in range(5000)]
+        quantile = P2Quantile(0.95)
+        for value in values:
+            quantile.add(value)
+        exact = exact_quantile(values, 0.95)
+        self.assertLess(abs(quantile.value() - exact) / exact, 0.05)
+
+
+class TestCaseStatistics(unittest.TestCase):
+    """单个测例的统计"""
+
+    def test_counts_and_streaks(self):
+        times = iter(range(100, 200))
+        stats = CaseStatistics(clock=lambda: next(times))
+        for passed in (True, False, False, True, False, False, False):
+            stats.add(passed)
+
+        self.assertEqual((stats.pass_count, stats.fail_count), (2, 5))
+        self.assertEqual((stats.fail_streak, stats.max_fail_streak), (3, 3))
+        self.assertEqual((stats.first_failure, stats.last_failure), (100, 104))
+        self.assertAlmostEqual(stats.pass_rate(), 2 / 7 * 100)
+
+    def test_durations(self):
+        stats = CaseStatistics()
+        for duration in (0.3, 0.1, 0.2):
+            stats.add(True, duration)
+        result = stats.as_dict()
+        self.assertEqual((result['duration_min'], result['duration_max']), (0.1, 0.3))
+        self.assertAlmostEqual(result['duration_mean'], 0.2)
+        self.assertEqual(result['duration_p50'], 0.2)
+        self.assertIsNone(CaseStatistics().as_dict()['duration_p50'])
+
+
+class TestCaseStatisticsMerge(unittest.TestCase):
+    """多设备统计合并"""
+
+    def filled(self, durations, passed=True, clock=None):
+        stats = CaseStatistics(clock=clock) if clock is not None else CaseStatistics()
+        for duration in durations:
+            stats.add(passed, duration)
+        return stats
+
+    def test_counts_and_ranges_exact(self):
+        first = self.filled([1.0, 2.0], clock=lambda: 50)
+        first.add(False)
+        second = self.filled([3.0, 4.0, 5.0], passed=False, clock=lambda: 10)
+
+        first.merge(second)
+        self.assertEqual((first.pass_count, first.fail_count), (2, 4))
+        self.assertEqual(first.max_fail_streak, 3)
+        self.assertEqual((first.first_failure, first.last_failure), (10, 50))
+        self.assertEqual((first.duration_min, first.duration_max, first.duration_count), (1.0, 5.0, 5))
+        self.assertAlmostEqual(first.duration_sum, 15.0)
+
+    def test_quantiles_weighted_by_count(self):
+        rng = random.Random(2)
+        first = self.filled([rng.uniform(0, 1) for _ in range(3000)])
+        second = self.filled([rng.uniform(0, 1) for _ in range(1000)])
+        expected = [
+            (a * 3000 + b * 1000) / 4000
+            for a, b in zip(first.quantile_values(), second.quantile_values())
+        ]
+
+        first.merge(second)
+        for value, expected_value in zip(first.quantile_values(), expected):
+            self.assertAlmostEqual(value, expected_value)
+        # 同分布数据合并后接近整体分位数
+        for value, p in zip(first.quantile_values(), QUANTILES):
+            self.assertAlmostEqual(value, p, delta=0.05)
+
+    def test_merge_into_empty(self):
+        merged = CaseStatistics()
+        source = self.filled([0.1, 0.2, 0.3])
+        merged.merge(source)
+        self.assertEqual(merged.quantile_values(), source.quantile_values())
+
+    def test_merged_quantiles_fixed_after_add(self):
+        first = self.filled([1.0] * 10)
+        first.merge(self.filled([3.0] * 10))
+        before = first.quantile_values()
+
+        first.add(True, 100.0)
+        self.assertEqual(first.quantile_values(), before)
+        self.assertEqual((first.duration_count, first.duration_max), (21, 100.0))
+
+    def test_merge_without_durations_keeps_streaming(self):
+        first = self.filled([1.0, 2.0, 3.0])
+        other = CaseStatistics()
+        other.add(True)
+        first.merge(other)
+
+        self.assertIsNone(first.merged_quantiles)
+        first.add(True, 4.0)
+        self.assertEqual(first.quantile_values()[0], 3.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
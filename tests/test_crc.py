@@ -0,0 +1,100 @@
+#!/usr/bin/env python3.13
+"""
+filename: test_crc.py
+author: [peixuSu]
+email: [1420209272@qq.com]
+date: 2026-10-18
+description: CRC计算单元测试，查表法/slice-by-N与逐位实现一致，参数化引擎与zlib和标准校验值一致
+"""
+
+import random
+import unittest
+import zlib
+
+from utils.crc.crc_manager import CRC, CRCEngine, get_crc_engine
+
+# 标准CRC目录使用的校验数据
+CHECK_DATA = b"123456789"
+
+
+class TestCRC16User(unittest.TestCase):
+    """自定义CRC-16(poly 0x8005, init 0xFFFF)"""
+
+    def test_check_value(self):
+        # 与CRC-16/CMS参数相同
+        self.assertEqual(CRC.crc_16_user(CHECK_DATA), 0xAEE7)
+
+    def test_table_and_slice_match_bitwise(self):
+        rng = random.Random(0)
+        for length in (0, 1, 7, 8, 15, 16, 17, 63, 64, 1000):
+            data = bytes(rng.getrandbits(8) for _ in range(length))
+            expected = CRC.crc_16_bitwise(data)
+            self.assertEqual(CRC.crc_16_table(data), expected, length)
+            self.assertEqual(CRC.crc_16_slice(data), expected, length)
+            self.assertEqual(CRC.crc_16_user(data), expected, length)
+
+    def test_accepts_list_and_memoryview(self):
+        expected = CRC.crc_16_user(CHECK_DATA)
+        self.assertEqual(CRC.crc_16_user(list(CHECK_DATA)), expected)
+        self.assertEqual(CRC.crc_16_user(memoryview(CHECK_DATA)), expected)
+
+
+class TestCRCEngine(unittest.TestCase):
+    """参数化CRC引擎"""
+
+    def test_crc32_matches_zlib(self):
+        engine = get_crc_engine(32, 0x04C11DB7, 0xFFFFFFFF, 0xFFFFFFFF, refin=True, refout=True)
+        rng = random.Random(1)
+        for length in (0, 1, 9, 100, 4097):
+            data = bytes(rng.getrandbits(8) for _ in range(length))
+            self.assertEqual(engine.calc(data), zlib.crc32(data), length)
+        self.assertEqual(engine.calc(CHECK_DATA), 0xCBF43926)
+
+    def test_modbus(self):
+        engine = get_crc_engine(16, 0x8005, 0xFFFF, 0x0000, refin=True, refout=True, high_first=False)
+        self.assertEqual(engine.calc(CHECK_DATA), 0x4B37)
+        # MODBUS帧尾CRC低字节在前
+        self.assertEqual(engine.to_bytes(0x4B37), b'\x37\x4B')
+
+    def test_other_standard_check_values(self):
+        self.assertEqual(get_crc_engine(8, 0x07, 0x00).calc(CHECK_DATA), 0xF4)
+        self.assertEqual(get_crc_engine(16, 0x1021, 0xFFFF).calc(CHECK_DATA), 0x29B1)
+
+    def test_default_engine_matches_crc_16_user(self):
+        data = bytes(range(256)) * 3
+        self.assertEqual(get_crc_engine().calc(data), CRC.crc_16_user(data))
+
+    def test_engines_are_cached_by_params(self):
+        self.assertIs(get_crc_engine(16, 0x1021, 0xFFFF), get_crc_engine(16, 0x1021, 0xFFFF))
+
+    def test_invalid_params(self):
+        with self.assertRaises(ValueError):
+            CRCEngine(width=12)
+        with self.assertRaises(ValueError):
+            CRCEngine(width=8, poly=0x107)
+
+
+class TestCRCHash(unittest.TestCase):
+    """增量CRC对象"""
+
+    def test_chunked_update_matches_calc(self):
+        engine = get_crc_engine(32, 0x04C11DB7, 0xFFFFFFFF, 0xFFFFFFFF, refin=True, refout=True)
+        data = bytes(range(200))
+        crc = engine.new()
+        for start in range(0, len(data), 13):
+            crc.update(data[start:start + 13])
+        self.assertEqual(crc.crcvalue, engine.calc(data))
+        self.assertEqual(crc.digest(), engine.to_bytes(engine.calc(data)))
+        self.assertEqual(crc.hexdigest(), crc.digest().hex())
+
+    def test_copy_is_independent(self):
+        engine = get_crc_engine()
+        crc = engine.new(b"1234")
+        other = crc.copy()
+        other.update(b"56789")
+        self.assertEqual(crc.crcvalue, engine.calc(b"1234"))
+        self.assertEqual(other.crcvalue, engine.calc(CHECK_DATA))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3.13
+"""
+filename: test_crc_batch.py
+author: [peixuSu]
+email: [1420209272@qq.com]
+date: 2026-10-18
+description: 批量CRC计算单元测试，NumPy向量化路径与逐帧计算结果一致
+"""
+
+import random
+import unittest
+import zlib
+from unittest import mock
+
+from utils.crc import crc_manager
+from utils.crc.crc_manager import BATCH_MAX_LENGTH, CRC, get_crc_engine
+
+
+def random_frames(seed, count, max_length):
+    """生成长度随机的测试帧，包含空帧"""
+    rng = random.Random(seed)
+    return [bytes(rng.getrandbits(8) for _ in range(rng.randint(0, max_length))) for _ in range(count)]
+
+
+# 覆盖窄位宽、非反射、反射和32位的引擎参数
+ENGINE_PARAMS = (
+    dict(width=8, poly=0x07, init=0x00),
+    dict(width=16, poly=0x8005, init=0xFFFF),
+    dict(width=16, poly=0x8005, init=0xFFFF, refin=True, refout=True, high_first=False),
+    dict(width=32, poly=0x04C11DB7, init=0xFFFFFFFF, xorout=0xFFFFFFFF, refin=True, refout=True),
+)
+
+
+class TestCalcMany(unittest.TestCase):
+    """calc_many与calc逐帧计算结果一致"""
+
+    def test_matches_calc_for_all_engines(self):
+        frames = random_frames(2, 50, 80)
+        for params in ENGINE_PARAMS:
+            engine = get_crc_engine(**params)
+            with self.subTest(**params):
+                self.assertEqual(engine.calc_many(frames), [engine.calc(frame) for frame in frames])
+
+    def test_crc32_matches_zlib(self):
+        engine = get_crc_engine(32, 0x04C11DB7, 0xFFFFFFFF, 0xFFFFFFFF, refin=True, refout=True)
+        frames = random_frames(3, 30, 200)
+        self.assertEqual(engine.calc_many(frames), [zlib.crc32(frame) for frame in frames])
+
+    def test_mixed_input_types(self):
+        frames = [b"123456789", bytearray(b"\x5a\xa5\x00"), memoryview(b"abc"), [1, 2, 3, 4], b""]
+        expected = [CRC.crc_16_user(bytes(frame)) for frame in frames]
+        self.assertEqual(CRC.crc_16_many(frames), expected)
+
+    def test_long_frames_fall_back_to_calc(self):
+        engine = get_crc_engine()
+        frames = random_frames(4, 5, 20) + [bytes(range(256)) * (BATCH_MAX_LENGTH // 256 + 1)]
+        random.Random(5).shuffle(frames)
+        self.assertEqual(engine.calc_many(frames), [engine.calc(frame) for frame in frames])
+
+    def test_small_inputs(self):
+        engine = get_crc_engine()
+        self.assertEqual(engine.calc_many([]), [])
+        self.assertEqual(engine.calc_many([b"123456789"]), [0xAEE7])
+
+    def test_without_numpy(self):
+        frames = random_frames(6, 10, 40)
+        engine = get_crc_engine()
+        expected = [engine.calc(frame) for frame in frames]
+        with mock.patch.object(crc_manager, "np", None):
+            self.assertEqual(engine.calc_many(frames), expected)
+
+
+@unittest.skipUnless(crc_manager.np is not None, "未安装NumPy")
+class TestNumpyPath(unittest.TestCase):
+    """直接校验NumPy向量化实现"""
+
+    def test_matches_calc(self):
+        frames = random_frames(7, 200, 300)
+        for params in ENGINE_PARAMS:
+            engine = get_crc_engine(**params)
+            with self.subTest(**params):
+                self.assertEqual(crc_manager._crc_many_numpy(engine, frames), [engine.calc(frame) for frame in frames])
+
+    def test_equal_length_frames(self):
+        engine = get_crc_engine()
+        frames = [bytes([value]) * 32 for value in range(64)]
+        self.assertEqual(crc_manager._crc_many_numpy(engine, frames), [engine.calc(frame) for frame in frames])
+
+    def test_only_long_frames(self):
+        engine = get_crc_engine()
+        frames = [b"\x01" * (BATCH_MAX_LENGTH + 1), b"\x02" * (BATCH_MAX_LENGTH + 2)]
+        self.assertEqual(crc_manager._crc_many_numpy(engine, frames), [engine.calc(frame) for frame in frames])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3.13
+"""
+filename: test_device_worker.py
+author: [peixuSu]
+email: [1420209272@qq.com]
+date: 2026-10-18
+description: SPI设备I/O线程和多设备管理单元测试，使用回环模拟后端
+"""
+
+import threading
+import unittest
+from ctypes import c_ubyte
+
+from spi.device_manager import SHARD_AFFINITY, DeviceManager
+from spi.device_worker import DeviceWorker
+from spi.spi_backend import SimulatedBackend
+from spi.spi_driver import SPIDriver
+
+
+class RecordingBackend(SimulatedBackend):
+    """回环模拟后端，记录执行传输的线程"""
+
+    def __init__(self):
+        super().__init__(bit_rate=0)
+        self.threads = set()
+
+    def on_write(self, data):
+        self.threads.add(threading.current_thread().name)
+        super().on_write(data)
+
+
+class TestDeviceWorker(unittest.TestCase):
+    """设备I/O线程"""
+
+    def setUp(self):
+        self.backend = RecordingBackend()
+        self.worker = DeviceWorker(SPIDriver(0, self.backend), name="TestDevice")
+
+    def tearDown(self):
+        self.worker.stop()
+
+    def test_open_transfer_close_on_worker_thread(self):
+        message, count, _ = self.worker.open_device()
+        self.assertTrue(self.worker.is_open(), message)
+        self.assertEqual(count, 1)
+
+        tx = (c_ubyte * 4)(1, 2, 3, 4)
+        rx = (c_ubyte * 4)()
+        self.assertEqual(self.worker.write(0, 0, 4, tx), 0)
+        self.assertEqual(self.worker.read(0, 0, 4, rx), 0)
+        self.assertEqual(bytes(rx), b"\x01\x02\x03\x04")
+        self.assertEqual(self.backend.threads, {"TestDevice"})
+
+        self.worker.close_device()
+        self.assertFalse(self.worker.is_open())
+
+    def test_requests_run_in_order(self):
+        order = []
+        futures = [self.worker.submit(order.append, index) for index in range(20)]
+        for future in futures:
+            future.result()
+        self.assertEqual(order, list(range(20)))
+
+    def test_call_from_worker_thread_runs_directly(self):
+        # 在工作线程中嵌套调用不能死锁
+        future = self.worker.submit(self.worker.call, self.worker.is_worker_thread)
+        self.assertTrue(future.result(timeout=1))
+        self.assertFalse(self.worker.is_worker_thread())
+
+    def test_callback_and_error(self):
+        errors = []
+        results = []
+        done = threading.Event()
+        worker = DeviceWorker(SPIDriver(0, self.backend), on_error=errors.append)
+        try:
+            future = worker.submit(lambda: 1 / 0, callback=results.append)
+            worker.submit(done.set)
+            self.assertTrue(done.wait(1))
+            self.assertIsInstance(future.exception(), ZeroDivisionError)
+            self.assertEqual(len(errors), 1)
+            self.assertEqual(results, [None])
+        finally:
+            worker.stop()
+
+
+class TestDeviceManager(unittest.TestCase):
+    """多设备管理"""
+
+    def setUp(self):
+        self.manager = DeviceManager(backend=RecordingBackend(), backend_factory=lambda usb_id: RecordingBackend())
+
+    def tearDown(self):
+        self.manager.close_all()
+
+    def test_one_worker_per_device(self):
+        messages = self.manager.open_all(3)
+        self.assertEqual(self.manager.device_count(), 3, messages)
+        self.assertTrue(messages[0].startswith("[设备0]"))
+
+        results = self.manager.run(
+            lambda index, driver, job: (index, job, threading.current_thread().name), ["a", "b", "c"]
+        )
+        self.assertEqual(results, [(0, "a", "SPIDevice0"), (1, "b", "SPIDevice1"), (2, "c", "SPIDevice2")])
+
+    def test_run_collects_exceptions(self):
+        self.manager.open_all(2)
+
+        def job(index, driver, value):
+            if index == 1:
+                raise RuntimeError(value)
+            return value
+
+        results = self.manager.run(job, ["ok", "bad"])
+        self.assertEqual(results[0], "ok")
+        self.assertIsInstance(results[1], RuntimeError)
+
+    def test_shard(self):
+        self.manager.open_all(2)
+        cases = ["a", "b", "c", "d", "e"]
+        self.assertEqual(self.manager.shard(cases), [["a", "c", "e"], ["b", "d"]])
+        self.assertEqual(self.manager.shard(cases, SHARD_AFFINITY, {"a": 1, "b": 1}), [["c", "d", "e"], ["a", "b"]])
+        with self.assertRaises(ValueError):
+            self.manager.shard(cases, "unknown")
+
+        self.manager.close_all()
+        with self.assertRaises(ValueError):
+            self.manager.shard(cases)
+
+
+if __name__ == "__main__":
+    unittest.main()
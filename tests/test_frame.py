@@ -0,0 +1,150 @@
+#!/usr/bin/env python3.13
+"""
+filename: test_frame.py
+author: [peixuSu]
+email: [1420209272@qq.com]
+date: 2026-10-18
+description: 数据帧编解码单元测试，覆盖帧生成/解析、帧模板和流式解码器的跨块拼接与重同步
+"""
+
+import unittest
+
+from core.risc_v_debug.frame import (
+    CMD, HEADER_LENGTH, MAX_DATA_LENGTH, Frame, FrameDecoder, FrameTemplate,
+    frame_length, frame_length_parser, frame_msg_id
+)
+from utils.crc.crc_manager import get_crc_engine
+
+CRC16 = get_crc_engine()
+CRC32 = get_crc_engine(32, 0x04C11DB7, 0xFFFFFFFF, 0xFFFFFFFF, refin=True, refout=True)
+
+
+class TestFrameCodec(unittest.TestCase):
+    """帧生成与解析"""
+
+    def test_round_trip_without_crc(self):
+        frame = Frame.generate_frame(CMD["RunCase"], b"case_1", msg_id=0x1234)
+        self.assertEqual(len(frame), HEADER_LENGTH + 6)
+        self.assertEqual(frame_msg_id(frame), 0x1234)
+
+        success, msg_id, cmd, payload, _ = Frame.parse_receive_frame(frame)
+        self.assertTrue(success)
+        self.assertEqual((msg_id, cmd, bytes(payload)), (0x1234, CMD["RunCase"], b"case_1"))
+
+    def test_round_trip_with_crc(self):
+        for engine in (CRC16, CRC32):
+            frame = Frame.generate_frame(CMD["GetLog"], [1, 2, 3], crc_engine=engine, msg_id=7)
+            self.assertEqual(len(frame), HEADER_LENGTH + 3 + engine.byte_length)
+            success, msg_id, cmd, payload, _ = Frame.parse_receive_frame(frame, True, engine)
+            self.assertTrue(success)
+            self.assertEqual((msg_id, cmd, bytes(payload)), (7, CMD["GetLog"], b"\x01\x02\x03"))
+
+    def test_crc_error_detected(self):
+        frame = Frame.generate_frame(CMD["Ping"], b"abc", crc_engine=CRC16, msg_id=1)
+        frame[HEADER_LENGTH] ^= 0x01
+        success, _, _, _, message = Frame.parse_receive_frame(frame, True, CRC16)
+        self.assertFalse(success)
+        self.assertEqual(message, "CRC error")
+
+    def test_bad_header_and_short_data(self):
+        frame = Frame.generate_frame(CMD["Ping"], msg_id=1)
+        self.assertFalse(Frame.parse_receive_frame(frame[:HEADER_LENGTH - 1])[0])
+        frame[0] = 0x00
+        self.assertFalse(Frame.parse_receive_frame(frame)[0])
+        self.assertFalse(Frame.parse_receive_frame(None)[0])
+
+    def test_encode_frame_into_matches_generate_frame(self):
+        expected = Frame.generate_frame(CMD["SendData"], b"\x00\xff" * 10, crc_engine=CRC16, msg_id=99)
+        buffer = bytearray(4 + len(expected))
+        written = Frame.encode_frame_into(buffer, 4, 99, CMD["SendData"], b"\x00\xff" * 10, CRC16)
+        self.assertEqual(written, len(expected))
+        self.assertEqual(buffer[4:], expected)
+
+    def test_template_matches_generate_frame(self):
+        template = FrameTemplate(CMD["GetCaseResult"], b"xyz", CRC16)
+        for msg_id in (0, 1, 0xABCD, 0xFFFF):
+            expected = Frame.generate_frame(CMD["GetCaseResult"], b"xyz", crc_engine=CRC16, msg_id=msg_id)
+            self.assertEqual(template.build(msg_id), expected)
+
+    def test_frame_length(self):
+        frame = Frame.generate_frame(CMD["Ping"], b"12345", crc_engine=CRC32, msg_id=1)
+        self.assertEqual(frame_length_parser(True, CRC32)(frame), len(frame))
+        self.assertEqual(frame_length(frame), HEADER_LENGTH + 5)
+        self.assertEqual(frame_length_parser(True)(frame), HEADER_LENGTH + 5 + 2)
+        self.assertIsNone(frame_length(bytes(HEADER_LENGTH)))
+
+
+class TestFrameDecoder(unittest.TestCase):
+    """流式帧解码器"""
+
+    def frames(self, count, engine=None):
+        return [
+            Frame.generate_frame(CMD["LogSending"], bytes([index]) * index, crc_engine=engine, msg_id=index)
+            for index in range(count)
+        ]
+
+    def test_split_across_feeds(self):
+        frames = self.frames(5, CRC16)
+        stream = b"".join(frames)
+        decoder = FrameDecoder(use_crc=True, crc_engine=CRC16)
+
+        decoded = []
+        for start in range(0, len(stream), 3):
+            decoded.extend(decoder.feed(stream[start:start + 3]))
+
+        self.assertEqual(decoded, [(index, CMD["LogSending"], bytes([index]) * index) for index in range(5)])
+        self.assertEqual(decoder.pending_bytes(), 0)
+        self.assertEqual(decoder.get_statistics()["dropped_bytes"], 0)
+
+    def test_resync_after_garbage(self):
+        frames = self.frames(3)
+        decoder = FrameDecoder()
+        decoded = decoder.feed(b"\x00\x11\x5a" + frames[0] + b"\xff\xa5" + frames[1] + b"\x5a" + frames[2])
+
+        self.assertEqual([msg_id for msg_id, _, _ in decoded], [0, 1, 2])
+        statistics = decoder.get_statistics()
+        self.assertEqual(statistics["dropped_bytes"], 6)
+        self.assertEqual(statistics["resync_count"], 3)
+
+    def test_resync_on_corrupted_frame(self):
+        frames = self.frames(4, CRC16)
+        corrupted = bytearray(frames[1])
+        corrupted[-1] ^= 0xFF
+        decoder = FrameDecoder(use_crc=True, crc_engine=CRC16)
+
+        decoded = decoder.feed(frames[0] + corrupted + frames[2] + frames[3])
+
+        self.assertEqual([msg_id for msg_id, _, _ in decoded], [0, 2, 3])
+        self.assertEqual(decoder.crc_error_count, 1)
+        self.assertEqual(decoder.pending_bytes(), 0)
+
+    def test_oversized_length_is_not_a_header(self):
+        fake_header = b"\x5a\xa5\x00\x00\x00\x01" + (MAX_DATA_LENGTH + 1).to_bytes(4, "big")
+        frame = self.frames(2)[1]
+        decoder = FrameDecoder()
+        self.assertEqual([msg_id for msg_id, _, _ in decoder.feed(fake_header + frame)], [1])
+
+    def test_manual_resync_skips_false_header(self):
+        # 帧头合法但数据长度超过实际数据，解码器会一直等待，超时后由调用方重同步
+        false_header = b"\x5a\xa5\x00\x00\x00\x01\x00\x00\x01\x00"
+        frame = self.frames(3)[2]
+        decoder = FrameDecoder()
+        self.assertEqual(decoder.feed(false_header + frame), [])
+
+        self.assertTrue(decoder.resync())
+        self.assertEqual([msg_id for msg_id, _, _ in decoder.feed(None)], [2])
+
+        decoder.reset()
+        self.assertFalse(decoder.resync())
+
+    def test_next_frame_keeps_extra_frames(self):
+        frames = self.frames(3)
+        decoder = FrameDecoder()
+        self.assertEqual(decoder.next_frame(b"".join(frames))[1], 0)
+        self.assertEqual(decoder.next_frame()[1], 1)
+        self.assertEqual(decoder.next_frame()[1], 2)
+        self.assertFalse(decoder.next_frame()[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3.13
+"""
+filename: test_mcu_simulator.py
+author: [peixuSu]
+email: [1420209272@qq.com]
+date: 2026-10-18
+description: RISC-V固件协议模拟器单元测试，覆盖测例运行流程和重发请求的应答
+"""
+
+import unittest
+
+from core.risc_v_debug.frame import CMD, Frame, FrameDecoder
+from core.risc_v_debug.mcu_simulator import LOG_HEADER, NACK_CASE_BUSY, NACK_NO_LOG, MCUSimulator
+
+
+class TestMCUSimulator(unittest.TestCase):
+    """模拟器命令处理"""
+
+    def setUp(self):
+        self.now = 0.0
+        self.simulator = self.create_simulator()
+
+    def create_simulator(self):
+        return MCUSimulator(
+            case_count=3, default_duration=1.0, pass_ratio=0.0, log_rows=4,
+            log_chunk_size=16, seed=1, clock=lambda: self.now
+        )
+
+    def run_failed_case(self, simulator):
+        """运行2号测例并在运行时长后取得失败结果"""
+        self.now = 0.0
+        self.assertEqual(simulator.handle_command(1, CMD["RunCase"], b"\x00\x02")[0], CMD["Ack"])
+        self.assertEqual(simulator.handle_command(2, CMD["GetCaseResult"], b"")[0], CMD["CaseRunning"])
+        self.now = 1.0
+        self.assertEqual(simulator.handle_command(3, CMD["GetCaseResult"], b""), (CMD["CaseResult"], b"\x00\x02\x01"))
+
+    def fetch_log(self, first_msg_id, resend=()):
+        """按顺序取完日志，resend中的消息ID各重发一次"""
+        chunks = []
+        msg_id = first_msg_id
+        while True:
+            cmd, chunk = self.simulator.handle_command(msg_id, CMD["GetLog"], b"")
+            if msg_id in resend:
+                self.assertEqual(self.simulator.handle_command(msg_id, CMD["GetLog"], b""), (cmd, chunk))
+            chunks.append(chunk)
+            if cmd != CMD["LogSending"]:
+                self.assertEqual(cmd, CMD["LogFinished"])
+                return b"".join(chunks)
+            msg_id += 1
+
+    def test_case_flow_and_log(self):
+        self.run_failed_case(self.simulator)
+        log = self.fetch_log(10).decode("ascii")
+        rows = log.rstrip(";").split(";")
+        self.assertEqual(rows[0], LOG_HEADER)
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(self.simulator.handle_command(100, CMD["GetLog"], b""), (CMD["Nack"], NACK_NO_LOG.to_bytes(2, "big")))
+
+    def test_resent_get_log_returns_same_chunk(self):
+        # 相同种子的模拟器生成相同的日志
+        reference = self.create_simulator()
+        self.run_failed_case(reference)
+        expected = b"".join(reference.log_chunks)
+
+        self.run_failed_case(self.simulator)
+        self.assertEqual(self.fetch_log(10, resend={10, 11, 12}), expected)
+
+    def test_resent_run_case_acks_without_restart(self):
+        self.simulator.handle_command(1, CMD["RunCase"], b"\x00\x01")
+        self.assertEqual(self.simulator.handle_command(1, CMD["RunCase"], b"\x00\x01"), (CMD["Ack"], b""))
+        self.assertEqual(self.simulator.cases_run, 1)
+
+        # 新的RunCase在测例运行中被拒绝
+        self.assertEqual(self.simulator.handle_command(2, CMD["RunCase"], b"\x00\x01"),
+                         (CMD["Nack"], NACK_CASE_BUSY.to_bytes(2, "big")))
+
+    def test_responses_through_backend(self):
+        self.simulator.on_write(Frame.generate_frame(CMD["GetCaseList"], crc_engine=self.simulator.crc_engine, msg_id=42))
+        decoded = FrameDecoder(use_crc=True).feed(bytes(self.simulator.rx_data))
+        self.assertEqual(decoded, [(42, CMD["CaseList"], b"case_0001;case_0002;case_0003")])
+
+
+if __name__ == "__main__":
+    unittest.main()
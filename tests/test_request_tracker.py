@@ -0,0 +1,95 @@
+#!/usr/bin/env python3.13
+"""
+filename: test_request_tracker.py
+author: [peixuSu]
+email: [1420209272@qq.com]
+date: 2026-10-18
+description: 请求跟踪器单元测试，覆盖按消息ID匹配、兼容模式、过期和迟到应答
+"""
+
+import unittest
+
+from core.risc_v_debug.frame import CMD
+from core.risc_v_debug.request_tracker import RequestTracker
+
+
+class FakeClock:
+    """可手动推进的时钟"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRequestTracker(unittest.TestCase):
+    """请求跟踪器"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_match_by_msg_id_out_of_order(self):
+        tracker = RequestTracker(depth=3, clock=self.clock)
+        for msg_id in (1, 2, 3):
+            self.assertTrue(tracker.register(msg_id, CMD["RunCase"], 1000, context=f"case_{msg_id}"))
+
+        self.assertEqual(tracker.match(2), (2, CMD["RunCase"], "case_2"))
+        self.assertEqual(tracker.match(3), (3, CMD["RunCase"], "case_3"))
+        self.assertEqual(tracker.in_flight(), 1)
+
+    def test_depth_limit(self):
+        tracker = RequestTracker(depth=2, clock=self.clock)
+        self.assertTrue(tracker.register(1, CMD["Ping"], 1000))
+        self.assertTrue(tracker.register(2, CMD["Ping"], 1000))
+        self.assertTrue(tracker.is_full())
+        self.assertFalse(tracker.register(3, CMD["Ping"], 1000))
+
+        tracker.match(1)
+        self.assertTrue(tracker.register(3, CMD["Ping"], 1000))
+        self.assertEqual(tracker.get_statistics()['max_in_flight'], 2)
+
+    def test_compat_mode_matches_oldest(self):
+        tracker = RequestTracker(depth=1, match_msg_id=False, clock=self.clock)
+        tracker.register(7, CMD["GetLog"], 1000)
+        self.assertEqual(tracker.match(0xFFFF), (7, CMD["GetLog"], None))
+
+    def test_expire_and_late_reply(self):
+        tracker = RequestTracker(depth=2, clock=self.clock)
+        tracker.register(1, CMD["GetCaseResult"], 500)
+        tracker.register(2, CMD["GetCaseResult"], 2000)
+        self.assertEqual(tracker.next_deadline(), 100.5)
+
+        self.clock.now = 100.5
+        self.assertEqual(tracker.expire(), [(1, CMD["GetCaseResult"], None)])
+        self.assertEqual(tracker.next_deadline(), 102.0)
+
+        # 过期请求的迟到应答不匹配
+        self.assertIsNone(tracker.match(1))
+        statistics = tracker.get_statistics()
+        self.assertEqual((statistics['expired_count'], statistics['unmatched_count']), (1, 1))
+
+    def test_resend_same_msg_id_refreshes_deadline(self):
+        tracker = RequestTracker(clock=self.clock)
+        tracker.register(5, CMD["GetLog"], 1000)
+        self.clock.now = 100.8
+        tracker.cancel(5)
+        tracker.register(5, CMD["GetLog"], 1000)
+        self.assertAlmostEqual(tracker.deadline(5), 101.8)
+
+    def test_cancel_and_reset(self):
+        tracker = RequestTracker(depth=2, clock=self.clock)
+        tracker.register(1, CMD["Ping"], 1000)
+        tracker.cancel(1)
+        self.assertIsNone(tracker.match(1))
+        self.assertIsNone(tracker.deadline(1))
+
+        tracker.register(2, CMD["Ping"], 1000)
+        tracker.reset()
+        self.assertEqual(tracker.in_flight(), 0)
+        self.assertIsNone(tracker.next_deadline())
+        self.assertEqual(tracker.get_statistics()['sent_count'], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3.13
+"""
+filename: test_result_store.py
+author: [peixuSu]
+email: [1420209272@qq.com]
+date: 2026-10-18
+description: 测例结果存储单元测试，覆盖批量写入、后台定时写入、重新打开、增量读取和合并
+"""
+
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+
+from core.log.result_store import (
+    VERDICT_FAIL, VERDICT_PASS, ResultStore, decode_rows, encode_rows
+)
+
+HEADER = ("addr", "expect", "actual")
+ROWS = [("0x00", "0x1", "0x2"), ("0x04", "", "0x3")]
+
+
+class TestRowEncoding(unittest.TestCase):
+    """数据行编码"""
+
+    def test_round_trip(self):
+        self.assertEqual(decode_rows(encode_rows(ROWS)), ROWS)
+
+    def test_empty(self):
+        self.assertEqual(encode_rows([]), "")
+        self.assertEqual(decode_rows(""), [])
+        self.assertEqual(decode_rows(None), [])
+
+
+class TestResultStore(unittest.TestCase):
+    """结果存储"""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, "results.db")
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def stored_count(self):
+        """从另一个连接读取已写入数据库的行数"""
+        conn = sqlite3.connect(self.path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_batching(self):
+        store = ResultStore(self.path, batch_size=3, flush_interval=3600)
+        try:
+            store.append("case_0", "2026-10-18 10:00:00", VERDICT_PASS)
+            store.append("case_1", "2026-10-18 10:00:01", VERDICT_PASS)
+            self.assertEqual(self.stored_count(), 0)
+
+            store.append("case_2", "2026-10-18 10:00:02", VERDICT_PASS)
+            self.assertEqual(self.stored_count(), 3)
+
+            # 查询前先写入缓冲
+            store.append("case_3", "2026-10-18 10:00:03", VERDICT_FAIL)
+            self.assertEqual(store.count(), 4)
+            self.assertEqual(store.count(VERDICT_FAIL), 1)
+        finally:
+            store.close()
+
+    def test_background_flush_when_idle(self):
+        store = ResultStore(self.path, batch_size=100, flush_interval=0.05)
+        try:
+            store.append("case_0", "2026-10-18 10:00:00", VERDICT_PASS)
+            deadline = time.monotonic() + 2
+            while self.stored_count() == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(self.stored_count(), 1)
+        finally:
+            store.close()
+
+    def test_flush_and_reopen(self):
+        store = ResultStore(self.path, batch_size=100, flush_interval=3600, clock=lambda: 1000.0)
+        store.append("case_0", "2026-10-18 10:00:00", VERDICT_PASS, duration=0.5, case_id=b"\x00\x07")
+        store.append("case_1", "2026-10-18 10:00:01", VERDICT_FAIL, log="日志", parsed=(HEADER, ROWS))
+        store.close()
+
+        store = ResultStore(self.path, flush_interval=3600)
+        try:
+            rows = store.query()
+            self.assertEqual(rows[0], (1, 7, "case_0", 1000.0, "2026-10-18 10:00:00", 0.5, VERDICT_PASS, ""))
+            self.assertEqual(rows[1][2], "case_1")
+            self.assertEqual(rows[1][-1], "日志")
+            self.assertEqual(list(store.iter_parsed_failures()), [(2, "case_1", "2026-10-18 10:00:01", HEADER, ROWS)])
+
+            # 重新打开后沿用已有的表头序号
+            store.append("case_2", "2026-10-18 10:00:02", VERDICT_FAIL, parsed=(HEADER, ROWS[:1]))
+            self.assertEqual(store._header_ids, {HEADER: 1})
+            self.assertEqual(store.last_id(), 3)
+        finally:
+            store.close()
+
+    def test_incremental_reads(self):
+        store = ResultStore(batch_size=2)
+        for index in range(5):
+            store.append(f"case_{index}", "", VERDICT_FAIL if index % 2 else VERDICT_PASS, duration=index)
+
+        self.assertEqual([row[2] for row in store.iter_results(after_id=2, batch=1)], ["case_2", "case_3", "case_4"])
+        self.assertEqual([row[0] for row in store.iter_results(verdict=VERDICT_FAIL)], [2, 4])
+        self.assertEqual(store.recent_durations(2), [("case_3", 3), ("case_4", 4)])
+        self.assertEqual(len(store.query(case_name="case_1")), 1)
+        store.close()
+
+    def test_copy_from(self):
+        source = ResultStore()
+        source.append("case_0", "t0", VERDICT_PASS, duration=0.1)
+        source.append("case_1", "t1", VERDICT_FAIL, log="raw", parsed=(HEADER, ROWS))
+        source.append("case_2", "t2", VERDICT_FAIL, log="unparsed")
+
+        target = ResultStore()
+        target.append("local", "t", VERDICT_FAIL, parsed=(("other",), [("x",)]))
+        target.copy_from(source)
+
+        self.assertEqual([row[2] for row in target.query()], ["local", "case_0", "case_1", "case_2"])
+        self.assertEqual(target.query(case_name="case_2")[0][-1], "unparsed")
+        failures = [(case_name, header, rows) for _, case_name, _, header, rows in target.iter_parsed_failures()]
+        self.assertEqual(failures, [("local", ("other",), [("x",)]), ("case_1", HEADER, ROWS)])
+
+        # 增量复制只复制新增的结果
+        source.append("case_3", "t3", VERDICT_PASS)
+        target.copy_from(source, after_id=3)
+        self.assertEqual(target.count(), 5)
+
+        source.close()
+        target.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
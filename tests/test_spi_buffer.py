@@ -0,0 +1,74 @@
+#!/usr/bin/env python3.13
+"""
+filename: test_spi_buffer.py
+author: [peixuSu]
+email: [1420209272@qq.com]
+date: 2026-10-18
+description: SPI传输缓冲区池单元测试
+"""
+
+import unittest
+
+from spi.spi_buffer import TransferBuffer, TransferBufferPool
+
+
+class TestTransferBuffer(unittest.TestCase):
+    """传输缓冲区"""
+
+    def test_array_shares_memory(self):
+        buffer = TransferBuffer(16)
+        self.assertEqual(buffer.write(b"\x5a\xa5\x01", 2), 5)
+        self.assertEqual(list(buffer.array[:5]), [0, 0, 0x5A, 0xA5, 0x01])
+
+        # 模拟jtool.dll写入ctypes数组
+        buffer.array[0] = 0x7F
+        self.assertEqual(buffer.read(3), b"\x7f\x00\x5a")
+
+
+class TestTransferBufferPool(unittest.TestCase):
+    """缓冲区池"""
+
+    def test_size_class(self):
+        pool = TransferBufferPool()
+        self.assertEqual(pool.size_class(0), 16)
+        self.assertEqual(pool.size_class(16), 16)
+        self.assertEqual(pool.size_class(17), 32)
+        self.assertEqual(pool.size_class(1024), 1024)
+        self.assertEqual(pool.size_class(1025), 2048)
+
+    def test_reuse_after_release(self):
+        pool = TransferBufferPool()
+        buffer = pool.acquire(100)
+        self.assertEqual(buffer.size, 128)
+        pool.release(buffer)
+
+        self.assertIs(pool.acquire(120), buffer)
+        self.assertEqual(pool.get_statistics(), {'allocation_count': 1, 'reuse_count': 1})
+
+    def test_different_classes_not_shared(self):
+        pool = TransferBufferPool()
+        small = pool.acquire(10)
+        pool.release(small)
+        self.assertIsNot(pool.acquire(200), small)
+        self.assertEqual(pool.allocation_count, 2)
+
+    def test_outstanding_buffers_are_distinct(self):
+        pool = TransferBufferPool()
+        first = pool.acquire(64)
+        second = pool.acquire(64)
+        self.assertIsNot(first, second)
+
+    def test_max_per_class(self):
+        pool = TransferBufferPool(max_per_class=2)
+        buffers = [pool.acquire(32) for _ in range(3)]
+        for buffer in buffers:
+            pool.release(buffer)
+
+        reused = [pool.acquire(32) for _ in range(3)]
+        self.assertEqual(pool.reuse_count, 2)
+        self.assertEqual(pool.allocation_count, 4)
+        self.assertNotIn(reused[2], buffers)
+
+
+if __name__ == "__main__":
+    unittest.main()
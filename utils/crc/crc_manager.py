@@ -1,8 +1,159 @@
+#!/usr/bin/env python3.13
+"""
+filename: crc_manager.py
+author: [peixuSu]
+email: [1420209272@qq.com]
+date: 2025-11-25
+description: CRC计算管理，提供查表法和slice-by-N实现的CRC-16校验
+"""
+
+# NumPy为可选依赖，未安装时批量计算退回纯Python实现
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 自定义CRC-16参数
+CRC16_POLY = 0x8005
+CRC16_INIT = 0xFFFF
+
+# slice-by-N每次处理的字节数
+SLICE_SIZE = 8
+
+# 超过该长度的数据使用slice-by-N计算
+SLICE_THRESHOLD = 16
+
+# 批量计算时超过该长度的帧单独计算，避免按列循环次数过多
+BATCH_MAX_LENGTH = 4096
+
+
+def _build_crc16_tables(poly, slices):
+    """
+    生成CRC-16查找表
+
+    Args:
+        poly (int): CRC多项式
+        slices (int): 查找表数量，tables[k][b]表示字节b后跟k个0字节时的CRC余数
+
+    Returns:
+        tuple: 每个元素为256项的CRC查找表
+    """
+    base = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            if crc & 0x8000:
+                crc = ((crc << 1) ^ poly) & 0xFFFF
+            else:
+                crc = (crc << 1) & 0xFFFF
+        base.append(crc)
+
+    tables = [tuple(base)]
+    for _ in range(1, slices):
+        prev = tables[-1]
+        # 在上一张表的基础上再推进一个0字节
+        tables.append(tuple(((value << 8) & 0xFFFF) ^ base[value >> 8] for value in prev))
+
+    return tuple(tables)
+
+
+# 模块加载时预先计算查找表
+_CRC16_TABLES = _build_crc16_tables(CRC16_POLY, SLICE_SIZE)
+_CRC16_TABLE = _CRC16_TABLES[0]
+
+
 class CRC():
     # 自定义CRC-16算法
     def crc_16_user(data):
-        crc = 0xFFFF
-        poly = 0x8005
+        """
+        计算自定义CRC-16校验值(poly 0x8005, init 0xFFFF)
+
+        短数据使用单表查表法，长数据自动切换为slice-by-N实现
+
+        Args:
+            data: 字节数据，可以是bytes、bytearray、list或memoryview
+
+        Returns:
+            int: 16位CRC校验值
+        """
+        if len(data) >= SLICE_THRESHOLD:
+            return CRC.crc_16_slice(data)
+
+        return CRC.crc_16_table(data)
+
+    def crc_16_many(frames):
+        """
+        批量计算多帧数据的自定义CRC-16校验值
+
+        安装NumPy时将所有帧打包到一个缓冲区中按列向量化计算，否则逐帧计算
+
+        Args:
+            frames: 帧数据序列，每帧为bytes、bytearray或memoryview
+
+        Returns:
+            list: 与frames顺序一致的CRC校验值列表
+        """
+        return get_crc_engine().calc_many(frames)
+
+    def crc_16_table(data, crc=CRC16_INIT):
+        """
+        单表查表法计算CRC-16，每个字节一次查表
+
+        Args:
+            data: 字节数据
+            crc (int): 初始CRC值，用于分段计算
+
+        Returns:
+            int: 16位CRC校验值
+        """
+        table = _CRC16_TABLE
+
+        for byte in data:
+            crc = ((crc << 8) & 0xFFFF) ^ table[(crc >> 8) ^ byte]
+
+        return crc
+
+    def crc_16_slice(data, crc=CRC16_INIT):
+        """
+        slice-by-N查表法计算CRC-16，每次处理SLICE_SIZE个字节
+
+        Args:
+            data: 字节数据
+            crc (int): 初始CRC值，用于分段计算
+
+        Returns:
+            int: 16位CRC校验值
+        """
+        t0, t1, t2, t3, t4, t5, t6, t7 = _CRC16_TABLES
+
+        length = len(data)
+        end = length - length % SLICE_SIZE
+
+        # CRC只有16位，只与每组的前两个字节异或
+        for i in range(0, end, SLICE_SIZE):
+            crc = (t7[data[i] ^ (crc >> 8)] ^ t6[data[i + 1] ^ (crc & 0xFF)]
+                   ^ t5[data[i + 2]] ^ t4[data[i + 3]]
+                   ^ t3[data[i + 4]] ^ t2[data[i + 5]]
+                   ^ t1[data[i + 6]] ^ t0[data[i + 7]])
+
+        # 处理剩余不足一组的字节
+        for i in range(end, length):
+            crc = ((crc << 8) & 0xFFFF) ^ t0[(crc >> 8) ^ data[i]]
+
+        return crc
+
+    def crc_16_bitwise(data, crc=CRC16_INIT):
+        """
+        逐位计算CRC-16，作为查表法的参考实现
+
+        Args:
+            data: 字节数据
+            crc (int): 初始CRC值
+
+        Returns:
+            int: 16位CRC校验值
+        """
+        poly = CRC16_POLY
 
         for byte in data:
             crc ^= (byte << 8)
@@ -13,4 +164,451 @@ class CRC():
                     crc = crc << 1
                 crc &= 0xFFFF
 
-        return crc
\ No newline at end of file
+        return crc
+
+
+def _reflect(value, width):
+    """
+    按位反转value的低width位
+
+    Args:
+        value (int): 需要反转的值
+        width (int): 位宽
+
+    Returns:
+        int: 反转后的值
+    """
+    result = 0
+    for _ in range(width):
+        result = (result << 1) | (value & 1)
+        value >>= 1
+    return result
+
+
+# 查找表缓存，键为(width, poly, refin)
+_crc_table_cache = {}
+
+# CRC引擎缓存，键为完整参数组
+_crc_engine_cache = {}
+
+
+def _get_crc_table(width, poly, refin):
+    """
+    获取指定参数的CRC查找表，同一参数组只生成一次
+
+    Args:
+        width (int): CRC位宽(8/16/32)
+        poly (int): CRC多项式
+        refin (bool): 输入是否反转
+
+    Returns:
+        tuple: 256项的CRC查找表
+    """
+    key = (width, poly, refin)
+    table = _crc_table_cache.get(key)
+    if table is not None:
+        return table
+
+    mask = (1 << width) - 1
+    entries = []
+
+    if refin:
+        # 输入反转时使用反转多项式，寄存器右移
+        rpoly = _reflect(poly, width)
+        for byte in range(256):
+            crc = byte
+            for _ in range(8):
+                if crc & 1:
+                    crc = (crc >> 1) ^ rpoly
+                else:
+                    crc >>= 1
+            entries.append(crc)
+    else:
+        top_bit = 1 << (width - 1)
+        for byte in range(256):
+            crc = byte << (width - 8)
+            for _ in range(8):
+                if crc & top_bit:
+                    crc = ((crc << 1) ^ poly) & mask
+                else:
+                    crc = (crc << 1) & mask
+            entries.append(crc)
+
+    table = tuple(entries)
+    _crc_table_cache[key] = table
+    return table
+
+
+class CRCEngine():
+    """
+    参数化CRC计算引擎
+
+    根据CRC配置界面中的位宽、多项式、初始值、结果异或值、输入/输出反转和字节序
+    参数计算CRC，查找表在创建引擎时生成并按参数组缓存
+    """
+
+    # 支持的CRC位宽
+    SUPPORTED_WIDTHS = (8, 16, 32)
+
+    def __init__(self, width=16, poly=CRC16_POLY, init=CRC16_INIT, xorout=0x0000,
+                 refin=False, refout=False, high_first=True):
+        """
+        初始化CRC引擎
+
+        Args:
+            width (int): CRC位宽，支持8/16/32
+            poly (int): CRC多项式（不含最高位）
+            init (int): 初始值
+            xorout (int): 结果异或值
+            refin (bool): 输入是否反转
+            refout (bool): 输出是否反转
+            high_first (bool): CRC附加到数据后时是否高字节在前
+
+        Raises:
+            ValueError: 位宽不支持或参数超出位宽范围时抛出
+        """
+        if width not in self.SUPPORTED_WIDTHS:
+            raise ValueError(f"不支持的CRC位宽：{width}")
+
+        mask = (1 << width) - 1
+        for name, value in (("poly", poly), ("init", init), ("xorout", xorout)):
+            if value < 0 or value > mask:
+                raise ValueError(f"{name}超出{width}位范围：{value:X}")
+
+        self.width = width
+        self.poly = poly
+        self.init = init
+        self.xorout = xorout
+        self.refin = refin
+        self.refout = refout
+        self.high_first = high_first
+
+        # CRC附加到数据后所占的字节数
+        self.byte_length = width // 8
+
+        self._mask = mask
+        self._table = _get_crc_table(width, poly, refin)
+
+        # 输入反转时寄存器以反转形式保存
+        self._init_register = _reflect(init, width) if refin else init
+
+        # 默认CRC-16参数可直接使用slice-by-N实现，且不需要输出处理
+        self._is_crc_16_user = (
+            width == 16 and poly == CRC16_POLY and init == CRC16_INIT
+            and xorout == 0 and not refin and not refout
+        )
+
+    def params(self):
+        """
+        获取引擎参数
+
+        Returns:
+            tuple: (width, poly, init, xorout, refin, refout, high_first)
+        """
+        return (self.width, self.poly, self.init, self.xorout,
+                self.refin, self.refout, self.high_first)
+
+    def calc(self, data):
+        """
+        计算数据的CRC值
+
+        Args:
+            data: 字节数据，可以是bytes、bytearray、list、memoryview或ctypes数组
+
+        Returns:
+            int: CRC校验值
+        """
+        return self._finish(self._update(self._init_register, data))
+
+    def calc_many(self, frames):
+        """
+        批量计算多帧数据的CRC值
+
+        Args:
+            frames: 帧数据序列
+
+        Returns:
+            list: 与frames顺序一致的CRC校验值列表
+        """
+        if np is None or len(frames) < 2:
+            return [self.calc(frame) for frame in frames]
+
+        return _crc_many_numpy(self, frames)
+
+    def new(self, data=None):
+        """
+        创建增量计算的CRC对象，用法与hashlib一致
+
+        Args:
+            data: 可选的初始数据
+
+        Returns:
+            CRCHash: 增量CRC对象
+        """
+        return CRCHash(self, data)
+
+    def to_bytes(self, value):
+        """
+        按配置的字节序将CRC值转换为字节
+
+        Args:
+            value (int): CRC校验值
+
+        Returns:
+            bytes: CRC字节
+        """
+        return value.to_bytes(self.byte_length, byteorder='big' if self.high_first else 'little')
+
+    def from_bytes(self, data):
+        """
+        按配置的字节序从字节中读取CRC值
+
+        Args:
+            data: 长度为byte_length的字节数据
+
+        Returns:
+            int: CRC校验值
+        """
+        return int.from_bytes(bytes(data), byteorder='big' if self.high_first else 'little')
+
+    def _update(self, register, data):
+        """
+        将数据送入CRC寄存器
+
+        Args:
+            register (int): 当前寄存器值
+            data: 字节数据
+
+        Returns:
+            int: 更新后的寄存器值
+        """
+        if self._is_crc_16_user:
+            return CRC.crc_16_slice(data, register)
+
+        table = self._table
+
+        if self.refin:
+            for byte in data:
+                register = (register >> 8) ^ table[(register ^ byte) & 0xFF]
+        else:
+            mask = self._mask
+            shift = self.width - 8
+            for byte in data:
+                register = ((register << 8) & mask) ^ table[((register >> shift) ^ byte) & 0xFF]
+
+        return register
+
+    def _finish(self, register):
+        """
+        根据输出反转和结果异或值得到最终CRC
+
+        Args:
+            register (int): 寄存器值
+
+        Returns:
+            int: CRC校验值
+        """
+        if self._is_crc_16_user:
+            return register
+
+        # 寄存器的反转状态与输出要求不一致时需要再反转一次
+        if self.refin != self.refout:
+            register = _reflect(register, self.width)
+
+        return register ^ self.xorout
+
+
+def _byte_view(data):
+    """
+    获取数据的字节视图，不复制数据
+
+    bytes、bytearray、memoryview和ctypes数组均通过memoryview访问，
+    整数列表直接迭代
+
+    Args:
+        data: 字节数据
+
+    Returns:
+        可按字节迭代和索引的对象
+    """
+    if isinstance(data, (list, tuple)):
+        return data
+
+    view = memoryview(data)
+    if view.format != 'B':
+        # ctypes数组的格式为'<B'，无法cast但可以直接按整数迭代
+        try:
+            view = view.cast('B')
+        except (TypeError, ValueError, NotImplementedError):
+            pass
+    return view
+
+
+class CRCHash():
+    """
+    增量CRC对象
+
+    提供与hashlib相同的update/digest接口，数据可以分段送入，
+    支持bytes、bytearray、memoryview和ctypes数组，计算过程中不复制数据
+    """
+
+    def __init__(self, engine=None, data=None):
+        """
+        初始化增量CRC对象
+
+        Args:
+            engine (CRCEngine, optional): CRC计算引擎，默认为CRC-16(自定义)
+            data: 可选的初始数据
+        """
+        self.engine = engine if engine is not None else get_crc_engine()
+        self._register = self.engine._init_register
+
+        # 已送入的数据长度
+        self.length = 0
+
+        if data is not None:
+            self.update(data)
+
+    @property
+    def name(self):
+        """CRC名称，例如crc16-8005"""
+        return f"crc{self.engine.width}-{self.engine.poly:0{self.engine.width // 4}x}"
+
+    @property
+    def digest_size(self):
+        """CRC字节数"""
+        return self.engine.byte_length
+
+    @property
+    def crcvalue(self):
+        """当前已送入数据的CRC值"""
+        return self.engine._finish(self._register)
+
+    def update(self, data):
+        """
+        送入一段数据
+
+        Args:
+            data: 字节数据
+        """
+        view = _byte_view(data)
+        self._register = self.engine._update(self._register, view)
+        self.length += len(view)
+
+    def digest(self):
+        """
+        按配置的字节序返回CRC字节
+
+        Returns:
+            bytes: CRC字节
+        """
+        return self.engine.to_bytes(self.crcvalue)
+
+    def hexdigest(self):
+        """
+        返回CRC的十六进制字符串
+
+        Returns:
+            str: 十六进制字符串
+        """
+        return self.digest().hex()
+
+    def copy(self):
+        """
+        复制当前计算状态
+
+        Returns:
+            CRCHash: 新的增量CRC对象
+        """
+        other = CRCHash(self.engine)
+        other._register = self._register
+        other.length = self.length
+        return other
+
+
+def _crc_many_numpy(engine, frames):
+    """
+    使用NumPy批量计算CRC
+
+    所有帧拼接为一个uint8缓冲区，按帧长度降序排列后逐列计算，
+    第j列只处理长度大于j的帧，这些帧在排序后位于数组前部
+
+    Args:
+        engine (CRCEngine): CRC计算引擎
+        frames: 帧数据序列
+
+    Returns:
+        list: 与frames顺序一致的CRC校验值列表
+    """
+    results = [0] * len(frames)
+
+    # 过长的帧单独计算
+    batch_index = []
+    batch_frames = []
+    for index, frame in enumerate(frames):
+        if len(frame) > BATCH_MAX_LENGTH:
+            results[index] = engine.calc(frame)
+        else:
+            batch_index.append(index)
+            # 整数列表没有缓冲区接口，与逐帧计算一样先转换为字节格式
+            batch_frames.append(bytes(frame) if isinstance(frame, list) else frame)
+
+    if not batch_frames:
+        return results
+
+    lengths = np.fromiter((len(frame) for frame in batch_frames), dtype=np.int64, count=len(batch_frames))
+    packed = np.frombuffer(b''.join(batch_frames), dtype=np.uint8)
+    starts = np.zeros(len(batch_frames), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+
+    # 按长度降序排列
+    order = np.argsort(-lengths, kind='stable')
+    sorted_lengths = lengths[order]
+    sorted_starts = starts[order]
+
+    # 每一列参与计算的帧数
+    max_length = int(sorted_lengths[0])
+    active_counts = np.searchsorted(-sorted_lengths, -np.arange(max_length), side='left').tolist()
+
+    # 寄存器使用与CRC位宽一致的整数类型，移位溢出部分自动截断
+    dtype = {8: np.uint8, 16: np.uint16, 32: np.uint32}[engine.width]
+    table = np.array(engine._table, dtype=dtype)
+    registers = np.full(len(batch_frames), engine._init_register, dtype=dtype)
+    shift = dtype(engine.width - 8)
+    eight = dtype(8)
+    low_byte = dtype(0xFF)
+
+    for column, count in enumerate(active_counts):
+        reg = registers[:count]
+        data = packed[sorted_starts[:count] + column]
+        if engine.refin:
+            registers[:count] = (reg >> eight) ^ table[(reg ^ data) & low_byte]
+        elif engine.width == 8:
+            registers[:count] = table[reg ^ data]
+        else:
+            registers[:count] = (reg << eight) ^ table[(reg >> shift) ^ data]
+
+    # 恢复原始顺序并做输出处理
+    for position, register in zip(order.tolist(), registers.tolist()):
+        results[batch_index[position]] = engine._finish(register)
+
+    return results
+
+
+def get_crc_engine(width=16, poly=CRC16_POLY, init=CRC16_INIT, xorout=0x0000,
+                   refin=False, refout=False, high_first=True):
+    """
+    获取指定参数的CRC引擎，相同参数组复用同一个引擎
+
+    Args:
+        参数含义同CRCEngine
+
+    Returns:
+        CRCEngine: CRC计算引擎
+    """
+    key = (width, poly, init, xorout, bool(refin), bool(refout), bool(high_first))
+    engine = _crc_engine_cache.get(key)
+    if engine is None:
+        engine = CRCEngine(*key)
+        _crc_engine_cache[key] = engine
+    return engine
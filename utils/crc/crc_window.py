@@ -9,7 +9,6 @@ description:
 
 from PySide6.QtCore import QObject
 from PySide6.QtCore import Qt
-from .crc_manager import CRC
 
 class CRCWindow(QObject):
     """
@@ -129,15 +128,13 @@ class CRCWindow(QObject):
             hex_parts = data_text.strip().split()
             data_bytes = [int(part, 16) for part in hex_parts]
 
-            # 计算CRC-16校验值
-            crc_value = CRC.crc_16_user(data_bytes)
-
-            # 将CRC值分为高字节和低字节
-            crc_high = (crc_value >> 8) & 0xFF
-            crc_low = crc_value & 0xFF
+            # 按当前CRC参数计算校验值
+            crc_engine = self.application.crc_engine
+            crc_value = crc_engine.calc(data_bytes)
 
             # 构造包含CRC校验的数据文本
-            crc_data_text = data_text + f" {crc_high:02X} {crc_low:02X}"
+            crc_text = ' '.join(f"{byte:02X}" for byte in crc_engine.to_bytes(crc_value))
+            crc_data_text = data_text + f" {crc_text}"
             item.setToolTip(f"校验后数据：{crc_data_text}")
         else:
             item.setToolTip(None)